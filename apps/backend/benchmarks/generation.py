@@ -0,0 +1,136 @@
+"""Offline load benchmark for the recipe generation path.
+
+Usage:
+  ``python -m apps.backend.benchmarks.generation --requests 500 --distinct 50 --concurrency 32 --latency-ms 800``
+  ``python -m apps.backend.benchmarks.generation --output generation.json --jitter-ms 300 --servings 1 2 4``
+
+Runs ``generate_recipe`` against the deterministic stub provider with
+simulated upstream latency, so cache lookups, single-flight coalescing,
+rescaling and ingredient normalisation are measured without network access.
+Each workload is replayed twice, from cold caches and then warm, and the
+report holds latency percentiles per pass together with the generator's cache,
+coalescing and decode counters. Supabase is not contacted unless configured.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+QUERY_WORDS = (
+    "vegan chili", "tomato soup", "chicken curry", "mushroom risotto", "pad thai", "lentil stew",
+    "caesar salad", "banana bread", "beef tacos", "shakshuka", "pesto pasta", "fried rice",
+)
+
+
+def _workload(requests: int, distinct: int, servings: Sequence[int], seed: int) -> List[Tuple[str, int]]:
+    """``requests`` (query, servings) pairs over ``distinct`` queries with Zipf-like popularity."""
+    rng = random.Random(seed)
+    queries = [f"{QUERY_WORDS[i % len(QUERY_WORDS)]} {i // len(QUERY_WORDS) or ''}".strip() for i in range(distinct)]
+    weights = [1.0 / (rank + 1) for rank in range(distinct)]
+    return [(rng.choices(queries, weights)[0], rng.choice(list(servings))) for _ in range(requests)]
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+    }
+
+
+async def _replay(generator: Any, workload: List[Tuple[str, int]], concurrency: int) -> Dict[str, float]:
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(query: str, servings: int) -> None:
+        async with slots:
+            started = time.perf_counter()
+            await generator.generate_recipe(query, servings, False)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(query, servings) for query, servings in workload))
+    wall = time.perf_counter() - started
+    return {"wall_s": wall, "throughput_rps": len(workload) / wall, **_percentiles(latencies)}
+
+
+async def run(
+    requests: int,
+    distinct: int,
+    concurrency: int,
+    latency_ms: float,
+    jitter_ms: float,
+    servings: Sequence[int],
+    seed: int,
+    output: Optional[Path],
+) -> Dict[str, Any]:
+    os.environ.update(
+        GEN_PROVIDER="stub",
+        GEN_STUB_LATENCY_MS=str(latency_ms),
+        GEN_STUB_JITTER_MS=str(jitter_ms),
+        GEN_SEMANTIC_INDEX_PATH="",  # keep the benchmark's index in memory
+    )
+    from apps.backend.services import generator  # pylint: disable=import-outside-toplevel
+
+    workload = _workload(requests, distinct, servings, seed)
+    passes = {}
+    for name in ("cold", "warm"):
+        passes[name] = await _replay(generator, workload, concurrency)
+        stats = passes[name]
+        print(
+            f"{name:<5} {stats['throughput_rps']:>9.1f} req/s  p50 {stats['p50_ms']:>8.2f} ms  "
+            f"p95 {stats['p95_ms']:>8.2f} ms  max {stats['max_ms']:>8.2f} ms"
+        )
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "requests": requests,
+            "distinct": distinct,
+            "concurrency": concurrency,
+            "latency_ms": latency_ms,
+            "jitter_ms": jitter_ms,
+        },
+        "passes": passes,
+        "provider_calls": generator.PROVIDER.calls,
+        "stats": generator.cache_stats(),
+    }
+    print(f"provider calls: {report['provider_calls']} for {requests * 2} requests")
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote report to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=50, help="Number of distinct queries in the workload")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Simulated upstream latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--servings", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+    asyncio.run(
+        run(args.requests, args.distinct, args.concurrency, args.latency_ms, args.jitter_ms, args.servings, args.seed, args.output)
+    )
@@ -8,7 +8,6 @@ from pathlib import Path
 from time import time
 from typing import Any, Deque, Dict, Optional
 
-import requests
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -18,8 +17,15 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
-from services.supabase_client import insert_eco_result, insert_recipe
-from routes import auto
+# Import through the package so the routes' ``..services`` imports resolve to
+# the same module instances (executors, pooled client, maintenance tasks) that
+# the shutdown hooks below close.
+from apps.backend.routes import auto, simulate
+from apps.backend.services.concurrency import run_blocking_io, shutdown_executors
+from apps.backend.services.http_client import aclose_http_client, get_http_client
+from apps.backend.services.prewarm import start_cache_maintenance, stop_cache_maintenance
+from apps.backend.services.supabase_client import insert_eco_result, insert_recipe
+from packages.simulation_engine.montecarlo import route_cluster_for_location
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO))
@@ -66,18 +72,31 @@ async def rate_limit_middleware(request: Request, call_next):
     return await call_next(request)
 
 
+@app.on_event("startup")
+async def start_background_maintenance() -> None:
+    start_cache_maintenance()
+
+
+@app.on_event("shutdown")
+async def close_outbound_resources() -> None:
+    await stop_cache_maintenance()
+    await aclose_http_client()
+    shutdown_executors()
+
+
 app.include_router(auto.router)
+app.include_router(simulate.router, prefix="/simulate", tags=["simulate"])
 
 HF_MODEL = "xkrish/urgency-classifier-distilbert"
 HF_API_KEY = os.getenv("HF_API_KEY")
 
 
-def _call_hf_inference(recipe_text: str) -> Optional[float]:
+async def _call_hf_inference(recipe_text: str) -> Optional[float]:
     if not HF_API_KEY:
         return None
 
     try:
-        response = requests.post(
+        response = await get_http_client().post(
             f"https://api-inference.huggingface.co/models/{HF_MODEL}",
             headers={"Authorization": f"Bearer {HF_API_KEY}"},
             json={"inputs": recipe_text},
@@ -111,11 +130,11 @@ def root():
 
 
 @app.post("/analyze")
-def analyze_recipe(data: RecipeInput):
+async def analyze_recipe(data: RecipeInput):
     try:
         # Step 1: Hugging Face inference
         try:
-            model_score = _call_hf_inference(data.recipe_text)
+            model_score = await _call_hf_inference(data.recipe_text)
         except Exception as exc:  # pylint: disable=broad-except
             print("HF inference failed:", exc)
             model_score = None
@@ -126,13 +145,14 @@ def analyze_recipe(data: RecipeInput):
         co2_saved_kg = round(eco_score * 1.75, 2)
         variance_cost = 0.1
         best_sources = ["local-market", "organic-farm"]
-        route_cluster = random.choice(["urban", "suburban", "rural"])
+        route_cluster = await run_blocking_io(route_cluster_for_location)
 
         # Step 3: Supabase insertion
-        recipe_record = insert_recipe(data.user_id, data.recipe_text, data.urgency)
+        recipe_record = await run_blocking_io(insert_recipe, data.user_id, data.recipe_text, data.urgency)
         recipe_id: Optional[str] = recipe_record.get("id") if isinstance(recipe_record, dict) else None
         if recipe_id:
-            insert_eco_result(
+            await run_blocking_io(
+                insert_eco_result,
                 recipe_id=recipe_id,
                 eco_score=eco_score,
                 co2_saved_kg=co2_saved_kg,
@@ -1,18 +1,25 @@
 """Auto route that chooses between parsing and generation."""
 from __future__ import annotations
 
+import json
+import logging
 import os
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, PositiveInt, constr
 
 from packages.nlp_engine.parser import parse
 
-from ..services.generator import generate_recipe
+from ..services.concurrency import CapacityError
+from ..services.generator import cache_stats, generate_recipe, stream_recipe
+from ..services.prewarm import get_cache_warmer
 
 DEFAULT_SERVINGS = 1
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/analyze_or_generate", tags=["auto"])
 
 
@@ -83,7 +90,48 @@ async def analyze_or_generate(payload: AutoIn) -> AutoOut:
             meal_time=parsed.get("meal_time"),
         )
 
-    generated = generate_recipe(query=text, servings=servings, assumed=assumed)
+    try:
+        generated = await generate_recipe(query=text, servings=servings, assumed=assumed)
+    except CapacityError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
     generated.setdefault("urgency", None)
     generated.setdefault("meal_time", None)
     return AutoOut(**generated)
+
+
+async def _generation_event_stream(text: str, servings: int, assumed: bool) -> AsyncIterator[str]:
+    seq = 0
+    try:
+        async for event, data in stream_recipe(query=text, servings=servings, assumed=assumed):
+            seq += 1
+            yield f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception("Streaming generation failed")
+        yield f"id: {seq + 1}\nevent: error\ndata: {json.dumps({'error': str(exc)})}\n\n"
+
+
+@router.post("/stream")
+async def stream_generation(payload: AutoIn) -> StreamingResponse:
+    """Generate a recipe as server-sent events.
+
+    ``title``, ``servings``, ``ingredient`` and ``step`` events are pushed as
+    soon as the model has finished writing each part; a final ``result`` event
+    carries the normalised recipe (or ``error`` if generation failed).
+    """
+    default_servings = int(os.getenv("GEN_DEFAULT_SERVINGS", DEFAULT_SERVINGS))
+    servings = int(payload.servings or default_servings)
+    return StreamingResponse(
+        _generation_event_stream(payload.text, servings, payload.servings is None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/cache", status_code=status.HTTP_200_OK)
+def generation_cache_stats() -> Dict[str, Any]:
+    """Hit ratios of the in-process generation cache, plus cache-warmer runs when enabled."""
+    stats = cache_stats()
+    warmer = get_cache_warmer()
+    if warmer is not None:
+        stats["prewarm"] = warmer.stats()
+    return stats
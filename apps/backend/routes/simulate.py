@@ -1,19 +1,57 @@
 """Simulation routes for eco impact calculations."""
-from typing import Any, Dict
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, PositiveInt
 
-from packages.simulation_engine.montecarlo import run_simulation
-from ..services.supabase_client import insert_eco_result
+from packages.simulation_engine.geo_index import configure_supplier_source
+from packages.simulation_engine.memo import configure_memo_store
+from packages.simulation_engine.models import DEFAULT_COST_MODELS, DEFAULT_EMISSION_MODELS, validate_models
+from packages.simulation_engine.montecarlo import get_factor_snapshot_async, run_simulation
+from packages.simulation_engine.sweep import DEFAULT_TRAFFIC_RATIOS, run_sweep
+from ..services.concurrency import CapacityError, run_blocking_io, run_cpu_bound, with_timeout
+from ..services.http_client import get_http_client
+from ..services.jobs import TERMINAL_STATUSES, get_job_manager
+from ..services.supabase_client import (
+    fetch_recipe_ingredients,
+    fetch_simulation_memo,
+    fetch_suppliers,
+    insert_eco_result,
+    store_simulation_memo,
+)
 
 router = APIRouter()
 
+# Upper bound on waiting for the weather/traffic APIs; neutral factors are used past it.
+FACTOR_FETCH_TIMEOUT_SECONDS = float(os.getenv("SIM_FACTOR_TIMEOUT_SECONDS", "3"))
+JOB_EVENT_POLL_SECONDS = float(os.getenv("SIM_JOB_POLL_SECONDS", "0.25"))
+JOB_EVENT_HEARTBEAT_SECONDS = 15.0
+
+configure_supplier_source(fetch_suppliers)
+if os.getenv("SIM_MEMO_PERSIST", "true").strip().lower() in {"1", "true", "yes", "on"}:
+    configure_memo_store(fetch_simulation_memo, store_simulation_memo)
+
+
+class IngredientIn(BaseModel):
+    name: str
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+
 
 class SimulationRequest(BaseModel):
     recipe_id: UUID = Field(..., description="Recipe identifier to simulate")
+    ingredients: Optional[List[IngredientIn]] = Field(
+        default=None, description="Recipe ingredients; loaded from the recipe when omitted"
+    )
+    sampler: str = Field("mc", pattern=r"^(mc|sobol|antithetic|lhs)$", description="Sampling strategy")
+    emission_models: List[str] = Field(default=list(DEFAULT_EMISSION_MODELS), min_length=1, description="Emission models to compose")
+    cost_models: List[str] = Field(default=list(DEFAULT_COST_MODELS), min_length=1, description="Cost models to compose")
 
 
 class SimulationResponse(BaseModel):
@@ -22,13 +60,93 @@ class SimulationResponse(BaseModel):
     variance_cost: float
     best_sources: list[str]
     route_cluster: str
+    n_samples_used: Optional[int] = None
+    confidence_intervals: Optional[Dict[str, List[float]]] = None
+    supplier_stats: Optional[Dict[str, Any]] = None
+
+
+class SimulationJobRequest(SimulationRequest):
+    n_samples: PositiveInt = Field(default=100_000, le=50_000_000, description="Sample budget")
+    ci_width: Optional[float] = Field(default=None, gt=0, description="Stop early once intervals are this narrow")
+    confidence: float = Field(default=0.95, gt=0, lt=1, description="Confidence level of reported intervals")
+    seed: Optional[int] = Field(default=None, description="Explicit seed for reproducible runs")
+    workers: int = Field(default=1, ge=0, le=64, description="Worker processes (0 = one per CPU)")
+    low_memory: bool = Field(default=False, description="Stream float32 chunks to keep memory flat")
+
+
+class SimulationJobResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+
+
+class SimulationJobStatus(BaseModel):
+    job_id: str
+    status: str
+    progress: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class SweepRequest(BaseModel):
+    weather_conditions: Optional[List[str]] = Field(default=None, description="Weather conditions to include (default: all)")
+    traffic_ratios: List[float] = Field(default=list(DEFAULT_TRAFFIC_RATIOS), min_length=1, description="Global traffic ratios")
+    supplier_mixes: Optional[Dict[str, Dict[str, float]]] = Field(default=None, description="Named supplier-type weightings")
+    n_samples: PositiveInt = Field(default=10000, le=1_000_000, description="Shared samples per supplier mix")
+    seed: Optional[int] = Field(default=None, description="Seed for the common random numbers")
+    emission_models: List[str] = Field(default=list(DEFAULT_EMISSION_MODELS), min_length=1, description="Emission models to compose")
+    cost_models: List[str] = Field(default=list(DEFAULT_COST_MODELS), min_length=1, description="Cost models to compose")
+
+
+class SweepRow(BaseModel):
+    weather: str
+    weather_factor: float
+    traffic_ratio: float
+    supplier_mix: str
+    eco_score: float
+    eco_score_ci_low: float
+    eco_score_ci_high: float
+    co2_saved_kg: float
+    variance_cost: float
+    best_sources: list[str]
+
+
+class SweepResponse(BaseModel):
+    scenarios: List[SweepRow]
+
+
+async def _recipe_ingredients(payload: SimulationRequest) -> Optional[List[Dict[str, Any]]]:
+    """Ingredients used to fingerprint the recipe; None disables cross-recipe memoisation."""
+    if payload.ingredients is not None:
+        return [item.dict() for item in payload.ingredients]
+    try:
+        return await run_blocking_io(fetch_recipe_ingredients, str(payload.recipe_id)) or None
+    except Exception:  # pylint: disable=broad-except
+        return None
 
 
 @router.post("", response_model=SimulationResponse, status_code=status.HTTP_201_CREATED)
 async def simulate_recipe(payload: SimulationRequest) -> JSONResponse:
-    """Run the Monte Carlo simulation and persist eco results."""
+    """Run the Monte Carlo simulation off the event loop and persist eco results."""
+    factors = await with_timeout(
+        get_factor_snapshot_async(get_http_client()), FACTOR_FETCH_TIMEOUT_SECONDS, (1.0, 1.0)
+    )
+    ingredients = await _recipe_ingredients(payload)
     try:
-        result: Dict[str, Any] = run_simulation(str(payload.recipe_id))
+        result: Dict[str, Any] = await run_cpu_bound(
+            run_simulation,
+            str(payload.recipe_id),
+            ingredients=ingredients,
+            sampler=payload.sampler,
+            emission_models=payload.emission_models,
+            cost_models=payload.cost_models,
+            factors=factors,
+        )
+    except CapacityError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
     except Exception as exc:  # pylint: disable=broad-except
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Simulation failed: {exc}") from exc
 
@@ -38,10 +156,11 @@ async def simulate_recipe(payload: SimulationRequest) -> JSONResponse:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Simulation result missing keys: {sorted(missing)}")
 
     try:
-        insert_eco_result(
+        await run_blocking_io(
+            insert_eco_result,
             recipe_id=str(payload.recipe_id),
             eco_score=float(result["eco_score"]),
-            co2_saved=float(result["co2_saved_kg"]),
+            co2_saved_kg=float(result["co2_saved_kg"]),
             variance_cost=float(result["variance_cost"]),
             best_sources=list(result["best_sources"]),
             route_cluster=str(result["route_cluster"]),
@@ -49,5 +168,103 @@ async def simulate_recipe(payload: SimulationRequest) -> JSONResponse:
     except Exception as exc:  # pylint: disable=broad-except
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to store eco result: {exc}") from exc
 
-    response = SimulationResponse(**{key: result[key] for key in required_keys})
+    optional_keys = {"n_samples_used", "confidence_intervals", "supplier_stats"}
+    response = SimulationResponse(**{key: result[key] for key in required_keys | optional_keys if key in result})
     return JSONResponse(status_code=status.HTTP_201_CREATED, content=response.dict())
+
+
+@router.post("/sweep", response_model=SweepResponse, status_code=status.HTTP_200_OK)
+async def sweep_scenarios(payload: SweepRequest) -> SweepResponse:
+    """Evaluate a grid of weather, traffic and supplier-mix scenarios."""
+    try:
+        rows = await run_cpu_bound(
+            run_sweep,
+            weather_conditions=payload.weather_conditions,
+            traffic_ratios=payload.traffic_ratios,
+            supplier_mixes=payload.supplier_mixes,
+            n_samples=payload.n_samples,
+            seed=payload.seed,
+            emission_models=payload.emission_models,
+            cost_models=payload.cost_models,
+        )
+    except CapacityError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return SweepResponse(scenarios=[SweepRow(**row) for row in rows])
+
+
+@router.post("/jobs", response_model=SimulationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_simulation_job(payload: SimulationJobRequest) -> SimulationJobResponse:
+    """Queue a long-running simulation and return immediately with its job id."""
+    if payload.low_memory and payload.sampler != "mc":
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="low_memory mode only supports the 'mc' sampler")
+    try:
+        validate_models(payload.emission_models, payload.cost_models)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+
+    options = payload.dict(exclude={"recipe_id"})
+    job = get_job_manager().submit(str(payload.recipe_id), **options)
+    return SimulationJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        status_url=f"/simulate/jobs/{job.job_id}",
+        events_url=f"/simulate/jobs/{job.job_id}/events",
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=SimulationJobStatus)
+async def get_simulation_job(job_id: str) -> SimulationJobStatus:
+    """Poll the current state of a simulation job."""
+    try:
+        job = await run_blocking_io(get_job_manager().store.get, job_id)
+    except CapacityError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown job")
+    return SimulationJobStatus(job_id=job.job_id, status=job.status, progress=job.progress, result=job.result, error=job.error)
+
+
+async def _job_event_stream(job_id: str, after_seq: int) -> AsyncIterator[str]:
+    store = get_job_manager().store
+    last_sent = time.monotonic()
+    while True:
+        try:
+            events = await run_blocking_io(store.events, job_id, after_seq)
+            # A job purged by retention mid-stream never reaches a terminal event.
+            missing = not events and await run_blocking_io(store.get, job_id) is None
+        except CapacityError:
+            events, missing = [], False
+        if missing:
+            yield f"event: error\ndata: {json.dumps({'status': 'failed', 'error': 'Unknown job'})}\n\n"
+            return
+        for event in events:
+            after_seq = event.seq
+            last_sent = time.monotonic()
+            yield f"id: {event.seq}\nevent: {event.event}\ndata: {json.dumps(event.data)}\n\n"
+            if event.data.get("status") in TERMINAL_STATUSES:
+                return
+        if time.monotonic() - last_sent >= JOB_EVENT_HEARTBEAT_SECONDS:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(JOB_EVENT_POLL_SECONDS)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_simulation_job(job_id: str, last_event_id: Optional[int] = Header(default=None)) -> StreamingResponse:
+    """Server-sent events with status changes, interim intervals and the final result.
+
+    Reconnecting clients resume after the ``Last-Event-ID`` they last saw.
+    """
+    try:
+        job = await run_blocking_io(get_job_manager().store.get, job_id)
+    except CapacityError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown job")
+    return StreamingResponse(
+        _job_event_stream(job_id, last_event_id or 0),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
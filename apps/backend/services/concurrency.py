@@ -0,0 +1,129 @@
+"""Bounded executors that keep blocking work off the event loop."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_QUEUE_TIMEOUT_SECONDS = 5.0
+
+
+class CapacityError(RuntimeError):
+    """Raised when no execution slot frees up within the queue timeout."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class BoundedExecutor:
+    """Thread pool fronted by an admission limit.
+
+    At most ``max_in_flight`` calls are admitted (running or queued for one of
+    ``max_workers`` threads); further callers wait up to ``queue_timeout``
+    seconds for a slot and then fail fast with ``CapacityError``, so a slow
+    dependency cannot pile up unbounded work behind it.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_in_flight: int, queue_timeout: float) -> None:
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"bk-{name}")
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError as exc:
+            logger.warning("%s executor saturated (%d in flight)", self.name, self.max_in_flight)
+            raise CapacityError(f"{self.name} capacity exhausted; retry shortly") from exc
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_EXECUTORS: Dict[str, BoundedExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """Return the shared executor ``name``, sized by ``SIM_<NAME>_WORKERS`` and ``SIM_<NAME>_MAX_IN_FLIGHT``.
+
+    ``cpu`` runs simulations (default: one thread per core), ``io`` runs
+    blocking client calls such as Supabase writes. ``SIM_<NAME>_QUEUE_TIMEOUT_SECONDS``
+    bounds how long a request waits for a slot.
+    """
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(name)
+        if executor is None:
+            prefix = f"SIM_{name.upper()}"
+            default_workers = (os.cpu_count() or 1) if name == "cpu" else 8
+            workers = _env_int(f"{prefix}_WORKERS", default_workers)
+            executor = BoundedExecutor(
+                name,
+                max_workers=workers,
+                max_in_flight=_env_int(f"{prefix}_MAX_IN_FLIGHT", workers * 4),
+                queue_timeout=_env_float(f"{prefix}_QUEUE_TIMEOUT_SECONDS", DEFAULT_QUEUE_TIMEOUT_SECONDS),
+            )
+            _EXECUTORS[name] = executor
+        return executor
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await get_executor("cpu").run(func, *args, **kwargs)
+
+
+async def run_blocking_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await get_executor("io").run(func, *args, **kwargs)
+
+
+async def with_timeout(awaitable: Awaitable[T], seconds: Optional[float], fallback: T) -> T:
+    """Await ``awaitable`` for at most ``seconds``, returning ``fallback`` on timeout."""
+    try:
+        return await asyncio.wait_for(awaitable, timeout=seconds)
+    except asyncio.TimeoutError:
+        return fallback
+
+
+def shutdown_executors() -> None:
+    with _EXECUTORS_LOCK:
+        for executor in _EXECUTORS.values():
+            executor.shutdown()
+        _EXECUTORS.clear()
+
+
+__all__ = [
+    "BoundedExecutor",
+    "CapacityError",
+    "get_executor",
+    "run_blocking_io",
+    "run_cpu_bound",
+    "shutdown_executors",
+    "with_timeout",
+]
@@ -0,0 +1,217 @@
+"""Two-tier cache for generated recipes.
+
+L1 is a bounded in-process LRU keyed on the generation ``key_hash``; L2 is
+the Supabase ``gen_cache`` table. Lookups try L1 first and fill it from L2
+hits, stores write through to both, and both tiers honor the same TTL
+(``GEN_CACHE_TTL_DAYS``), so hot queries never leave the process.
+
+Requests served per key are counted in memory and flushed in batches to the
+``gen_cache.hit_count`` column, which the cache warmer ranks by.
+"""
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_L1_SIZE = 512
+SECONDS_PER_DAY = 86_400
+
+# ``loader(key_hash, ttl_days)`` returns ``(response_json, created_at)`` or None.
+L2Loader = Callable[[str, int], Optional[Tuple[Dict[str, Any], Optional[str]]]]
+L2Saver = Callable[..., None]
+# ``recorder({key_hash: requests})`` adds request counts to the persistent tier.
+HitRecorder = Callable[[Dict[str, int]], None]
+# Runs a blocking callable off the event loop, e.g. ``concurrency.run_blocking_io``.
+Offload = Callable[..., Awaitable[Any]]
+
+__all__ = ["GenerationCache", "created_timestamp", "get_generation_cache"]
+
+
+def created_timestamp(created_at: Optional[str]) -> float:
+    """Epoch seconds of a Supabase ``created_at`` value; now when missing or unparsable."""
+    if not created_at:
+        return time.time()
+    try:
+        parsed = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+    except ValueError:
+        return time.time()
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class GenerationCache:
+    """Thread-safe LRU of generation payloads in front of an optional persistent tier."""
+
+    def __init__(self, max_entries: int = DEFAULT_L1_SIZE) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer")
+        self.max_entries = max_entries
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loader: Optional[L2Loader] = None
+        self._saver: Optional[L2Saver] = None
+        self._recorder: Optional[HitRecorder] = None
+        self._requests: "Counter[str]" = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def configure_store(
+        self,
+        loader: Optional[L2Loader],
+        saver: Optional[L2Saver],
+        recorder: Optional[HitRecorder] = None,
+    ) -> None:
+        self._loader, self._saver, self._recorder = loader, saver, recorder
+
+    def _remember(self, key_hash: str, created: float, payload: Dict[str, Any]) -> None:
+        self._entries[key_hash] = (created, payload)
+        self._entries.move_to_end(key_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, key_hash: str, ttl_days: int, use_l2: bool) -> Tuple[Optional[Dict[str, Any]], str]:
+        cutoff = time.time() - ttl_days * SECONDS_PER_DAY
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is not None:
+                if entry[0] >= cutoff:
+                    self._entries.move_to_end(key_hash)
+                    return copy.deepcopy(entry[1]), "l1"
+                del self._entries[key_hash]
+        stored = None
+        if use_l2 and self._loader is not None:
+            try:
+                stored = self._loader(key_hash, ttl_days)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning("Generation cache lookup failed", exc_info=True)
+        if stored is None or not isinstance(stored[0], dict):
+            return None, "miss"
+        payload, created_at = stored
+        created = created_timestamp(created_at)
+        if created >= cutoff:
+            with self._lock:
+                self._remember(key_hash, created, payload)
+        return copy.deepcopy(payload), "l2"
+
+    def _count(self, tier: str) -> None:
+        with self._lock:
+            if tier == "l1":
+                self.l1_hits += 1
+            elif tier == "l2":
+                self.l2_hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key_hash: str, ttl_days: int) -> Optional[Dict[str, Any]]:
+        payload, tier = self._lookup(key_hash, ttl_days, use_l2=True)
+        self._count(tier)
+        return payload
+
+    async def aget(self, key_hash: str, ttl_days: int, offload: Offload) -> Optional[Dict[str, Any]]:
+        """``get`` for async callers: L1 answers inline, the L2 round-trip runs through ``offload``."""
+        payload, tier = self._lookup(key_hash, ttl_days, use_l2=False)
+        if tier == "miss" and self._loader is not None:
+            payload, tier = await offload(self._lookup, key_hash, ttl_days, True)
+        self._count(tier)
+        return payload
+
+    def peek(self, key_hash: str, ttl_days: int, use_l2: bool = False) -> Optional[Dict[str, Any]]:
+        """Like ``get`` but without touching the hit counters (for re-checks after a miss)."""
+        return self._lookup(key_hash, ttl_days, use_l2)[0]
+
+    async def apeek(self, key_hash: str, ttl_days: int, offload: Offload, use_l2: bool = False) -> Optional[Dict[str, Any]]:
+        payload, tier = self._lookup(key_hash, ttl_days, use_l2=False)
+        if tier == "miss" and use_l2 and self._loader is not None:
+            payload, _ = await offload(self._lookup, key_hash, ttl_days, True)
+        return payload
+
+    def put(self, key_hash: str, payload: Dict[str, Any], **metadata: Any) -> None:
+        """Store ``payload`` in L1 and write it through to L2 with ``metadata`` columns."""
+        with self._lock:
+            self._remember(key_hash, time.time(), copy.deepcopy(payload))
+        self._write_through(key_hash, payload, metadata)
+
+    async def aput(self, key_hash: str, payload: Dict[str, Any], offload: Offload, **metadata: Any) -> None:
+        with self._lock:
+            self._remember(key_hash, time.time(), copy.deepcopy(payload))
+        if self._saver is not None:
+            await offload(self._write_through, key_hash, payload, metadata)
+
+    def _write_through(self, key_hash: str, payload: Dict[str, Any], metadata: Dict[str, Any]) -> None:
+        if self._saver is None:
+            return
+        try:
+            self._saver(key_hash=key_hash, response_json=payload, **metadata)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Generation cache write failed", exc_info=True)
+
+    def record_request(self, key_hash: str) -> None:
+        """Count one request served by the entry ``key_hash`` (flushed by ``flush_requests``)."""
+        with self._lock:
+            self._requests[key_hash] += 1
+
+    def flush_requests(self) -> int:
+        """Add the pending request counts to the persistent tier; return how many keys were sent.
+
+        Counts are dropped if the write fails: they only rank warming
+        candidates, so losing a batch is preferable to growing without bound.
+        """
+        with self._lock:
+            pending, self._requests = dict(self._requests), Counter()
+        if not pending or self._recorder is None:
+            return 0
+        try:
+            self._recorder(pending)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Recording generation cache hits failed", exc_info=True)
+            return 0
+        return len(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.l1_hits + self.l2_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "l1_hits": self.l1_hits,
+                "l2_hits": self.l2_hits,
+                "misses": self.misses,
+                "l1_hit_ratio": self.l1_hits / lookups if lookups else 0.0,
+                "hit_ratio": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+                "pending_request_counts": len(self._requests),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._requests.clear()
+            self.l1_hits = 0
+            self.l2_hits = 0
+            self.misses = 0
+
+
+def _l1_size() -> int:
+    try:
+        return max(1, int(os.getenv("GEN_L1_CACHE_SIZE", DEFAULT_L1_SIZE)))
+    except (TypeError, ValueError):
+        return DEFAULT_L1_SIZE
+
+
+_CACHE = GenerationCache(_l1_size())
+
+
+def get_generation_cache() -> GenerationCache:
+    return _CACHE
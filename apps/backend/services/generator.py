@@ -1,53 +1,30 @@
-"""Recipe generation service backed by Hugging Face Inference API with Supabase caching."""
+"""Recipe generation service backed by a pluggable text-generation provider with Supabase caching."""
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
+import logging
 import os
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
-
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
-from packages.nlp_engine.parser import parse
-
+from contextlib import aclosing
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from packages.nlp_engine.normalize import normalize_ingredient, normalize_ingredients
+
+from .concurrency import run_blocking_io, run_cpu_bound
+from .gen_cache import created_timestamp, get_generation_cache
+from .partial_json import IncrementalRecipeParser, repair_json_object
+from .providers import get_provider
+from .scaling import rescale_recipe, scale_ingredient
+from .semantic_cache import get_semantic_index
+from .singleflight import get_single_flight
 from .supabase_client import get_client
 
-GEN_MODEL_DEFAULT = "mistralai/Mistral-7B-Instruct-v0.2"
-GEN_MAX_TOKENS_DEFAULT = 400
-GEN_TEMPERATURE_DEFAULT = 0.2
+logger = logging.getLogger(__name__)
+
 GEN_DEFAULT_SERVINGS = 1
 GEN_CACHE_TTL_DAYS_DEFAULT = 7
-REQUEST_TIMEOUT_DEFAULT = 20
-HF_MAX_RETRIES_DEFAULT = 2
-GEN_PROVIDER = "hf"
-
-
-def _create_session() -> requests.Session:
-    session = requests.Session()
-    retry_total = int(os.getenv("HF_MAX_RETRIES", HF_MAX_RETRIES_DEFAULT))
-    retry = Retry(
-        total=retry_total,
-        backoff_factor=0.5,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["POST"],
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
-    return session
-
-
-SESSION = _create_session()
-
-
-def _request_timeout() -> float:
-    try:
-        return float(os.getenv("REQUEST_TIMEOUT_SECONDS", REQUEST_TIMEOUT_DEFAULT))
-    except (TypeError, ValueError):
-        return REQUEST_TIMEOUT_DEFAULT
 
 
 def _get_env_int(name: str, default: int) -> int:
@@ -60,67 +37,23 @@ def _get_env_int(name: str, default: int) -> int:
 def build_prompt(query: str, servings: int) -> str:
     template = (
         "You are a culinary assistant. Generate a recipe as JSON ONLY with the following schema: "
-        '{"title": str, "servings": int, "ingredients": [{"name": str, "quantity": number|null, "unit": str|null}], "steps": [str, ...]}. '
+        '{{"title": str, "servings": int, "ingredients": [{{"name": str, "quantity": number|null, "unit": str|null}}], "steps": [str, ...]}}. '
         "Use concise ingredient names, realistic quantities for {servings} servings, prefer US customary units, "
         "and avoid brand names. Respond with valid JSON and nothing else. Query: {query}"
     )
     return template.format(query=query.strip(), servings=servings)
 
 
-def _hf_call(prompt: str) -> str:
-    model_id = os.getenv("GEN_MODEL", GEN_MODEL_DEFAULT)
-    token = os.getenv("HF_API_TOKEN")
-    if not token:
-        raise RuntimeError("HF_API_TOKEN is required for generation")
-
-    max_tokens = _get_env_int("GEN_MAX_TOKENS", GEN_MAX_TOKENS_DEFAULT)
-    temperature = float(os.getenv("GEN_TEMPERATURE", GEN_TEMPERATURE_DEFAULT))
-
-    url = f"https://api-inference.huggingface.co/models/{model_id}"
-    headers = {"Authorization": f"Bearer {token}"}
-    payload = {
-        "inputs": prompt,
-        "parameters": {
-            "max_new_tokens": max_tokens,
-            "temperature": temperature,
-            "return_full_text": False,
-        },
-    }
-
-    try:
-        response = SESSION.post(url, headers=headers, json=payload, timeout=_request_timeout())
-    except requests.RequestException as exc:
-        raise RuntimeError(f"HF inference request failed: {exc}") from exc
-
-    if response.status_code >= 400:
-        snippet = response.text[:200]
-        raise RuntimeError(f"HF inference failed ({response.status_code}): {snippet}")
-
-    data = response.json()
-    if isinstance(data, list) and data:
-        generated = data[0]
-        if isinstance(generated, dict) and "generated_text" in generated:
-            return generated["generated_text"]
-        if isinstance(generated, str):
-            return generated
-    if isinstance(data, dict) and "generated_text" in data:
-        return data["generated_text"]
-    if isinstance(data, str):
-        return data
-    raise RuntimeError("HF inference returned unexpected payload")
-
-
-def _cache_lookup(key_hash: str, ttl_days: int) -> Optional[Dict[str, Any]]:
-    try:
-        client = get_client()
-    except RuntimeError:
+def _cache_lookup(key_hash: str, ttl_days: int) -> Optional[Tuple[Dict[str, Any], Optional[str]]]:
+    client = get_client()
+    if client is None:
         return None
 
     threshold = (datetime.utcnow() - timedelta(days=ttl_days)).isoformat()
     try:
         response = (
             client.table("gen_cache")
-            .select("response_json")
+            .select("response_json,created_at")
             .eq("key_hash", key_hash)
             .gte("created_at", threshold)
             .limit(1)
@@ -130,7 +63,8 @@ def _cache_lookup(key_hash: str, ttl_days: int) -> Optional[Dict[str, Any]]:
         return None
     if not response.data:
         return None
-    return response.data[0].get("response_json")
+    row = response.data[0]
+    return row.get("response_json"), row.get("created_at")
 
 
 def _cache_store(
@@ -141,9 +75,8 @@ def _cache_store(
     model: str,
     response_json: Dict[str, Any],
 ) -> None:
-    try:
-        client = get_client()
-    except RuntimeError:
+    client = get_client()
+    if client is None:
         return
     payload = {
         "key_hash": key_hash,
@@ -152,6 +85,8 @@ def _cache_store(
         "provider": provider,
         "model": model,
         "response_json": response_json,
+        # A regenerated entry starts a new TTL window (the cleanup job purges by created_at).
+        "created_at": datetime.now(timezone.utc).isoformat(),
     }
     try:
         client.table("gen_cache").upsert(payload, on_conflict="key_hash").execute()
@@ -159,6 +94,72 @@ def _cache_store(
         return
 
 
+def _record_hits(counts: Dict[str, int]) -> None:
+    client = get_client()
+    if client is None:
+        return
+    keys = sorted(counts)
+    client.rpc("gen_cache_record_hits", {"p_keys": keys, "p_counts": [counts[key] for key in keys]}).execute()
+
+
+def popular_generations(limit: int) -> List[Dict[str, Any]]:
+    """Most requested cache entries of the current provider/model that were hit within the TTL.
+
+    Each row has ``key_hash``, ``query``, ``servings``, ``hit_count`` and
+    ``created`` (epoch seconds); empty when Supabase is unavailable.
+    """
+    client = get_client()
+    if client is None:
+        return []
+    ttl_days = _get_env_int("GEN_CACHE_TTL_DAYS", GEN_CACHE_TTL_DAYS_DEFAULT)
+    recent = (datetime.now(timezone.utc) - timedelta(days=ttl_days)).isoformat()
+    response = (
+        client.table("gen_cache")
+        .select("key_hash,query_text,servings,hit_count,created_at")
+        .eq("provider", PROVIDER.name)
+        .eq("model", PROVIDER.model_id)
+        .gte("last_hit_at", recent)
+        .order("hit_count", desc=True)
+        .limit(limit)
+        .execute()
+    )
+    return [
+        {
+            "key_hash": row["key_hash"],
+            "query": row["query_text"],
+            "servings": row.get("servings") or GEN_DEFAULT_SERVINGS,
+            "hit_count": row.get("hit_count") or 0,
+            "created": created_timestamp(row.get("created_at")),
+        }
+        for row in response.data or []
+    ]
+
+
+PROVIDER = get_provider()
+GENERATION_CACHE = get_generation_cache()
+GENERATION_CACHE.configure_store(_cache_lookup, _cache_store, _record_hits)
+SINGLE_FLIGHT = get_single_flight()
+SEMANTIC_INDEX = get_semantic_index()
+
+
+# How generator outputs were decoded: valid JSON, recovered by repair, or only
+# after a second model call (``failed`` counts retries that did not help).
+DECODE_STATS: Dict[str, int] = {"strict": 0, "repaired": 0, "retried": 0, "failed": 0}
+
+
+def decode_stats() -> Dict[str, Any]:
+    decoded = DECODE_STATS["strict"] + DECODE_STATS["repaired"] + DECODE_STATS["retried"]
+    return {**DECODE_STATS, "retry_rate": DECODE_STATS["retried"] / decoded if decoded else 0.0}
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the generation caches and request coalescing, plus decode retry rates."""
+    stats = {**GENERATION_CACHE.stats(), "single_flight": SINGLE_FLIGHT.stats(), "decoding": decode_stats()}
+    if SEMANTIC_INDEX is not None:
+        stats["semantic"] = SEMANTIC_INDEX.stats()
+    return stats
+
+
 def merge_ingredients(gen_list: List[Dict[str, Any]], parsed: Dict[str, Any]) -> List[Dict[str, Any]]:
     parsed_items = parsed.get("ingredients") if isinstance(parsed, dict) else None
     parsed_map: Dict[str, Dict[str, Any]] = {}
@@ -228,43 +229,216 @@ def _sanitized_steps(raw: Any) -> List[str]:
     return []
 
 
-def generate_recipe(query: str, servings: Optional[int], assumed: bool) -> Dict[str, Any]:
+def _cache_key(query: str, servings: Optional[int]) -> Tuple[str, int, int, str]:
+    """Model id, TTL, effective servings and ``key_hash`` for a generation request.
+
+    Servings are not part of the key: a cached recipe is rescaled to the
+    requested servings instead of being regenerated.
+    """
     if not query or not query.strip():
         raise ValueError("Query text is required")
 
-    model_id = os.getenv("GEN_MODEL", GEN_MODEL_DEFAULT)
+    model_id = PROVIDER.model_id
     ttl_days = _get_env_int("GEN_CACHE_TTL_DAYS", GEN_CACHE_TTL_DAYS_DEFAULT)
     effective_servings = servings or _get_env_int("GEN_DEFAULT_SERVINGS", GEN_DEFAULT_SERVINGS)
 
-    cache_key_source = f"{query}|{effective_servings}|{GEN_PROVIDER}|{model_id}"
+    cache_key_source = f"{query}|{PROVIDER.name}|{model_id}"
     key_hash = hashlib.sha256(cache_key_source.encode("utf-8")).hexdigest()
+    return model_id, ttl_days, effective_servings, key_hash
+
+
+async def generate_recipe(query: str, servings: Optional[int], assumed: bool) -> Dict[str, Any]:
+    model_id, ttl_days, effective_servings, key_hash = _cache_key(query, servings)
+
+    cached = await GENERATION_CACHE.aget(key_hash, ttl_days, run_blocking_io)
+    if cached is not None:
+        GENERATION_CACHE.record_request(key_hash)
+        return _personalise(cached, effective_servings, assumed)
+
+    similar = await _semantic_lookup(query, model_id, ttl_days)
+    if similar is not None:
+        return _personalise(similar, effective_servings, assumed)
+
+    # Concurrent misses for the same key share one model call (whatever
+    # servings each asked for); the re-check reaches Supabase only when
+    # flights are also coordinated across workers.
+    generated = await SINGLE_FLIGHT.ado(
+        key_hash,
+        lambda: _generate(query, effective_servings, assumed, model_id, key_hash),
+        recheck=lambda: GENERATION_CACHE.apeek(
+            key_hash, ttl_days, run_blocking_io, use_l2=SINGLE_FLIGHT.lock_dir is not None
+        ),
+    )
+    GENERATION_CACHE.record_request(key_hash)
+    return _personalise(generated, effective_servings, assumed)
+
+
+async def refresh_recipe(query: str, servings: int) -> Dict[str, Any]:
+    """Regenerate and re-store ``query`` whatever is cached (for the cache warmer).
+
+    Shares the single-flight key with live requests, so a refresh and a
+    concurrent miss for the same query make one model call.
+    """
+    model_id, _, effective_servings, key_hash = _cache_key(query, servings)
+    return await SINGLE_FLIGHT.ado(key_hash, lambda: _generate(query, effective_servings, False, model_id, key_hash))
+
+
+def _semantic_scope(model_id: str) -> str:
+    return f"{PROVIDER.name}|{model_id}"
+
+
+async def _semantic_lookup(query: str, model_id: str, ttl_days: int) -> Optional[Dict[str, Any]]:
+    """Cached payload of a near-duplicate earlier query, if one is still cached."""
+    if SEMANTIC_INDEX is None:
+        return None
+    # Embedding may be a model forward pass (sentence-transformers), so keep it off the loop.
+    match = await run_blocking_io(SEMANTIC_INDEX.search, query, _semantic_scope(model_id), ttl_days)
+    if match is None:
+        return None
+    payload = await GENERATION_CACHE.apeek(match.key_hash, ttl_days, run_blocking_io, use_l2=True)
+    if payload is not None:
+        GENERATION_CACHE.record_request(match.key_hash)
+        logger.debug("Semantic cache hit for %r via %r (%.3f)", query, match.query, match.similarity)
+    return payload
+
+
+def _personalise(payload: Dict[str, Any], servings: int, assumed: bool) -> Dict[str, Any]:
+    scaled = rescale_recipe(payload, servings)
+    scaled["servings_assumed"] = assumed
+    return scaled
 
-    cached = _cache_lookup(key_hash, ttl_days)
-    if isinstance(cached, dict):
-        return cached
 
+def _index_generation(query: str, key_hash: str, servings: int, model_id: str) -> None:
+    if SEMANTIC_INDEX is None:
+        return
+    SEMANTIC_INDEX.add(query, key_hash, servings, _semantic_scope(model_id))
+    try:
+        SEMANTIC_INDEX.save_if_due()
+    except OSError:
+        logger.warning("Failed to persist the semantic index", exc_info=True)
+
+
+def _usable_repair(candidate: Optional[Dict[str, Any]]) -> bool:
+    """A repaired object is only worth caching if it still has ingredients and steps."""
+    return (
+        candidate is not None
+        and isinstance(candidate.get("ingredients"), list)
+        and bool(candidate["ingredients"])
+        and isinstance(candidate.get("steps"), list)
+        and bool(candidate["steps"])
+    )
+
+
+async def _decode_candidate(raw_output: str, prompt: str) -> Dict[str, Any]:
+    """Decode the generator output, repairing it before paying for a second model call.
+
+    Strict JSON is used as-is. Otherwise ``repair_json_object`` recovers the
+    object from surrounding prose, loose quoting or truncation; only when that
+    leaves no usable recipe is the prompt re-issued with "Return VALID JSON only".
+    """
+    try:
+        candidate = json.loads(raw_output)
+    except json.JSONDecodeError:
+        candidate = None
+    if candidate is not None:
+        if not isinstance(candidate, dict):
+            raise RuntimeError("Generator payload must be a JSON object")
+        DECODE_STATS["strict"] += 1
+        return candidate
+
+    repaired = repair_json_object(raw_output)
+    if _usable_repair(repaired):
+        DECODE_STATS["repaired"] += 1
+        return repaired  # type: ignore[return-value]
+
+    DECODE_STATS["retried"] += 1
+    logger.info("Generator output was not recoverable JSON; retrying once")
+    raw_output = await PROVIDER.complete(f"{prompt}\nReturn VALID JSON only.")
+    try:
+        candidate = json.loads(raw_output)
+    except json.JSONDecodeError:
+        candidate = repair_json_object(raw_output)
+        if not _usable_repair(candidate):
+            DECODE_STATS["failed"] += 1
+            raise RuntimeError("Generator returned non-JSON payload") from None
+    if not isinstance(candidate, dict):
+        DECODE_STATS["failed"] += 1
+        raise RuntimeError("Generator payload must be a JSON object")
+    return candidate
+
+
+async def _generate(query: str, effective_servings: int, assumed: bool, model_id: str, key_hash: str) -> Dict[str, Any]:
     prompt = build_prompt(query, effective_servings)
     try:
-        raw_output = _hf_call(prompt)
+        raw_output = await PROVIDER.complete(prompt)
     except RuntimeError as exc:
         raise RuntimeError(f"Failed to generate recipe: {exc}") from exc
 
-    for attempt in range(2):
-        try:
-            candidate = json.loads(raw_output)
-            break
-        except json.JSONDecodeError:
-            if attempt == 0:
-                prompt = f"{prompt}\nReturn VALID JSON only."
-                raw_output = _hf_call(prompt)
-            else:
-                raise RuntimeError("Generator returned non-JSON payload") from None
-    else:  # pragma: no cover - loop exhausts only when both attempts fail
-        raise RuntimeError("Generator parsing failed")
+    candidate = await _decode_candidate(raw_output, prompt)
+    return await _finalize(candidate, query, effective_servings, assumed, model_id, key_hash)
 
-    if not isinstance(candidate, dict):
-        raise RuntimeError("Generator payload must be a JSON object")
 
+def _named_ingredients(raw: Any) -> List[Dict[str, Any]]:
+    """Generator ingredient records that have a name, otherwise untouched."""
+    if not isinstance(raw, list):
+        return []
+    return [entry for entry in raw if isinstance(entry, dict) and str(entry.get("name") or "").strip()]
+
+
+def _extract(text: str) -> Dict[str, Any]:
+    # Imported on first use: the extractor pulls in torch and transformers,
+    # which well-formed generator output (and the stub provider) never needs.
+    from packages.nlp_engine.parser import parse  # pylint: disable=import-outside-toplevel
+
+    return parse(text)
+
+
+def _bullet_line(item: Dict[str, Any]) -> str:
+    quantity = item.get("quantity")
+    if isinstance(quantity, float) and quantity.is_integer():
+        quantity = int(quantity)
+    parts = [part for part in [quantity, item.get("unit"), item.get("name")] if part not in (None, "")]
+    return "• " + " ".join(str(part) for part in parts)
+
+
+async def _normalize_generated_ingredients(items: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    """Normalise the generator's structured ingredients without the extractor models.
+
+    Units and names get the same clean-up ``parse`` applies; only records that
+    fail validation are rendered as bullet lines and re-parsed. With no usable
+    ingredients at all the query itself is parsed, as before.
+    """
+    if not items:
+        parsed_output = await run_cpu_bound(_extract, query)
+        return merge_ingredients([], parsed_output if isinstance(parsed_output, dict) else {})
+
+    normalized, failed = normalize_ingredients(items)
+    if not failed:
+        return [item for item in normalized if item is not None]
+
+    # Each rejected record is re-parsed on its own line so the extractor's
+    # records go back at that record's position; when it finds nothing the
+    # record is kept with whatever fields could be salvaged.
+    parsed_outputs = await asyncio.gather(
+        *(run_cpu_bound(_extract, _bullet_line(items[position])) for position in failed)
+    )
+    slots: List[List[Dict[str, Any]]] = [[item] if item is not None else [] for item in normalized]
+    for position, parsed_output in zip(failed, parsed_outputs):
+        repaired = merge_ingredients([], parsed_output if isinstance(parsed_output, dict) else {})
+        if not repaired:
+            repaired = _sanitize_ingredients([items[position]])
+        slots[position] = [normalize_ingredient(item)[0] for item in repaired]
+    return [item for slot in slots for item in slot]
+
+
+async def _finalize(
+    candidate: Dict[str, Any],
+    query: str,
+    effective_servings: int,
+    assumed: bool,
+    model_id: str,
+    key_hash: str,
+) -> Dict[str, Any]:
     title = str(candidate.get("title") or query).strip()
     gen_servings = candidate.get("servings")
     try:
@@ -272,21 +446,10 @@ def generate_recipe(query: str, servings: Optional[int], assumed: bool) -> Dict[
     except (TypeError, ValueError):
         gen_servings_int = effective_servings
 
-    generator_ingredients = _sanitize_ingredients(candidate.get("ingredients"))
+    generator_ingredients = _named_ingredients(candidate.get("ingredients"))
     steps = _sanitized_steps(candidate.get("steps"))
 
-    bullet_lines = []
-    for item in generator_ingredients:
-        quantity = item.get("quantity")
-        if isinstance(quantity, float) and quantity.is_integer():
-            quantity = int(quantity)
-        parts = [part for part in [quantity, item.get("unit"), item.get("name")] if part not in (None, "")]
-        if not parts:
-            continue
-        bullet_lines.append("• " + " ".join(str(part) for part in parts))
-
-    parsed_output = parse("\n".join(bullet_lines) if bullet_lines else query)
-    merged_ingredients = merge_ingredients(generator_ingredients, parsed_output if isinstance(parsed_output, dict) else {})
+    merged_ingredients = await _normalize_generated_ingredients(generator_ingredients, query)
 
     payload = {
         "mode": "generate",
@@ -299,13 +462,152 @@ def generate_recipe(query: str, servings: Optional[int], assumed: bool) -> Dict[
         "model": model_id,
     }
 
-    _cache_store(
-        key_hash=key_hash,
+    await GENERATION_CACHE.aput(
+        key_hash,
+        payload,
+        run_blocking_io,
         query=query,
         servings=gen_servings_int,
-        provider=GEN_PROVIDER,
+        provider=PROVIDER.name,
         model=model_id,
-        response_json=payload,
     )
+    await run_blocking_io(_index_generation, query, key_hash, gen_servings_int, model_id)
 
     return payload
+
+
+def _replay(recipe: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """The parts of a finished recipe as the events ``stream_recipe`` emits while generating."""
+    yield "title", {"title": recipe.get("title")}
+    yield "servings", {"servings": recipe.get("servings")}
+    for item in recipe.get("ingredients") or []:
+        yield "ingredient", item
+    for index, step in enumerate(recipe.get("steps") or []):
+        yield "step", {"index": index, "text": step}
+
+
+async def _stream_generation(
+    query: str,
+    effective_servings: int,
+    assumed: bool,
+    model_id: str,
+    key_hash: str,
+    emit: Callable[[Tuple[str, Dict[str, Any]]], None],
+) -> Dict[str, Any]:
+    """``_generate`` over the provider's token stream, passing each completed part to ``emit``.
+
+    Parts are emitted for ``effective_servings``: the ``servings`` event
+    carries the requested count and ingredient quantities are scaled from the
+    servings the model wrote, as the final payload is. Ingredients that arrive
+    before the model's ``servings`` are held until it (or the first step) does.
+    """
+    prompt = build_prompt(query, effective_servings)
+    parser = IncrementalRecipeParser()
+    steps_sent = 0
+    factor: Optional[float] = None
+    held: List[Dict[str, Any]] = []
+
+    def settle(generated_servings: Optional[int]) -> None:
+        nonlocal factor
+        if factor is not None:
+            return
+        factor = effective_servings / generated_servings if generated_servings and generated_servings > 0 else 1.0
+        for record in held:
+            emit(("ingredient", scale_ingredient(record, factor)))
+        held.clear()
+
+    def emit_ingredient(record: Dict[str, Any]) -> None:
+        if factor is None:
+            held.append(record)
+        else:
+            emit(("ingredient", scale_ingredient(record, factor)))
+
+    try:
+        async with aclosing(PROVIDER.stream(prompt)) as tokens:
+            async for text in tokens:
+                for event, value in parser.feed(text):
+                    if event == "ingredient":
+                        for item in _named_ingredients([value]):
+                            record, ok = normalize_ingredient(item)
+                            emit_ingredient(record if ok else _sanitize_ingredients([item])[0])
+                    elif event == "servings":
+                        settle(value)
+                        emit(("servings", {"servings": effective_servings}))
+                    elif event == "step":
+                        settle(None)
+                        emit(("step", {"index": steps_sent, "text": value}))
+                        steps_sent += 1
+                    else:
+                        emit((event, {event: value}))
+                if parser.complete:
+                    break
+    except RuntimeError as exc:
+        raise RuntimeError(f"Failed to generate recipe: {exc}") from exc
+    settle(None)
+
+    candidate = parser.result()
+    if candidate is not None:
+        DECODE_STATS["strict"] += 1
+    else:
+        candidate = await _decode_candidate(parser.text, prompt)
+    return await _finalize(candidate, query, effective_servings, assumed, model_id, key_hash)
+
+
+async def stream_recipe(query: str, servings: Optional[int], assumed: bool) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Generate a recipe, yielding ``(event, data)`` pairs as soon as each part is complete.
+
+    Emits ``title``, ``servings``, one ``ingredient`` per item and one ``step``
+    per instruction while tokens stream in, then a ``result`` carrying the same
+    payload ``generate_recipe`` returns (after extractor merge and caching).
+    Cached (or near-duplicate) recipes replay their parts immediately. A miss
+    joins the single flight for its key: the leader streams live, while callers
+    that joined an in-flight generation replay its parts once it finishes.
+    """
+    model_id, ttl_days, effective_servings, key_hash = _cache_key(query, servings)
+
+    cached = await GENERATION_CACHE.aget(key_hash, ttl_days, run_blocking_io)
+    if cached is not None:
+        GENERATION_CACHE.record_request(key_hash)
+    else:
+        cached = await _semantic_lookup(query, model_id, ttl_days)
+    if cached is not None:
+        cached = _personalise(cached, effective_servings, assumed)
+        for event in _replay(cached):
+            yield event
+        yield "result", {"cached": True, "recipe": cached}
+        return
+
+    events: "asyncio.Queue[Tuple[str, Dict[str, Any]]]" = asyncio.Queue()
+    flight = asyncio.ensure_future(
+        SINGLE_FLIGHT.ado(
+            key_hash,
+            lambda: _stream_generation(query, effective_servings, assumed, model_id, key_hash, events.put_nowait),
+            recheck=lambda: GENERATION_CACHE.apeek(
+                key_hash, ttl_days, run_blocking_io, use_l2=SINGLE_FLIGHT.lock_dir is not None
+            ),
+        )
+    )
+    streamed = False
+    try:
+        while not flight.done():
+            next_event = asyncio.ensure_future(events.get())
+            await asyncio.wait({next_event, flight}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_event.done():
+                next_event.cancel()
+                break
+            streamed = True
+            yield next_event.result()
+        while not events.empty():
+            streamed = True
+            yield events.get_nowait()
+        generated = await flight
+    finally:
+        # A leader's generation runs on in its own task for any followers.
+        flight.cancel()
+
+    payload = _personalise(generated, effective_servings, assumed)
+    GENERATION_CACHE.record_request(key_hash)
+    if not streamed:
+        for event in _replay(payload):
+            yield event
+    yield "result", {"cached": False, "recipe": payload}
@@ -0,0 +1,192 @@
+"""Shared pooled async HTTP client for outbound calls.
+
+One ``httpx.AsyncClient`` per event loop keeps connections alive (HTTP/2 when
+the ``h2`` package is installed), caps connections per host and retries
+transient failures with the same policy the old ``requests`` sessions used:
+``HF_MAX_RETRIES`` attempts on connection errors and 429/5xx responses, with
+urllib3-style exponential backoff (``0.5 * 2**(n-1)`` seconds, first retry
+immediate) and ``Retry-After`` honoured on 429/503.
+
+Retries and per-host limits live in the transport, so every caller of
+``get_http_client()`` gets them, including code that only sees an
+``httpx.AsyncClient`` (e.g. the simulation factor fetchers).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_AFTER_STATUSES = frozenset({429, 503})
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_BACKOFF_MAX = 120.0
+HF_MAX_RETRIES_DEFAULT = 2
+REQUEST_TIMEOUT_DEFAULT = 20.0
+CONNECT_TIMEOUT_DEFAULT = 5.0
+MAX_CONNECTIONS_DEFAULT = 100
+MAX_PER_HOST_DEFAULT = 10
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+try:  # HTTP/2 needs the optional ``h2`` package
+    import h2  # noqa: F401  # pylint: disable=unused-import
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HTTP2_AVAILABLE = False
+
+__all__ = [
+    "HTTP2_AVAILABLE",
+    "RetryTransport",
+    "aclose_http_client",
+    "backoff_seconds",
+    "get_http_client",
+]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def backoff_seconds(retry_number: int, factor: float = RETRY_BACKOFF_FACTOR) -> float:
+    """Sleep before retry ``retry_number`` (1-based), matching urllib3's ``Retry``."""
+    if retry_number <= 1:
+        return 0.0
+    return min(RETRY_BACKOFF_MAX, factor * (2 ** (retry_number - 1)))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None or response.status_code not in RETRY_AFTER_STATUSES:
+        return None
+    try:
+        return max(0.0, min(RETRY_BACKOFF_MAX, float(value)))
+    except ValueError:
+        return None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its per-host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, slot: asyncio.Semaphore) -> None:
+        self._stream = stream
+        self._slot: Optional[asyncio.Semaphore] = slot
+
+    async def __aiter__(self):  # type: ignore[override]
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._slot is not None:
+                self._slot.release()
+                self._slot = None
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Wrap a transport with per-host concurrency limits and retry/backoff."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, retries: int, max_per_host: int) -> None:
+        self._transport = transport
+        self.retries = max(0, retries)
+        self.max_per_host = max(1, max_per_host)
+        self._slots: Dict[Tuple[bytes, bytes, Optional[int]], asyncio.Semaphore] = {}
+
+    def _slot(self, request: httpx.Request) -> asyncio.Semaphore:
+        origin = (request.url.raw_scheme, request.url.raw_host, request.url.port)
+        slot = self._slots.get(origin)
+        if slot is None:
+            slot = self._slots[origin] = asyncio.Semaphore(self.max_per_host)
+        return slot
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slot = self._slot(request)
+        attempt = 0
+        while True:
+            await slot.acquire()
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadError, httpx.RemoteProtocolError):
+                slot.release()
+                if attempt >= self.retries:
+                    raise
+                attempt += 1
+                logger.debug("Retrying %s %s after connection error (%d/%d)", request.method, request.url.host, attempt, self.retries)
+                await asyncio.sleep(backoff_seconds(attempt))
+                continue
+            except BaseException:
+                slot.release()
+                raise
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                delay = _retry_after(response)
+                await response.aclose()
+                slot.release()
+                attempt += 1
+                logger.debug("Retrying %s %s after HTTP %d (%d/%d)", request.method, request.url.host, response.status_code, attempt, self.retries)
+                await asyncio.sleep(delay if delay is not None else backoff_seconds(attempt))
+                continue
+            if isinstance(response.stream, httpx.ByteStream):
+                slot.release()  # body already in memory; no connection held
+            else:
+                response.stream = _ReleasingStream(response.stream, slot)  # type: ignore[arg-type]
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _build_client() -> httpx.AsyncClient:
+    max_connections = _env_int("HTTP_MAX_CONNECTIONS", MAX_CONNECTIONS_DEFAULT)
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+    )
+    transport = RetryTransport(
+        httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, limits=limits),
+        retries=_env_int("HF_MAX_RETRIES", HF_MAX_RETRIES_DEFAULT),
+        max_per_host=_env_int("HTTP_MAX_CONNECTIONS_PER_HOST", MAX_PER_HOST_DEFAULT),
+    )
+    timeout = httpx.Timeout(
+        _env_float("REQUEST_TIMEOUT_SECONDS", REQUEST_TIMEOUT_DEFAULT),
+        connect=_env_float("HTTP_CONNECT_TIMEOUT_SECONDS", CONNECT_TIMEOUT_DEFAULT),
+    )
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+
+_CLIENTS: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The pooled client for the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        for stale in [other for other in _CLIENTS if other.is_closed()]:
+            _CLIENTS.pop(stale, None)
+        client = _CLIENTS[loop] = _build_client()
+    return client
+
+
+async def aclose_http_client() -> None:
+    """Close the running loop's client, e.g. on application shutdown."""
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
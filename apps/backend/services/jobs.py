@@ -0,0 +1,354 @@
+"""Background simulation jobs with pluggable state storage.
+
+Jobs run ``run_simulation`` on a local thread pool. Their state and an
+append-only event log (progress, result, error) live in a ``JobStore``: the
+in-memory store suits a single worker, the SQLite store lets several worker
+processes on one host share jobs without external services. Select with
+``SIM_JOB_BACKEND`` (``memory`` or ``sqlite``) and ``SIM_JOB_DB_PATH``.
+Finished jobs and their events are purged ``SIM_JOB_RETENTION_SECONDS`` after
+they finish.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from packages.simulation_engine.montecarlo import run_simulation
+
+from .supabase_client import insert_eco_result
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+TERMINAL_STATUSES = ("succeeded", "failed")
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_DB_PATH = "simulation_jobs.sqlite3"
+DEFAULT_RETENTION_SECONDS = 86_400.0
+PURGE_INTERVAL_SECONDS = 60.0
+
+
+@dataclass
+class JobEvent:
+    seq: int
+    event: str
+    data: Dict[str, Any]
+
+
+@dataclass
+class Job:
+    job_id: str
+    status: str
+    params: Dict[str, Any]
+    created_at: float
+    updated_at: float
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+
+
+class JobStore(ABC):
+    """Interface for job state backends."""
+
+    @abstractmethod
+    def create(self, job: Job) -> None:
+        """Store a new job with an empty event log."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """A copy of the job, or None when unknown (or purged)."""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Set ``fields`` on the job and bump ``updated_at``."""
+
+    @abstractmethod
+    def append_event(self, job_id: str, event: str, data: Dict[str, Any]) -> int:
+        """Append to the job's event log and return the new sequence number."""
+
+    @abstractmethod
+    def events(self, job_id: str, after_seq: int = 0) -> List[JobEvent]:
+        """Events with ``seq > after_seq``, oldest first."""
+
+    @abstractmethod
+    def purge(self, finished_before: float) -> int:
+        """Delete finished jobs last updated before ``finished_before`` and their events; return how many."""
+
+
+class InMemoryJobStore(JobStore):
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Job] = {}
+        self._events: Dict[str, List[JobEvent]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = Job(**job.__dict__)
+            self._events[job.job_id] = []
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else Job(**{**job.__dict__, "progress": dict(job.progress)})
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated_at = time.time()
+
+    def append_event(self, job_id: str, event: str, data: Dict[str, Any]) -> int:
+        with self._lock:
+            log = self._events[job_id]
+            log.append(JobEvent(seq=len(log) + 1, event=event, data=data))
+            return len(log)
+
+    def events(self, job_id: str, after_seq: int = 0) -> List[JobEvent]:
+        with self._lock:
+            return list(self._events.get(job_id, [])[after_seq:])
+
+    def purge(self, finished_before: float) -> int:
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.status in TERMINAL_STATUSES and job.updated_at < finished_before
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+                self._events.pop(job_id, None)
+        return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    _JSON_FIELDS = ("params", "result", "progress")
+
+    def __init__(self, path: str = DEFAULT_DB_PATH) -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS simulation_jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, params TEXT NOT NULL, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+                "result TEXT, error TEXT, progress TEXT NOT NULL DEFAULT '{}')"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS simulation_job_events ("
+                "job_id TEXT NOT NULL, seq INTEGER NOT NULL, event TEXT NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (job_id, seq))"
+            )
+
+    def create(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO simulation_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.job_id,
+                    job.status,
+                    json.dumps(job.params),
+                    job.created_at,
+                    job.updated_at,
+                    json.dumps(job.result) if job.result is not None else None,
+                    job.error,
+                    json.dumps(job.progress),
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, status, params, created_at, updated_at, result, error, progress "
+                "FROM simulation_jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, status, params, created_at, updated_at, result, error, progress = row
+        return Job(
+            job_id=job_id,
+            status=status,
+            params=json.loads(params),
+            created_at=created_at,
+            updated_at=updated_at,
+            result=json.loads(result) if result else None,
+            error=error,
+            progress=json.loads(progress or "{}"),
+        )
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        values = [json.dumps(value) if name in self._JSON_FIELDS and value is not None else value for name, value in fields.items()]
+        with self._lock:
+            self._conn.execute(f"UPDATE simulation_jobs SET {columns} WHERE job_id = ?", (*values, job_id))
+
+    def append_event(self, job_id: str, event: str, data: Dict[str, Any]) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                (last,) = self._conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM simulation_job_events WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT INTO simulation_job_events VALUES (?, ?, ?, ?)", (job_id, last + 1, event, json.dumps(data))
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return last + 1
+
+    def events(self, job_id: str, after_seq: int = 0) -> List[JobEvent]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, event, data FROM simulation_job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after_seq),
+            ).fetchall()
+        return [JobEvent(seq=seq, event=event, data=json.loads(data)) for seq, event, data in rows]
+
+    def purge(self, finished_before: float) -> int:
+        placeholders = ", ".join("?" for _ in TERMINAL_STATUSES)
+        expired = f"SELECT job_id FROM simulation_jobs WHERE status IN ({placeholders}) AND updated_at < ?"
+        params = (*TERMINAL_STATUSES, finished_before)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(f"DELETE FROM simulation_job_events WHERE job_id IN ({expired})", params)
+                removed = self._conn.execute(f"DELETE FROM simulation_jobs WHERE job_id IN ({expired})", params).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return removed
+
+
+def create_job_store(backend: Optional[str] = None) -> JobStore:
+    backend = (backend or os.getenv("SIM_JOB_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore(os.getenv("SIM_JOB_DB_PATH", DEFAULT_DB_PATH))
+    raise ValueError(f"Unknown job backend '{backend}'. Expected 'memory' or 'sqlite'")
+
+
+class JobManager:
+    """Queue simulations on a local worker pool and record their lifecycle in a ``JobStore``."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = DEFAULT_JOB_WORKERS,
+        persist: Callable[..., Any] = insert_eco_result,
+        retention: float = DEFAULT_RETENTION_SECONDS,
+    ) -> None:
+        if retention <= 0:
+            raise ValueError("retention must be positive")
+        self.store = store
+        self.retention = retention
+        self._persist = persist
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bk-sim-job")
+        self._purged_at = 0.0
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop jobs that finished more than ``retention`` seconds ago."""
+        now = time.time() if now is None else now
+        self._purged_at = now
+        try:
+            removed = self.store.purge(now - self.retention)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Purging finished simulation jobs failed", exc_info=True)
+            return 0
+        if removed:
+            logger.info("Purged %d finished simulation jobs", removed)
+        return removed
+
+    def submit(self, recipe_id: str, **options: Any) -> Job:
+        now = time.time()
+        if now - self._purged_at >= PURGE_INTERVAL_SECONDS:
+            self.purge_expired(now)
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            status="queued",
+            params={"recipe_id": recipe_id, **options},
+            created_at=now,
+            updated_at=now,
+        )
+        self.store.create(job)
+        self.store.append_event(job.job_id, "status", {"status": "queued"})
+        self._pool.submit(self._run, job.job_id, recipe_id, options)
+        return job
+
+    def _run(self, job_id: str, recipe_id: str, options: Dict[str, Any]) -> None:
+        self.store.update(job_id, status="running")
+        self.store.append_event(job_id, "status", {"status": "running"})
+
+        def on_progress(update: Dict[str, object]) -> None:
+            self.store.update(job_id, progress=update)
+            self.store.append_event(job_id, "progress", dict(update))
+
+        try:
+            result = run_simulation(recipe_id, progress=on_progress, **options)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Simulation job %s failed", job_id)
+            self.store.update(job_id, status="failed", error=str(exc))
+            self.store.append_event(job_id, "error", {"status": "failed", "error": str(exc)})
+            return
+
+        persisted = True
+        try:
+            self._persist(
+                recipe_id=recipe_id,
+                eco_score=float(result["eco_score"]),  # type: ignore[arg-type]
+                co2_saved_kg=float(result["co2_saved_kg"]),  # type: ignore[arg-type]
+                variance_cost=float(result["variance_cost"]),  # type: ignore[arg-type]
+                best_sources=list(result["best_sources"]),  # type: ignore[call-overload]
+                route_cluster=str(result["route_cluster"]),
+            )
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed to store eco result for job %s", job_id)
+            persisted = False
+
+        self.store.update(job_id, status="succeeded", result=result)
+        self.store.append_event(job_id, "result", {"status": "succeeded", "persisted": persisted, "result": result})
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_MANAGER: Optional[JobManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global _MANAGER  # pylint: disable=global-statement
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            workers = max(1, int(os.getenv("SIM_JOB_WORKERS", DEFAULT_JOB_WORKERS)))
+            retention = float(os.getenv("SIM_JOB_RETENTION_SECONDS", DEFAULT_RETENTION_SECONDS))
+            _MANAGER = JobManager(create_job_store(), workers=workers, retention=retention)
+        return _MANAGER
+
+
+__all__ = [
+    "InMemoryJobStore",
+    "Job",
+    "JobEvent",
+    "JobManager",
+    "JobStore",
+    "JOB_STATUSES",
+    "SQLiteJobStore",
+    "TERMINAL_STATUSES",
+    "create_job_store",
+    "get_job_manager",
+]
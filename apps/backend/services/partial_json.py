@@ -0,0 +1,343 @@
+"""Incremental parsing of a recipe JSON object while it is still being generated.
+
+``IncrementalRecipeParser`` scans text chunks as they arrive and reports each
+top-level field of the generator schema as soon as it is complete: the title
+once its closing quote arrives, every ingredient object once its closing
+brace arrives and every step string once it ends. Only new characters are
+scanned on each ``feed``, and only the value being read is kept as a
+string (the full text is joined once, on demand), so the cost is linear in
+the output length.
+
+``repair_json_object`` recovers the first JSON object from output that is not
+valid JSON as a whole: prose or code fences around it, single-quoted strings,
+Python literals, bare keys, trailing commas, and text cut off mid-object (the
+incomplete tail is dropped and the open brackets are closed).
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+Event = Tuple[str, Any]
+
+_BARE_WORD = re.compile(r"[A-Za-z0-9_.+\-/]+")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?$")
+_LITERALS = {"true": "true", "false": "false", "null": "null", "none": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+__all__ = ["Event", "IncrementalRecipeParser", "repair_json_object"]
+
+
+class IncrementalRecipeParser:
+    """Emit ``(event, value)`` pairs for ``title``, ``servings``, ``ingredient`` and ``step``."""
+
+    def __init__(self) -> None:
+        self.complete = False
+        self._chunks: List[str] = []
+        self._length = 0
+        # Text from ``_window_start`` on: just enough to decode the values still being read.
+        self._window = ""
+        self._window_start = 0
+        self._start: Optional[int] = None
+        self._end = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._value_start = 0
+        self._element_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far (joined on demand)."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> List[Event]:
+        self._chunks.append(chunk)
+        offset = self._length
+        self._length += len(chunk)
+        self._window += chunk
+        events: List[Event] = []
+        for position, char in enumerate(chunk):
+            if self.complete:
+                break
+            self._step(offset + position, char, events)
+        self._trim_window()
+        return events
+
+    def _slice(self, start: int, end: int) -> str:
+        return self._window[start - self._window_start : end - self._window_start]
+
+    def _trim_window(self) -> None:
+        """Drop window text that no value still being read starts in."""
+        keep = self._length
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        if self._element_start is not None:
+            keep = min(keep, self._element_start)
+        if len(self._stack) == 1 and self._key == "servings" and not self._expect_key:
+            keep = min(keep, self._value_start)
+        if keep > self._window_start:
+            self._window = self._window[keep - self._window_start :]
+            self._window_start = keep
+
+    def _step(self, index: int, char: str, events: List[Event]) -> None:
+        if self._start is None:
+            if char == "{":
+                self._start = index
+                self._stack.append("{")
+                self._expect_key = True
+            return
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._string_done(self._slice(self._string_start, index + 1), events)
+            return
+
+        depth = len(self._stack)
+        if char == '"':
+            self._in_string = True
+            self._string_start = index
+        elif char in "{[":
+            if depth == 2 and self._stack[-1] == "[" and self._key == "ingredients" and char == "{":
+                self._element_start = index
+            self._stack.append(char)
+        elif char in "}]":
+            if depth == 1:
+                self._scalar_done(self._slice(self._value_start, index), events)
+            if self._stack:
+                self._stack.pop()
+            if not self._stack:
+                self.complete = True
+                self._end = index + 1
+            elif len(self._stack) == 2 and char == "}" and self._element_start is not None:
+                item = self._loads(self._slice(self._element_start, index + 1))
+                if isinstance(item, dict):
+                    events.append(("ingredient", item))
+                self._element_start = None
+        elif char == ":" and depth == 1:
+            self._value_start = index + 1
+        elif char == "," and depth == 1:
+            self._scalar_done(self._slice(self._value_start, index), events)
+            self._expect_key = True
+
+    def _string_done(self, literal: str, events: List[Event]) -> None:
+        depth = len(self._stack)
+        if depth == 1 and self._expect_key:
+            key = self._loads(literal)
+            self._key = key if isinstance(key, str) else None
+            self._expect_key = False
+        elif depth == 1 and self._key == "title":
+            events.append(("title", self._loads(literal)))
+        elif depth == 2 and self._stack[-1] == "[" and self._key == "steps":
+            step = self._loads(literal)
+            if isinstance(step, str) and step.strip():
+                events.append(("step", step.strip()))
+
+    def _scalar_done(self, raw: str, events: List[Event]) -> None:
+        if self._key != "servings" or self._expect_key:
+            return
+        value = self._loads(raw.strip())
+        try:
+            events.append(("servings", int(value)))  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            pass
+
+    @staticmethod
+    def _loads(raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """The complete object, once its closing brace has been seen and it decodes."""
+        if not self.complete or self._start is None:
+            return None
+        value = self._loads(self.text[self._start : self._end])
+        return value if isinstance(value, dict) else None
+
+
+def repair_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """First JSON object in ``text``, repaired where possible; None when nothing decodes.
+
+    Text is rewritten into strict JSON in one pass. When the object never
+    closes, output is cut back to the last completed value and the brackets
+    still open at that point are closed. Objects inside arrays (ingredient
+    records) only count as completed once they close, so a truncated trailing
+    ingredient or step is dropped whole rather than kept with missing fields.
+    """
+    try:
+        value = json.loads(text)
+    except ValueError:
+        value = None
+    if isinstance(value, dict):
+        return value
+
+    start = text.find("{")
+    if start < 0:
+        return None
+    out: List[str] = []
+    # One frame per open container: [bracket, expecting a key, last token was a value].
+    stack: List[List[Any]] = []
+    safe_len = 0
+    safe_stack: List[List[Any]] = []
+    complete = False
+
+    def begin_token() -> bool:
+        """Insert a missing comma if needed; True when the token is an object key."""
+        if not stack:
+            return False
+        frame = stack[-1]
+        if frame[2]:
+            out.append(",")
+            frame[1], frame[2] = frame[0] == "{", False
+        return frame[0] == "{" and frame[1]
+
+    def mark_safe() -> None:
+        """Remember the output so far as a cut point, unless inside an unfinished array element."""
+        nonlocal safe_len, safe_stack
+        in_array = False
+        for frame in stack:
+            if frame[0] == "[":
+                in_array = True
+            elif in_array:
+                return
+        safe_len = len(out)
+        safe_stack = [frame[:] for frame in stack]
+
+    def value_done() -> None:
+        if stack:
+            stack[-1][1], stack[-1][2] = False, True
+        mark_safe()
+
+    index = start
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if char in "\"'":
+            end, literal = _read_string(text, index)
+            if end is None:
+                break  # unterminated string: everything from here is the truncated tail
+            index = end
+            if begin_token():
+                out.append(literal)
+                stack[-1][1] = False
+            else:
+                out.append(literal)
+                value_done()
+            continue
+        if char in "{[":
+            begin_token()
+            stack.append([char, char == "{", False])
+            out.append(char)
+            mark_safe()
+        elif char in "}]":
+            opener = "{" if char == "}" else "["
+            match = next((depth for depth in range(len(stack) - 1, -1, -1) if stack[depth][0] == opener), None)
+            if match is not None:
+                while len(stack) > match:
+                    _strip_dangling(out)
+                    out.append(_CLOSERS[stack.pop()[0]])
+                if not stack:
+                    complete = True
+                    break
+                value_done()
+        elif char == ",":
+            if stack and stack[-1][2]:
+                out.append(",")
+                stack[-1][1], stack[-1][2] = stack[-1][0] == "{", False
+        elif char == ":":
+            if stack and stack[-1][0] == "{":
+                out.append(":")
+        elif char.isspace():
+            out.append(char)
+        else:
+            word = _BARE_WORD.match(text, index)
+            if word is None:
+                index += 1  # stray punctuation, backticks etc.
+                continue
+            token = word.group(0)
+            index = word.end()
+            if index >= length:
+                break  # a bare word at the very end may itself be cut off
+            if begin_token():
+                out.append(json.dumps(token))
+                stack[-1][1] = False
+                continue
+            literal = _LITERALS.get(token.lower())
+            out.append(literal or (token if _NUMBER.match(token) else json.dumps(token)))
+            value_done()
+            continue
+        index += 1
+
+    if not complete:
+        del out[safe_len:]
+        stack = safe_stack
+        while stack:
+            _strip_dangling(out)
+            out.append(_CLOSERS[stack.pop()[0]])
+    try:
+        value = json.loads("".join(out))
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def _read_string(text: str, start: int) -> Tuple[Optional[int], str]:
+    """End index and double-quoted JSON literal of the string opening at ``start``."""
+    quote = text[start]
+    chars: List[str] = []
+    index = start + 1
+    while index < len(text):
+        char = text[index]
+        if char == "\\" and index + 1 < len(text):
+            escaped = text[index + 1]
+            if escaped == "'":
+                chars.append("'")
+            else:
+                chars.append(char + escaped)
+            index += 2
+            continue
+        if char == quote:
+            return index + 1, '"' + "".join(chars) + '"'
+        if char == '"':
+            chars.append('\\"')
+        elif char == "\n":
+            chars.append("\\n")
+        elif char == "\t":
+            chars.append("\\t")
+        elif char == "\r":
+            chars.append("\\r")
+        else:
+            chars.append(char)
+        index += 1
+    return None, ""
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _strip_dangling(out: List[str]) -> None:
+    """Drop a trailing comma, or a key whose value never arrived, before closing a container."""
+    _strip_trailing_comma(out)
+    if out and out[-1] == ":":
+        out.pop()
+        while out and out[-1].isspace():
+            out.pop()
+        if out and out[-1].startswith('"'):
+            out.pop()
+        _strip_trailing_comma(out)
@@ -0,0 +1,180 @@
+"""Keep popular generations warm across cache TTL purges.
+
+Every worker flushes its per-key request counts to ``gen_cache.hit_count``
+every ``GEN_HIT_FLUSH_SECONDS``. When ``GEN_PREWARM_ENABLED`` is set (enable it
+on one worker), the warmer also wakes every ``GEN_PREWARM_INTERVAL_SECONDS``,
+takes the ``GEN_PREWARM_TOP_K`` most requested entries and regenerates those
+that expire within ``GEN_PREWARM_REFRESH_HOURS``. Regeneration resets the
+entry's ``created_at``, so the cleanup job never purges a popular query.
+Regenerations are paced to ``GEN_PREWARM_RATE_PER_MINUTE`` to stay under the
+provider's quota, and a run stops early when the provider starts failing.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from .concurrency import CapacityError, run_blocking_io
+from .generator import GENERATION_CACHE, popular_generations, refresh_recipe
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 50
+DEFAULT_INTERVAL_SECONDS = 1800.0
+DEFAULT_REFRESH_HOURS = 12.0
+DEFAULT_RATE_PER_MINUTE = 6.0
+DEFAULT_HIT_FLUSH_SECONDS = 60.0
+MAX_CONSECUTIVE_FAILURES = 3
+SECONDS_PER_DAY = 86_400
+GEN_CACHE_TTL_DAYS_DEFAULT = 7
+
+__all__ = ["CacheWarmer", "get_cache_warmer", "start_cache_maintenance", "stop_cache_maintenance"]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class CacheWarmer:
+    """Rate-limited regeneration of the most requested, soon-to-expire generations."""
+
+    def __init__(
+        self,
+        top_k: int = DEFAULT_TOP_K,
+        refresh_hours: float = DEFAULT_REFRESH_HOURS,
+        rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+    ) -> None:
+        if top_k <= 0:
+            raise ValueError("top_k must be a positive integer")
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.top_k = top_k
+        self.refresh_hours = refresh_hours
+        self.min_interval = 60.0 / rate_per_minute
+        self.runs = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._next_call = 0.0
+
+    async def _pace(self) -> None:
+        delay = self._next_call - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._next_call = time.monotonic() + self.min_interval
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Refresh the due entries among the top-K; return a summary of the run."""
+        ttl_days = _env_float("GEN_CACHE_TTL_DAYS", GEN_CACHE_TTL_DAYS_DEFAULT)
+        try:
+            candidates = await run_blocking_io(popular_generations, self.top_k)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Could not load popular generations for warming", exc_info=True)
+            candidates = []
+        refresh_before = time.time() + self.refresh_hours * 3600 - ttl_days * SECONDS_PER_DAY
+        due = [row for row in candidates if row["created"] <= refresh_before]
+
+        refreshed = failed = streak = 0
+        for row in due:
+            await self._pace()
+            try:
+                await refresh_recipe(row["query"], int(row["servings"]))
+            except (RuntimeError, ValueError) as exc:
+                failed += 1
+                streak += 1
+                logger.warning("Pre-warming %r failed: %s", row["query"], exc)
+                if isinstance(exc, CapacityError) or streak >= MAX_CONSECUTIVE_FAILURES:
+                    break  # the provider or the host is struggling; try again next run
+                continue
+            refreshed += 1
+            streak = 0
+        self.runs += 1
+        self.refreshed += refreshed
+        self.failed += failed
+        self.last_run = {
+            "finished_at": time.time(),
+            "candidates": len(candidates),
+            "due": len(due),
+            "refreshed": refreshed,
+            "failed": failed,
+        }
+        if due:
+            logger.info("Cache warmer refreshed %d/%d due entries (%d failed)", refreshed, len(due), failed)
+        return self.last_run
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "top_k": self.top_k,
+            "last_run": self.last_run,
+        }
+
+
+def _enabled() -> bool:
+    return os.getenv("GEN_PREWARM_ENABLED", "0").lower() in ("1", "true", "yes", "on")
+
+
+_WARMER: Optional[CacheWarmer] = None
+_TASKS: List["asyncio.Task[None]"] = []
+
+
+def get_cache_warmer() -> Optional[CacheWarmer]:
+    """The warmer configured from the environment, or None when ``GEN_PREWARM_ENABLED`` is off."""
+    global _WARMER  # pylint: disable=global-statement
+    if _WARMER is None and _enabled():
+        _WARMER = CacheWarmer(
+            top_k=max(1, int(_env_float("GEN_PREWARM_TOP_K", DEFAULT_TOP_K))),
+            refresh_hours=_env_float("GEN_PREWARM_REFRESH_HOURS", DEFAULT_REFRESH_HOURS),
+            rate_per_minute=_env_float("GEN_PREWARM_RATE_PER_MINUTE", DEFAULT_RATE_PER_MINUTE) or DEFAULT_RATE_PER_MINUTE,
+        )
+    return _WARMER
+
+
+async def _flush_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_blocking_io(GENERATION_CACHE.flush_requests)
+        except CapacityError:
+            logger.debug("Skipping hit-count flush; I/O executor saturated")
+
+
+async def _warm_loop(warmer: CacheWarmer, first_delay: float, interval: float) -> None:
+    await asyncio.sleep(first_delay)  # let the first request counts land before ranking
+    while True:
+        try:
+            await warmer.run_once()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Cache warmer run failed")
+        await asyncio.sleep(interval)
+
+
+def start_cache_maintenance() -> None:
+    """Start the hit-count flusher (and the warmer, if enabled) on the running loop."""
+    if any(not task.done() for task in _TASKS):
+        return
+    _TASKS.clear()
+    loop = asyncio.get_running_loop()
+    flush_every = max(1.0, _env_float("GEN_HIT_FLUSH_SECONDS", DEFAULT_HIT_FLUSH_SECONDS))
+    _TASKS.append(loop.create_task(_flush_loop(flush_every)))
+    warmer = get_cache_warmer()
+    if warmer is not None:
+        warm_every = max(flush_every, _env_float("GEN_PREWARM_INTERVAL_SECONDS", DEFAULT_INTERVAL_SECONDS))
+        _TASKS.append(loop.create_task(_warm_loop(warmer, flush_every * 2, warm_every)))
+
+
+async def stop_cache_maintenance() -> None:
+    """Cancel the background loops and flush the last request counts."""
+    for task in _TASKS:
+        task.cancel()
+    await asyncio.gather(*_TASKS, return_exceptions=True)
+    _TASKS.clear()
+    await run_blocking_io(GENERATION_CACHE.flush_requests)
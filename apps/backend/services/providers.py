@@ -0,0 +1,297 @@
+"""Text-generation providers behind the recipe generator.
+
+``GEN_PROVIDER`` selects one:
+
+* ``hf`` (default): the Hugging Face Inference API, model ``GEN_MODEL``.
+* ``local``: a ``transformers`` text-generation pipeline run in-process on the
+  CPU-bound executor, model ``GEN_LOCAL_MODEL`` (falls back to ``GEN_MODEL``).
+  Needs ``transformers`` and the model weights.
+* ``stub``: a deterministic offline stand-in that returns a well-formed recipe
+  for the prompt's query after ``GEN_STUB_LATENCY_MS`` (± ``GEN_STUB_JITTER_MS``,
+  fixed per prompt), for tests and for benchmarking the cache, coalescing and
+  normalisation paths under realistic upstream latency.
+
+Every provider exposes ``name`` and ``model_id`` (both part of the generation
+cache key), ``complete(prompt)`` and ``stream(prompt)``.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol, Tuple
+
+import httpx
+
+from .concurrency import run_cpu_bound
+from .http_client import get_http_client
+
+GEN_MODEL_DEFAULT = "mistralai/Mistral-7B-Instruct-v0.2"
+GEN_MAX_TOKENS_DEFAULT = 400
+GEN_TEMPERATURE_DEFAULT = 0.2
+REQUEST_TIMEOUT_DEFAULT = 20
+STUB_CHUNK_CHARS = 16
+
+# (name, quantity per serving, unit) the stub draws its ingredients from.
+STUB_PANTRY: Tuple[Tuple[str, Optional[float], Optional[str]], ...] = (
+    ("olive oil", 0.5, "tbsp"),
+    ("garlic", 1.0, "clove"),
+    ("onion", 0.25, None),
+    ("tomato", 1.0, None),
+    ("pasta", 100.0, "g"),
+    ("rice", 0.5, "cup"),
+    ("chicken breast", 150.0, "g"),
+    ("chickpeas", 0.5, "cup"),
+    ("spinach", 1.0, "cup"),
+    ("butter", 1.0, "tbsp"),
+    ("lemon juice", 1.0, "tsp"),
+    ("salt", None, "pinch"),
+)
+
+_QUERY_RE = re.compile(r"Query:\s*(?P<query>[^\n]*)")
+_SERVINGS_RE = re.compile(r"for (?P<servings>\d+) servings")
+
+__all__ = [
+    "GenerationProvider",
+    "HFProvider",
+    "LocalProvider",
+    "StubProvider",
+    "create_provider",
+    "get_provider",
+]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _generation_parameters() -> Tuple[int, float]:
+    return _env_int("GEN_MAX_TOKENS", GEN_MAX_TOKENS_DEFAULT), _env_float("GEN_TEMPERATURE", GEN_TEMPERATURE_DEFAULT)
+
+
+class GenerationProvider(Protocol):
+    name: str
+    model_id: str
+
+    async def complete(self, prompt: str) -> str:
+        """Full generated text for ``prompt``; raises ``RuntimeError`` on failure."""
+
+    def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Generated text in chunks as it becomes available."""
+
+
+class HFProvider:
+    """Hugging Face Inference API over the shared pooled HTTP client."""
+
+    name = "hf"
+
+    def __init__(self, model_id: str) -> None:
+        self.model_id = model_id
+
+    def _request(self, prompt: str, stream: bool = False) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        token = os.getenv("HF_API_TOKEN")
+        if not token:
+            raise RuntimeError("HF_API_TOKEN is required for generation")
+
+        max_tokens, temperature = _generation_parameters()
+        url = f"https://api-inference.huggingface.co/models/{self.model_id}"
+        headers = {"Authorization": f"Bearer {token}"}
+        payload: Dict[str, Any] = {
+            "inputs": prompt,
+            "parameters": {
+                "max_new_tokens": max_tokens,
+                "temperature": temperature,
+                "return_full_text": False,
+            },
+        }
+        if stream:
+            payload["stream"] = True
+        return url, headers, payload
+
+    async def complete(self, prompt: str) -> str:
+        url, headers, payload = self._request(prompt)
+        timeout = _env_float("REQUEST_TIMEOUT_SECONDS", REQUEST_TIMEOUT_DEFAULT)
+        try:
+            response = await get_http_client().post(url, headers=headers, json=payload, timeout=timeout)
+        except httpx.HTTPError as exc:
+            raise RuntimeError(f"HF inference request failed: {exc}") from exc
+
+        if response.status_code >= 400:
+            snippet = response.text[:200]
+            raise RuntimeError(f"HF inference failed ({response.status_code}): {snippet}")
+
+        data = response.json()
+        if isinstance(data, list) and data:
+            generated = data[0]
+            if isinstance(generated, dict) and "generated_text" in generated:
+                return generated["generated_text"]
+            if isinstance(generated, str):
+                return generated
+        if isinstance(data, dict) and "generated_text" in data:
+            return data["generated_text"]
+        if isinstance(data, str):
+            return data
+        raise RuntimeError("HF inference returned unexpected payload")
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield generated text as the inference API streams tokens (server-sent ``data:`` lines)."""
+        url, headers, payload = self._request(prompt, stream=True)
+        timeout = _env_float("REQUEST_TIMEOUT_SECONDS", REQUEST_TIMEOUT_DEFAULT)
+        try:
+            async with get_http_client().stream("POST", url, headers=headers, json=payload, timeout=timeout) as response:
+                if response.status_code >= 400:
+                    snippet = (await response.aread()).decode("utf-8", "replace")[:200]
+                    raise RuntimeError(f"HF inference failed ({response.status_code}): {snippet}")
+                async for line in response.aiter_lines():
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:") :].strip()
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    if isinstance(event, dict) and event.get("error"):
+                        raise RuntimeError(f"HF inference stream failed: {event['error']}")
+                    token = event.get("token") if isinstance(event, dict) else None
+                    if isinstance(token, dict) and not token.get("special") and token.get("text"):
+                        yield token["text"]
+        except (httpx.HTTPError, ValueError) as exc:
+            raise RuntimeError(f"HF inference stream failed: {exc}") from exc
+
+
+class LocalProvider:
+    """In-process ``transformers`` pipeline; the model loads on first use."""
+
+    name = "local"
+
+    def __init__(self, model_id: str) -> None:
+        self.model_id = model_id
+        self._pipeline: Any = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        with self._lock:
+            if self._pipeline is None:
+                try:
+                    from transformers import pipeline  # pylint: disable=import-outside-toplevel
+                except ImportError as exc:
+                    raise RuntimeError("GEN_PROVIDER=local requires the transformers package") from exc
+                self._pipeline = pipeline("text-generation", model=self.model_id)
+            return self._pipeline
+
+    def _generate(self, prompt: str) -> str:
+        max_tokens, temperature = _generation_parameters()
+        options: Dict[str, Any] = {"max_new_tokens": max_tokens, "return_full_text": False}
+        if temperature > 0:
+            options.update(do_sample=True, temperature=temperature)
+        outputs = self._load()(prompt, **options)
+        if isinstance(outputs, list) and outputs and isinstance(outputs[0], dict):
+            return str(outputs[0].get("generated_text", ""))
+        raise RuntimeError("Local generation returned unexpected payload")
+
+    async def complete(self, prompt: str) -> str:
+        return await run_cpu_bound(self._generate, prompt)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        # The pipeline produces the whole text at once; callers still see a stream.
+        yield await self.complete(prompt)
+
+
+class StubProvider:
+    """Deterministic offline recipe generator with simulated upstream latency."""
+
+    name = "stub"
+    model_id = "stub"
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0) -> None:
+        if latency < 0 or jitter < 0:
+            raise ValueError("latency and jitter must be non-negative")
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+
+    @staticmethod
+    def _seed(prompt: str) -> int:
+        return int.from_bytes(hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).digest(), "little")
+
+    def _delay(self, prompt: str) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.latency + random.Random(self._seed(prompt)).uniform(-self.jitter, self.jitter))
+
+    def render(self, prompt: str) -> str:
+        """The JSON recipe the stub returns for ``prompt``."""
+        query_match = _QUERY_RE.search(prompt)
+        query = query_match.group("query").strip() if query_match else prompt.strip()[:60]
+        servings_match = _SERVINGS_RE.search(prompt)
+        servings = int(servings_match.group("servings")) if servings_match else 1
+
+        rng = random.Random(self._seed(query.lower()))
+        picked = rng.sample(STUB_PANTRY, k=rng.randint(4, 7))
+        ingredients: List[Dict[str, Any]] = [
+            {"name": name, "quantity": round(amount * servings, 2) if amount is not None else None, "unit": unit}
+            for name, amount, unit in picked
+        ]
+        names = [item["name"] for item in ingredients]
+        steps = [
+            f"Prepare the {', '.join(names[:-1])} and {names[-1]}.",
+            f"Cook the {names[0]} and {names[1]} over medium heat for {rng.randint(3, 12)} minutes.",
+            f"Add the remaining ingredients and simmer for {rng.randint(5, 25)} minutes.",
+            "Season to taste and serve.",
+        ]
+        return json.dumps({"title": query.title() or "Stub Recipe", "servings": servings, "ingredients": ingredients, "steps": steps})
+
+    async def complete(self, prompt: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self._delay(prompt))
+        return self.render(prompt)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        self.calls += 1
+        text = self.render(prompt)
+        chunks = [text[i : i + STUB_CHUNK_CHARS] for i in range(0, len(text), STUB_CHUNK_CHARS)]
+        pause = self._delay(prompt) / len(chunks)
+        for chunk in chunks:
+            await asyncio.sleep(pause)
+            yield chunk
+
+
+def create_provider(name: Optional[str] = None) -> GenerationProvider:
+    """``hf`` (default), ``local`` or ``stub``, from ``GEN_PROVIDER``."""
+    name = (name or os.getenv("GEN_PROVIDER", "hf")).strip().lower()
+    if name == "hf":
+        return HFProvider(os.getenv("GEN_MODEL", GEN_MODEL_DEFAULT))
+    if name == "local":
+        return LocalProvider(os.getenv("GEN_LOCAL_MODEL") or os.getenv("GEN_MODEL", GEN_MODEL_DEFAULT))
+    if name == "stub":
+        return StubProvider(
+            latency=max(0.0, _env_float("GEN_STUB_LATENCY_MS", 0.0)) / 1000.0,
+            jitter=max(0.0, _env_float("GEN_STUB_JITTER_MS", 0.0)) / 1000.0,
+        )
+    raise ValueError(f"Unknown generation provider '{name}'. Expected 'hf', 'local' or 'stub'")
+
+
+_PROVIDER: Optional[GenerationProvider] = None
+_PROVIDER_LOCK = threading.Lock()
+
+
+def get_provider() -> GenerationProvider:
+    """The shared provider selected by ``GEN_PROVIDER``."""
+    global _PROVIDER  # pylint: disable=global-statement
+    with _PROVIDER_LOCK:
+        if _PROVIDER is None:
+            _PROVIDER = create_provider()
+        return _PROVIDER
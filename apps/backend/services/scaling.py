@@ -0,0 +1,41 @@
+"""Rescale cached recipe payloads to a different number of servings."""
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict
+
+from packages.nlp_engine.units import scale_quantity
+
+__all__ = ["rescale_recipe", "scale_ingredient"]
+
+
+def scale_ingredient(item: Dict[str, Any], factor: float) -> Dict[str, Any]:
+    """Copy of one ingredient record with its quantity multiplied by ``factor``."""
+    scaled = dict(item)
+    quantity = scaled.get("quantity")
+    if factor != 1.0 and isinstance(quantity, (int, float)) and not isinstance(quantity, bool):
+        scaled["quantity"], scaled["unit"] = scale_quantity(float(quantity), scaled.get("unit"), factor)
+    return scaled
+
+
+def rescale_recipe(payload: Dict[str, Any], servings: int) -> Dict[str, Any]:
+    """Copy of ``payload`` scaled from its servings to ``servings``.
+
+    Quantities are scaled unit-aware (``scale_quantity``): amounts move to a
+    more readable unit of the same system and pinch-style units stay put.
+    """
+    if servings <= 0:
+        raise ValueError("servings must be a positive integer")
+    scaled = copy.deepcopy(payload)
+    try:
+        base = int(payload.get("servings") or 0)
+    except (TypeError, ValueError):
+        base = 0
+    if base <= 0 or base == servings:
+        return scaled
+    factor = servings / base
+    scaled["ingredients"] = [
+        scale_ingredient(item, factor) if isinstance(item, dict) else item for item in scaled.get("ingredients") or []
+    ]
+    scaled["servings"] = servings
+    return scaled
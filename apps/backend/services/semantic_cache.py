@@ -0,0 +1,336 @@
+"""Semantic near-duplicate lookup for generation queries.
+
+Queries are normalised (lower-cased, filler such as "how to make" or
+"recipe" dropped, plurals folded) and embedded; the vectors live in a small
+index that maps each one to the ``key_hash`` of its cached generation. A new
+query whose cosine similarity to a stored one reaches ``GEN_SEMANTIC_THRESHOLD``
+reuses that generation instead of calling the model.
+
+The cache is opt-in (``GEN_SEMANTIC_CACHE=1``). The index is kept in memory
+unless ``GEN_SEMANTIC_INDEX_PATH`` names a directory to persist it in
+(``vectors.npy`` plus ``entries.json``).
+
+The default ``HashingEmbedder`` (signed feature hashing of words and character
+trigrams) needs no model download, so the cache works and tests offline;
+``GEN_SEMANTIC_EMBEDDER=sentence-transformers:<model>`` switches to a local
+sentence-transformers model when that package is installed.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIMENSIONS = 256
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_MAX_ENTRIES = 20_000
+DEFAULT_SAVE_INTERVAL_SECONDS = 30.0
+SECONDS_PER_DAY = 86_400
+
+FILLER_PHRASES = (
+    "how do i make",
+    "how do you make",
+    "how to make",
+    "how to cook",
+    "how to prepare",
+    "i want to make",
+    "give me",
+    "show me",
+    "recipe for",
+    "recipes for",
+)
+STOPWORDS = frozenset(
+    "a an the of for with and to my me please recipe recipes make making easy simple quick best homemade some".split()
+)
+
+__all__ = [
+    "Embedder",
+    "HashingEmbedder",
+    "SemanticIndex",
+    "SemanticMatch",
+    "create_embedder",
+    "get_semantic_index",
+    "normalize_query",
+]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def normalize_query(query: str) -> str:
+    """Canonical content words of ``query``: lower-cased, filler removed, simple plurals folded."""
+    text = re.sub(r"[^a-z0-9\s]", " ", query.lower())
+    text = re.sub(r"\s+", " ", text).strip()
+    for phrase in FILLER_PHRASES:
+        text = text.replace(phrase, " ")
+    words = []
+    for word in text.split():
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("es") and word[-3] in "sxz":
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+class Embedder(Protocol):
+    name: str
+    dimensions: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Unit-length float32 vectors, one row per text."""
+
+
+class HashingEmbedder:
+    """Signed feature hashing of word unigrams and character trigrams; deterministic and offline."""
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS) -> None:
+        if dimensions <= 0:
+            raise ValueError("dimensions must be a positive integer")
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        features = []
+        for word in text.split():
+            features.append(f"w:{word}")
+            padded = f"#{word}#"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+                sign = 1.0 if digest[4] & 1 else -1.0
+                # Whole words carry more meaning than any single trigram.
+                vectors[row, bucket] += sign * (2.0 if feature.startswith("w:") else 1.0)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class _SentenceTransformerEmbedder:
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer  # pylint: disable=import-outside-toplevel
+
+        self._model = SentenceTransformer(model_name)
+        self.dimensions = int(self._model.get_sentence_embedding_dimension())
+        self.name = f"sentence-transformers:{model_name}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return np.asarray(self._model.encode(list(texts), normalize_embeddings=True), dtype=np.float32)
+
+
+def create_embedder(spec: Optional[str] = None) -> Embedder:
+    """``hashing`` (default) or ``sentence-transformers:<model>``, from ``GEN_SEMANTIC_EMBEDDER``."""
+    spec = (spec or os.getenv("GEN_SEMANTIC_EMBEDDER", "hashing")).strip()
+    if spec == "hashing":
+        return HashingEmbedder()
+    if spec.startswith("sentence-transformers:"):
+        try:
+            return _SentenceTransformerEmbedder(spec.split(":", 1)[1])
+        except ImportError:
+            logger.warning("sentence-transformers is not installed; using the hashing embedder")
+            return HashingEmbedder()
+    raise ValueError(f"Unknown semantic embedder '{spec}'. Expected 'hashing' or 'sentence-transformers:<model>'")
+
+
+@dataclass
+class SemanticMatch:
+    key_hash: str
+    query: str
+    servings: int
+    similarity: float
+
+
+class SemanticIndex:
+    """Append-only vector index mapping normalised queries to cached generations."""
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        path: Optional[Path] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self.embedder = embedder
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._vectors = np.zeros((0, embedder.dimensions), dtype=np.float32)
+        self._entries: List[Dict[str, object]] = []
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+        if path is not None:
+            self._load(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _read(self, path: Path) -> Optional[Tuple[List[Dict[str, object]], np.ndarray]]:
+        try:
+            meta = json.loads((path / "entries.json").read_text(encoding="utf-8"))
+            vectors = np.load(path / "vectors.npy")
+        except (OSError, ValueError):
+            return None
+        entries = list(meta.get("entries") or [])
+        if meta.get("embedder") != self.embedder.name or vectors.shape != (len(entries), self.embedder.dimensions):
+            logger.info("Semantic index at %s is incomplete or from a different embedder; ignoring it", path)
+            return None
+        return entries, vectors.astype(np.float32, copy=False)
+
+    def _load(self, path: Path) -> None:
+        stored = self._read(path)
+        if stored is not None:
+            self._entries, self._vectors = stored
+
+    def save(self) -> None:
+        """Merge in entries other workers saved, then persist atomically."""
+        if self.path is None:
+            return
+        stored = self._read(self.path)
+        with self._lock:
+            if stored is not None:
+                known = {entry["key_hash"] for entry in self._entries}
+                rows = [i for i, entry in enumerate(stored[0]) if entry["key_hash"] not in known]
+                if rows:
+                    self._entries = [stored[0][i] for i in rows] + self._entries
+                    self._vectors = np.vstack([stored[1][rows], self._vectors])
+                    self._trim()
+            vectors = self._vectors.copy()
+            meta = {"embedder": self.embedder.name, "entries": list(self._entries)}
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_vectors = self.path / "vectors.tmp.npy"
+        tmp_entries = self.path / "entries.json.tmp"
+        np.save(tmp_vectors, vectors)
+        tmp_entries.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_vectors, self.path / "vectors.npy")
+        os.replace(tmp_entries, self.path / "entries.json")
+
+    def search(self, query: str, scope: str, ttl_days: Optional[int] = None) -> Optional[SemanticMatch]:
+        """Most similar stored query in ``scope`` (provider/model) at or above the threshold."""
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        vector = self.embedder.embed([normalized])[0]
+        cutoff = time.time() - ttl_days * SECONDS_PER_DAY if ttl_days is not None else None
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+            scores = self._vectors @ vector
+            candidates = np.flatnonzero(scores >= self.threshold)
+            for position in candidates[np.argsort(scores[candidates])[::-1]]:
+                similarity = float(scores[position])
+                entry = self._entries[position]
+                if entry["scope"] != scope or (cutoff is not None and float(entry["created_at"]) < cutoff):  # type: ignore[arg-type]
+                    continue
+                self.hits += 1
+                return SemanticMatch(
+                    key_hash=str(entry["key_hash"]),
+                    query=str(entry["query"]),
+                    servings=int(entry["servings"]),  # type: ignore[call-overload]
+                    similarity=similarity,
+                )
+            self.misses += 1
+            return None
+
+    def add(self, query: str, key_hash: str, servings: int, scope: str) -> None:
+        normalized = normalize_query(query)
+        if not normalized:
+            return
+        vector = self.embedder.embed([normalized])
+        entry = {"key_hash": key_hash, "query": normalized, "servings": servings, "scope": scope, "created_at": time.time()}
+        with self._lock:
+            duplicates = [i for i, existing in enumerate(self._entries) if existing["key_hash"] == key_hash]
+            if duplicates:
+                self._entries[duplicates[0]] = entry
+                self._dirty = True
+                return
+            self._entries.append(entry)
+            self._vectors = np.vstack([self._vectors, vector])
+            self._trim()
+            self._dirty = True
+
+    def _trim(self) -> None:
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            del self._entries[:overflow]
+            self._vectors = self._vectors[overflow:]
+
+    def save_if_due(self, interval: float = DEFAULT_SAVE_INTERVAL_SECONDS) -> bool:
+        """Persist when there are unsaved entries and ``interval`` seconds passed since the last save."""
+        if self.path is None or not self._dirty or time.monotonic() - self._saved_at < interval:
+            return False
+        self.save()
+        return True
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "threshold": self.threshold,
+                "embedder": self.embedder.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_INDEX: Optional[SemanticIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_semantic_index() -> Optional[SemanticIndex]:
+    """The shared index, or None unless ``GEN_SEMANTIC_CACHE`` is enabled."""
+    global _INDEX  # pylint: disable=global-statement
+    if os.getenv("GEN_SEMANTIC_CACHE", "0").lower() not in ("1", "true", "yes", "on"):
+        return None
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            path = os.getenv("GEN_SEMANTIC_INDEX_PATH")
+            _INDEX = SemanticIndex(
+                create_embedder(),
+                path=Path(path) if path else None,
+                threshold=_env_float("GEN_SEMANTIC_THRESHOLD", DEFAULT_THRESHOLD),
+                max_entries=_env_int("GEN_SEMANTIC_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+            )
+            atexit.register(_INDEX.save_if_due, 0.0)
+        return _INDEX
@@ -0,0 +1,233 @@
+"""Single-flight coalescing of identical in-flight calls.
+
+The first caller for a key runs the work; concurrent callers with the same key
+wait until it finishes and receive (a copy of) its result or exception. One
+registry serves both kinds of caller: ``do`` for blocking code in threads and
+``ado`` for coroutines on any event loop, so a request handled on the loop and
+a job running in a worker thread share one execution. Async followers are
+woken through their own loop and never tie up a thread; an async leader runs
+the work as its own task, so a disconnecting first caller does not cancel it
+for the others.
+
+When a lock directory is configured (``GEN_SINGLEFLIGHT_DIR``), the leader
+also takes an exclusive ``flock`` on ``<dir>/<key>.lock`` so leaders in other
+worker processes on the host wait for each other, then re-check the shared
+cache before doing the work themselves.
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+try:  # pragma: no cover - POSIX only
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_LOCK_TIMEOUT_SECONDS = 60.0
+LOCK_POLL_SECONDS = 0.05
+
+__all__ = ["SingleFlight", "get_single_flight"]
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+        self._futures: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = []
+        self._lock = threading.Lock()
+
+    def future(self) -> Optional["asyncio.Future[None]"]:
+        """A future on the running loop that resolves when the call finishes; None if it already has."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.done.is_set():
+                return None
+            future = loop.create_future()
+            self._futures.append((loop, future))
+            return future
+
+    def finish(self, result: Any, error: Optional[BaseException]) -> None:
+        with self._lock:
+            self.result, self.error = result, error
+            self.done.set()
+            futures, self._futures = self._futures, []
+        for loop, future in futures:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:  # the waiter's loop has closed
+                pass
+
+    def outcome(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return copy.deepcopy(self.result)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls sharing a key into one execution."""
+
+    def __init__(self, lock_dir: Optional[str] = None, lock_timeout: float = DEFAULT_LOCK_TIMEOUT_SECONDS) -> None:
+        self.lock_dir = Path(lock_dir) if lock_dir else None
+        self.lock_timeout = lock_timeout
+        self.executions = 0
+        self.coalesced = 0
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: str) -> Tuple[_Call, bool]:
+        """The in-flight call for ``key`` and whether the caller leads it."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                return call, True
+            call.waiters += 1
+            self.coalesced += 1
+            return call, False
+
+    def _finish(self, key: str, call: _Call, result: Any, error: Optional[BaseException]) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        call.finish(result, error)
+
+    def _count_execution(self) -> None:
+        with self._lock:
+            self.executions += 1
+
+    def _acquire_process_lock(self, key: str) -> Optional[IO[bytes]]:
+        """Block until ``<lock_dir>/<key>.lock`` is held; give up after ``lock_timeout``."""
+        if self.lock_dir is None or fcntl is None:
+            return None
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        handle = open(self.lock_dir / f"{key}.lock", "a+b")  # pylint: disable=consider-using-with
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return handle
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    logger.warning("Timed out waiting for single-flight lock %s; proceeding", key)
+                    handle.close()
+                    return None
+                time.sleep(LOCK_POLL_SECONDS)
+
+    @staticmethod
+    def _release_process_lock(handle: Optional[IO[bytes]]) -> None:
+        if handle is None:
+            return
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        finally:
+            handle.close()
+
+    def do(self, key: str, func: Callable[[], T], recheck: Optional[Callable[[], Optional[T]]] = None) -> T:
+        """Return ``func()``, shared with every concurrent caller of ``key``.
+
+        ``recheck`` runs once the leader holds the key (and the cross-process
+        lock, if any); a non-None value, e.g. a cache entry written by a flight
+        that just finished, is returned instead of calling ``func``.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            call.done.wait()
+            return call.outcome()
+
+        result: Any = None
+        error: Optional[BaseException] = None
+        try:
+            handle = self._acquire_process_lock(key)
+            try:
+                result = recheck() if recheck is not None else None
+                if result is None:
+                    self._count_execution()
+                    result = func()
+            finally:
+                self._release_process_lock(handle)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            self._finish(key, call, result, error)
+        return copy.deepcopy(result) if call.waiters else result
+
+    async def _lead(
+        self,
+        key: str,
+        call: _Call,
+        func: Callable[[], Awaitable[T]],
+        recheck: Optional[Callable[[], Awaitable[Optional[T]]]],
+    ) -> T:
+        result: Any = None
+        error: Optional[BaseException] = None
+        try:
+            handle = await asyncio.to_thread(self._acquire_process_lock, key) if self.lock_dir is not None else None
+            try:
+                result = await recheck() if recheck is not None else None
+                if result is None:
+                    self._count_execution()
+                    result = await func()
+            finally:
+                self._release_process_lock(handle)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            self._finish(key, call, result, error)
+        return result
+
+    async def ado(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[T]],
+        recheck: Optional[Callable[[], Awaitable[Optional[T]]]] = None,
+    ) -> T:
+        """``do`` for coroutines: followers await without blocking their loop or a thread."""
+        call, leader = self._join(key)
+        if not leader:
+            future = call.future()
+            if future is not None:
+                await future
+            return call.outcome()
+
+        task = asyncio.ensure_future(self._lead(key, call, func, recheck))
+        # Mark the exception retrieved even if the leading caller goes away.
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result) if call.waiters else result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "executions": self.executions, "coalesced": self.coalesced}
+
+
+def _lock_timeout() -> float:
+    try:
+        return float(os.getenv("GEN_SINGLEFLIGHT_LOCK_TIMEOUT_SECONDS", DEFAULT_LOCK_TIMEOUT_SECONDS))
+    except (TypeError, ValueError):
+        return DEFAULT_LOCK_TIMEOUT_SECONDS
+
+
+_SINGLE_FLIGHT = SingleFlight(os.getenv("GEN_SINGLEFLIGHT_DIR") or None, _lock_timeout())
+
+
+def get_single_flight() -> SingleFlight:
+    return _SINGLE_FLIGHT
@@ -125,13 +125,66 @@ def insert_eco_result(
     return response.data[0] if getattr(response, "data", None) else None
 
 
+def fetch_suppliers(updated_since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return supplier rows with coordinates, optionally only those changed after ``updated_since``."""
+    client = get_client()
+    if client is None:
+        return []
+
+    query = client.table("suppliers").select("id, name, supplier_type, latitude, longitude, updated_at")
+    if updated_since:
+        query = query.gt("updated_at", updated_since)
+    response = query.execute()
+    return list(getattr(response, "data", None) or [])
+
+
+def fetch_recipe_ingredients(recipe_id: str) -> List[Dict[str, Any]]:
+    """Return the stored ingredient rows of one recipe."""
+    client = get_client()
+    if client is None:
+        return []
+
+    response = (
+        client.table("ingredients")
+        .select("ingredient_name, quantity, unit")
+        .eq("recipe_id", recipe_id)
+        .execute()
+    )
+    return list(getattr(response, "data", None) or [])
+
+
+def fetch_simulation_memo(key_hash: str) -> Optional[Dict[str, Any]]:
+    client = get_client()
+    if client is None:
+        return None
+
+    response = client.table("sim_memo").select("result_json").eq("key_hash", key_hash).limit(1).execute()
+    rows = getattr(response, "data", None) or []
+    return rows[0]["result_json"] if rows else None
+
+
+def store_simulation_memo(key_hash: str, fingerprint: str, result: Dict[str, Any]) -> None:
+    client = get_client()
+    if client is None:
+        return
+
+    client.table("sim_memo").upsert(
+        {"key_hash": key_hash, "fingerprint": fingerprint, "result_json": result},
+        on_conflict="key_hash",
+    ).execute()
+
+
 supabase = get_client()
 
 __all__ = [
     "SupabaseConfigError",
     "SupabaseDependencyError",
+    "fetch_recipe_ingredients",
+    "fetch_simulation_memo",
+    "fetch_suppliers",
     "get_client",
     "insert_eco_result",
     "insert_recipe",
+    "store_simulation_memo",
     "supabase",
 ]
@@ -0,0 +1,103 @@
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.backend.services.gen_cache import GenerationCache, created_timestamp
+
+
+def _iso(days_ago):
+    return (datetime.now(timezone.utc) - timedelta(days=days_ago)).isoformat()
+
+
+def test_l1_is_a_bounded_lru():
+    cache = GenerationCache(max_entries=2)
+    cache.put("a", {"title": "A"})
+    cache.put("b", {"title": "B"})
+    assert cache.get("a", 7) == {"title": "A"}
+    cache.put("c", {"title": "C"})
+
+    assert cache.get("b", 7) is None
+    assert cache.get("a", 7) == {"title": "A"}
+    assert len(cache) == 2
+    stats = cache.stats()
+    assert (stats["l1_hits"], stats["misses"]) == (2, 1)
+
+
+def test_hits_are_copies():
+    cache = GenerationCache()
+    cache.put("a", {"ingredients": [{"name": "salt"}]})
+    cache.get("a", 7)["ingredients"].clear()
+    assert cache.get("a", 7) == {"ingredients": [{"name": "salt"}]}
+
+
+def test_l2_hits_are_promoted_and_expired_rows_ignored():
+    rows = {"fresh": ({"title": "Fresh"}, _iso(1)), "stale": ({"title": "Stale"}, _iso(30))}
+    loads = []
+
+    def loader(key_hash, ttl_days):
+        loads.append(key_hash)
+        return rows.get(key_hash)
+
+    cache = GenerationCache()
+    cache.configure_store(loader, None)
+    assert cache.get("fresh", 7) == {"title": "Fresh"}
+    assert cache.get("fresh", 7) == {"title": "Fresh"}
+    assert cache.peek("stale", 7, use_l2=True) == {"title": "Stale"}  # the loader filters by TTL
+    assert "stale" not in cache._entries
+    assert loads == ["fresh", "stale"]
+    assert (cache.stats()["l1_hits"], cache.stats()["l2_hits"]) == (1, 1)
+
+
+def test_writes_go_through_with_metadata_and_failures_are_swallowed():
+    saved = []
+    cache = GenerationCache()
+    cache.configure_store(None, lambda **row: saved.append(row))
+    cache.put("a", {"title": "A"}, query="a", servings=2)
+    assert saved == [{"key_hash": "a", "response_json": {"title": "A"}, "query": "a", "servings": 2}]
+
+    def failing(**row):
+        raise ConnectionError("down")
+
+    cache.configure_store(None, failing)
+    cache.put("b", {"title": "B"})
+    assert cache.get("b", 7) == {"title": "B"}
+
+
+def test_request_counts_are_flushed_once():
+    recorded = []
+    cache = GenerationCache()
+    cache.configure_store(None, None, recorded.append)
+    for key in ("a", "a", "b"):
+        cache.record_request(key)
+
+    assert cache.flush_requests() == 2
+    assert recorded == [{"a": 2, "b": 1}]
+    assert cache.flush_requests() == 0
+
+
+def test_request_counts_are_dropped_when_recording_fails():
+    def failing(counts):
+        raise ConnectionError("down")
+
+    cache = GenerationCache()
+    cache.configure_store(None, None, failing)
+    cache.record_request("a")
+    assert cache.flush_requests() == 0
+    assert cache.stats()["pending_request_counts"] == 0
+
+
+def test_created_timestamp_parses_supabase_timestamps():
+    assert created_timestamp("2025-01-01T00:00:00Z") == datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+    assert created_timestamp(None) == pytest.approx(time.time(), abs=5)
+
+
+def test_max_entries_must_be_positive():
+    with pytest.raises(ValueError):
+        GenerationCache(max_entries=0)
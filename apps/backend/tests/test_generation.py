@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("GEN_PROVIDER", "stub")
+os.environ.setdefault("GEN_SEMANTIC_CACHE", "0")
+
+from apps.backend.services import generator
+from apps.backend.services.providers import StubProvider
+from apps.backend.services.semantic_cache import HashingEmbedder, SemanticIndex
+
+STUB_LATENCY = 0.05
+
+
+@pytest.fixture(autouse=True)
+def provider(monkeypatch):
+    stub = StubProvider(latency=STUB_LATENCY)
+    monkeypatch.setattr(generator, "PROVIDER", stub)
+    monkeypatch.setattr(generator, "SEMANTIC_INDEX", None)
+    generator.GENERATION_CACHE.clear()
+    yield stub
+    generator.GENERATION_CACHE.clear()
+
+
+async def _collect(query, servings):
+    return [event async for event in generator.stream_recipe(query, servings, False)]
+
+
+def _amounts(recipe):
+    return {item["name"]: (item["quantity"], item["unit"]) for item in recipe["ingredients"]}
+
+
+def test_concurrent_misses_share_one_provider_call(provider):
+    async def run():
+        return await asyncio.gather(*(generator.generate_recipe("tomato pasta", servings, False) for servings in (1, 2, 3, 4) * 3))
+
+    results = asyncio.run(run())
+    assert provider.calls == 1
+    assert [recipe["servings"] for recipe in results] == [1, 2, 3, 4] * 3
+    assert len({recipe["title"] for recipe in results}) == 1
+
+
+def test_cached_recipe_is_rescaled_for_other_servings(provider):
+    two = asyncio.run(generator.generate_recipe("chickpea curry", 2, False))
+    four = asyncio.run(generator.generate_recipe("chickpea curry", 4, True))
+
+    assert provider.calls == 1
+    assert four["servings"] == 4 and four["servings_assumed"] is True
+    assert generator.GENERATION_CACHE.stats()["l1_hits"] == 1
+    doubled = _amounts(four)
+    for name, (quantity, unit) in _amounts(two).items():
+        if quantity is not None and unit in ("g", "clove", None):
+            assert doubled[name] == (quantity * 2, unit)
+        elif quantity is None:
+            assert doubled[name] == (None, unit)
+
+
+def test_streamed_misses_coalesce_with_generate(provider):
+    async def run():
+        return await asyncio.gather(
+            _collect("spinach rice", 2),
+            _collect("spinach rice", 2),
+            generator.generate_recipe("spinach rice", 2, False),
+        )
+
+    first, second, generated = asyncio.run(run())
+    assert provider.calls == 1
+    for events in (first, second):
+        names = [event for event, _ in events]
+        assert names[:2] == ["title", "servings"] and names[-1] == "result"
+        assert names.count("ingredient") == len(generated["ingredients"])
+        assert events[-1][1]["recipe"]["ingredients"] == generated["ingredients"]
+
+
+def test_leader_disconnect_does_not_cancel_followers(provider):
+    async def run():
+        leader = generator.stream_recipe("garlic butter", 1, False)
+        first = await leader.__anext__()
+        follower = asyncio.ensure_future(_collect("garlic butter", 1))
+        await asyncio.sleep(0)
+        await leader.aclose()
+        return first, await follower
+
+    first, events = asyncio.run(run())
+    assert first == ("title", {"title": "Garlic Butter"})
+    assert events[-1][0] == "result"
+    assert provider.calls == 1
+
+
+def test_streamed_parts_are_scaled_to_the_requested_servings(monkeypatch, provider):
+    recipe = {
+        "title": "Garlic Pasta",
+        "ingredients": [{"name": "pasta", "quantity": 400, "unit": "g"}, {"name": "garlic", "quantity": 4, "unit": "cloves"}],
+        "servings": 4,
+        "steps": ["Boil.", "Toss."],
+    }
+    monkeypatch.setattr(provider, "render", lambda prompt: json.dumps(recipe))
+    events = asyncio.run(_collect("garlic pasta", 2))
+
+    streamed = {event: data for event, data in events if event in ("servings", "result")}
+    assert streamed["servings"] == {"servings": 2}
+    ingredients = [data for event, data in events if event == "ingredient"]
+    assert ingredients == [{"name": "pasta", "quantity": 200.0, "unit": "g"}, {"name": "garlic", "quantity": 2.0, "unit": "clove"}]
+    assert ingredients == streamed["result"]["recipe"]["ingredients"]
+
+
+def test_cached_stream_replays_parts(provider):
+    generated = asyncio.run(generator.generate_recipe("lemon chicken", 2, False))
+    events = asyncio.run(_collect("lemon chicken", 2))
+    assert provider.calls == 1
+    assert events[-1] == ("result", {"cached": True, "recipe": generated})
+    assert [data for event, data in events if event == "ingredient"] == generated["ingredients"]
+
+
+def test_truncated_output_is_repaired_without_a_retry(monkeypatch, provider):
+    rendered = provider.render(generator.build_prompt("onion soup", 1))
+    truncated = rendered[: rendered.index("Season to taste")]
+    calls = []
+
+    async def complete(prompt):
+        calls.append(prompt)
+        return "Here you go: " + truncated
+
+    monkeypatch.setattr(provider, "complete", complete)
+    before = dict(generator.DECODE_STATS)
+    recipe = asyncio.run(generator.generate_recipe("onion soup", 1, False))
+
+    assert len(calls) == 1
+    assert generator.DECODE_STATS["repaired"] == before["repaired"] + 1
+    expected = json.loads(rendered)
+    assert len(recipe["ingredients"]) == len(expected["ingredients"])
+    assert recipe["steps"] == expected["steps"][:-1]  # the cut-off last step is dropped
+
+
+def test_rejected_records_are_reparsed_in_place(monkeypatch):
+    parsed_lines = []
+
+    def extract(text):
+        parsed_lines.append(text)
+        if "flour" in text:
+            return {"ingredients": [{"name": "flour", "quantity": 2.0, "unit": "cups"}]}
+        return {"ingredients": []}
+
+    monkeypatch.setattr(generator, "_extract", extract)
+    items = [
+        {"name": "2 cups flour", "quantity": None, "unit": None},
+        {"name": "olive oil", "quantity": 2, "unit": "tablespoons"},
+        {"name": "3 mystery", "quantity": "lots", "unit": None},
+    ]
+    records = asyncio.run(generator._normalize_generated_ingredients(items, "bread"))
+
+    assert records == [
+        {"name": "flour", "quantity": 2.0, "unit": "cup"},
+        {"name": "olive oil", "quantity": 2.0, "unit": "tbsp"},
+        {"name": "3 mystery", "quantity": None, "unit": None},
+    ]
+    assert parsed_lines == ["• 2 cups flour", "• lots 3 mystery"]
+
+
+def test_near_duplicate_query_reuses_the_generation(monkeypatch, provider):
+    monkeypatch.setattr(generator, "SEMANTIC_INDEX", SemanticIndex(HashingEmbedder()))
+    first = asyncio.run(generator.generate_recipe("tomato soups", 2, False))
+    second = asyncio.run(generator.generate_recipe("how to make tomato soup", 2, False))
+
+    assert provider.calls == 1
+    assert second["ingredients"] == first["ingredients"]
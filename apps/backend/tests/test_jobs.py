@@ -0,0 +1,135 @@
+import asyncio
+import json
+import sys
+import time
+from types import SimpleNamespace
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.backend.routes import simulate
+from apps.backend.services import jobs
+from apps.backend.services.jobs import TERMINAL_STATUSES, InMemoryJobStore, Job, JobManager, JobStore, SQLiteJobStore
+
+
+def _job(job_id, status, updated_at):
+    return Job(job_id=job_id, status=status, params={}, created_at=updated_at, updated_at=updated_at)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryJobStore()
+    return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def _wait_for(store, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job is not None and job.status in TERMINAL_STATUSES:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_store_is_abstract():
+    with pytest.raises(TypeError):
+        JobStore()  # pylint: disable=abstract-class-instantiated
+
+
+def test_events_are_sequenced(store):
+    store.create(_job("a", "queued", time.time()))
+    assert store.append_event("a", "status", {"status": "queued"}) == 1
+    assert store.append_event("a", "progress", {"done": 10}) == 2
+    assert [event.event for event in store.events("a", after_seq=1)] == ["progress"]
+
+
+def test_purge_removes_only_old_finished_jobs(store):
+    now = time.time()
+    store.create(_job("old-done", "succeeded", now - 100))
+    store.create(_job("old-failed", "failed", now - 100))
+    store.create(_job("old-running", "running", now - 100))
+    store.create(_job("new-done", "succeeded", now))
+    store.append_event("old-done", "result", {})
+
+    assert store.purge(now - 50) == 2
+    assert store.get("old-done") is None and store.events("old-done") == []
+    assert store.get("old-failed") is None
+    assert store.get("old-running") is not None
+    assert store.get("new-done") is not None
+
+
+def test_manager_runs_jobs_and_purges_expired_ones(monkeypatch, store):
+    persisted = []
+
+    def simulate(recipe_id, progress=None, **options):
+        progress({"samples": 10})
+        return {
+            "eco_score": 0.8,
+            "co2_saved_kg": 1.2,
+            "variance_cost": 0.1,
+            "best_sources": ["local"],
+            "route_cluster": "A",
+        }
+
+    monkeypatch.setattr(jobs, "run_simulation", simulate)
+    manager = JobManager(store, workers=1, persist=lambda **row: persisted.append(row), retention=60)
+    try:
+        job = manager.submit("recipe-1", n_samples=10)
+        finished = _wait_for(store, job.job_id)
+    finally:
+        manager.shutdown()
+
+    assert finished.status == "succeeded" and finished.result["eco_score"] == 0.8
+    assert [event.event for event in store.events(job.job_id)] == ["status", "status", "progress", "result"]
+    assert persisted[0]["recipe_id"] == "recipe-1"
+
+    assert manager.purge_expired(now=time.time() + 30) == 0
+    assert manager.purge_expired(now=time.time() + 120) == 1
+    assert store.get(job.job_id) is None
+
+
+def test_manager_records_failures(monkeypatch):
+    def broken(recipe_id, progress=None, **options):
+        raise RuntimeError("no ingredients")
+
+    monkeypatch.setattr(jobs, "run_simulation", broken)
+    store = InMemoryJobStore()
+    manager = JobManager(store, workers=1, persist=lambda **row: None)
+    try:
+        finished = _wait_for(store, manager.submit("recipe-1").job_id)
+    finally:
+        manager.shutdown()
+    assert finished.status == "failed" and finished.error == "no ingredients"
+
+
+def test_retention_must_be_positive():
+    with pytest.raises(ValueError):
+        JobManager(InMemoryJobStore(), retention=0)
+
+
+def test_event_stream_ends_when_the_job_is_purged(monkeypatch):
+    store = InMemoryJobStore()
+    store.create(_job("a", "running", time.time()))
+    store.append_event("a", "progress", {"done": 10})
+    monkeypatch.setattr(simulate, "get_job_manager", lambda: SimpleNamespace(store=store))
+    monkeypatch.setattr(simulate, "JOB_EVENT_POLL_SECONDS", 0.01)
+
+    async def collect():
+        frames = []
+        async for frame in simulate._job_event_stream("a", 0):
+            frames.append(frame)
+            # The job finishes without a terminal event reaching the stream, then retention purges it.
+            if store.get("a") is not None:
+                store.update("a", status="succeeded", updated_at=0.0)
+                store.purge(time.time())
+        return frames
+
+    frames = asyncio.run(asyncio.wait_for(collect(), timeout=5))
+    assert frames[0].startswith("id: 1\nevent: progress")
+    assert frames[-1].startswith("event: error") and json.loads(frames[-1].split("data: ")[1])["error"] == "Unknown job"
@@ -0,0 +1,86 @@
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.backend.services.partial_json import IncrementalRecipeParser, repair_json_object
+
+RECIPE = {
+    "title": "Pancakes",
+    "servings": 2,
+    "ingredients": [{"name": "flour", "quantity": 1, "unit": "cup"}, {"name": "milk", "quantity": 1.5, "unit": "cup"}],
+    "steps": ["Mix.", "Fry."],
+}
+
+
+def test_incremental_parser_emits_parts_across_chunk_boundaries():
+    text = "Sure! " + json.dumps(RECIPE) + " Enjoy"
+    parser = IncrementalRecipeParser()
+    events = []
+    for start in range(0, len(text), 7):
+        events.extend(parser.feed(text[start : start + 7]))
+
+    assert events == [
+        ("title", "Pancakes"),
+        ("servings", 2),
+        ("ingredient", RECIPE["ingredients"][0]),
+        ("ingredient", RECIPE["ingredients"][1]),
+        ("step", "Mix."),
+        ("step", "Fry."),
+    ]
+    assert parser.complete
+    assert parser.result() == RECIPE
+
+
+def test_incremental_parser_only_buffers_the_value_being_read():
+    recipe = dict(RECIPE, steps=[f"Step {i}." for i in range(2000)])
+    text = json.dumps(recipe)
+    parser = IncrementalRecipeParser()
+    widest = 0
+    steps = 0
+    for char in text:
+        steps += sum(event == "step" for event, _ in parser.feed(char))
+        widest = max(widest, len(parser._window))
+    assert steps == 2000
+    assert widest < 80
+    assert parser.result() == recipe and parser.text == text
+
+
+def test_incremental_parser_has_no_result_until_the_object_closes():
+    parser = IncrementalRecipeParser()
+    parser.feed(json.dumps(RECIPE)[:-1])
+    assert not parser.complete
+    assert parser.result() is None
+
+
+def test_repair_recovers_prose_wrapped_and_loosely_quoted_objects():
+    fenced = "Here is your recipe:\n```json\n" + json.dumps(RECIPE) + "\n```"
+    assert repair_json_object(fenced) == RECIPE
+
+    loose = "{'title': 'Pancakes', servings: 2, 'ingredients': [{'name': \"baker's flour\", 'quantity': 1, 'unit': None},], 'steps': ['Mix.' 'Fry.']}"
+    assert repair_json_object(loose) == {
+        "title": "Pancakes",
+        "servings": 2,
+        "ingredients": [{"name": "baker's flour", "quantity": 1, "unit": None}],
+        "steps": ["Mix.", "Fry."],
+    }
+
+
+def test_repair_drops_a_truncated_ingredient_whole():
+    assert repair_json_object('{"title": "x", "ingredients": [{"name": "salt", "quantity":') == {"title": "x", "ingredients": []}
+    assert repair_json_object('{"title": "x", "ingredients": [{"name": "a", "quantity": 1}, {"name": "salt", "quantity":') == {
+        "title": "x",
+        "ingredients": [{"name": "a", "quantity": 1}],
+    }
+
+
+def test_repair_drops_a_truncated_step_and_value():
+    assert repair_json_object('{"title": "x", "steps": ["one", "tw') == {"title": "x", "steps": ["one"]}
+    assert repair_json_object('{"title": "X", "servings": 12') == {"title": "X"}
+
+
+def test_repair_gives_up_without_an_object():
+    assert repair_json_object("no json here") is None
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("GEN_PROVIDER", "stub")
+os.environ.setdefault("GEN_SEMANTIC_CACHE", "0")
+
+from apps.backend.services import prewarm
+from apps.backend.services.concurrency import CapacityError
+from apps.backend.services.prewarm import CacheWarmer
+
+DAY = 86_400
+
+
+def _row(query, age_days, servings=2):
+    return {"key_hash": query, "query": query, "servings": servings, "hit_count": 10, "created": time.time() - age_days * DAY}
+
+
+@pytest.fixture
+def refreshed(monkeypatch):
+    calls = []
+
+    async def refresh(query, servings):
+        calls.append((query, servings))
+        return {}
+
+    monkeypatch.setenv("GEN_CACHE_TTL_DAYS", "7")
+    monkeypatch.setattr(prewarm, "refresh_recipe", refresh)
+    return calls
+
+
+def test_only_entries_expiring_soon_are_refreshed(monkeypatch, refreshed):
+    rows = [_row("old", 6.9), _row("fresh", 1), _row("older", 6.95, servings=4)]
+    monkeypatch.setattr(prewarm, "popular_generations", lambda top_k: rows[:top_k])
+
+    summary = asyncio.run(CacheWarmer(top_k=3, refresh_hours=12, rate_per_minute=6000).run_once())
+
+    assert refreshed == [("old", 2), ("older", 4)]
+    assert {key: summary[key] for key in ("candidates", "due", "refreshed", "failed")} == {
+        "candidates": 3,
+        "due": 2,
+        "refreshed": 2,
+        "failed": 0,
+    }
+
+
+def test_refreshes_are_paced(monkeypatch, refreshed):
+    monkeypatch.setattr(prewarm, "popular_generations", lambda top_k: [_row(f"q{i}", 7) for i in range(3)])
+    started = time.monotonic()
+    asyncio.run(CacheWarmer(rate_per_minute=1200).run_once())  # one refresh every 50 ms
+    assert len(refreshed) == 3
+    assert time.monotonic() - started >= 0.1
+
+
+def test_run_stops_when_the_provider_struggles(monkeypatch):
+    monkeypatch.setattr(prewarm, "popular_generations", lambda top_k: [_row(f"q{i}", 7) for i in range(6)])
+    attempts = []
+
+    async def failing(query, servings):
+        attempts.append(query)
+        raise RuntimeError("upstream 503")
+
+    monkeypatch.setattr(prewarm, "refresh_recipe", failing)
+    warmer = CacheWarmer(rate_per_minute=6000)
+    assert asyncio.run(warmer.run_once())["failed"] == prewarm.MAX_CONSECUTIVE_FAILURES
+
+    async def saturated(query, servings):
+        raise CapacityError("executor saturated")
+
+    monkeypatch.setattr(prewarm, "refresh_recipe", saturated)
+    assert asyncio.run(warmer.run_once())["failed"] == 1
+    assert warmer.stats()["runs"] == 2
+
+
+def test_missing_supabase_means_nothing_to_warm(monkeypatch, refreshed):
+    def unavailable(top_k):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(prewarm, "popular_generations", unavailable)
+    assert asyncio.run(CacheWarmer().run_once())["candidates"] == 0
+    assert refreshed == []
+
+
+def test_warmer_rejects_bad_settings():
+    with pytest.raises(ValueError):
+        CacheWarmer(top_k=0)
+    with pytest.raises(ValueError):
+        CacheWarmer(rate_per_minute=0)
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.backend.services.scaling import rescale_recipe
+
+RECIPE = {
+    "servings": 2,
+    "ingredients": [
+        {"name": "pasta", "quantity": 200.0, "unit": "g"},
+        {"name": "butter", "quantity": 1.5, "unit": "tsp"},
+        {"name": "salt", "quantity": 1.0, "unit": "pinch"},
+        {"name": "pepper", "quantity": None, "unit": None},
+    ],
+}
+
+
+def test_rescale_is_unit_aware():
+    scaled = rescale_recipe(RECIPE, 4)
+    assert scaled["servings"] == 4
+    assert scaled["ingredients"] == [
+        {"name": "pasta", "quantity": 400.0, "unit": "g"},
+        {"name": "butter", "quantity": 1.0, "unit": "tbsp"},
+        {"name": "salt", "quantity": 1.0, "unit": "pinch"},
+        {"name": "pepper", "quantity": None, "unit": None},
+    ]
+    assert RECIPE["ingredients"][0]["quantity"] == 200.0  # the cached payload is untouched
+
+
+def test_rescale_leaves_unknown_or_equal_servings_alone():
+    assert rescale_recipe(RECIPE, 2) == RECIPE
+    assert rescale_recipe({"ingredients": RECIPE["ingredients"]}, 3) == {"ingredients": RECIPE["ingredients"]}
+
+
+def test_rescale_rejects_non_positive_servings():
+    with pytest.raises(ValueError):
+        rescale_recipe(RECIPE, 0)
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.backend.services import semantic_cache
+from apps.backend.services.semantic_cache import HashingEmbedder, SemanticIndex, normalize_query
+
+SCOPE = "stub|stub"
+
+
+def test_normalize_query_drops_filler_and_plurals():
+    assert normalize_query("How to make Tomato Soups!") == normalize_query("tomato soup recipe")
+
+
+def test_near_duplicates_match_within_their_scope():
+    index = SemanticIndex(HashingEmbedder())
+    index.add("tomato soup", "key-1", 2, SCOPE)
+
+    match = index.search("how to make tomato soups", SCOPE)
+    assert match is not None and match.key_hash == "key-1" and match.servings == 2
+    assert index.search("tomato soup", "hf|other-model") is None
+    assert index.search("chocolate cake", SCOPE) is None
+    assert (index.stats()["hits"], index.stats()["misses"]) == (1, 2)
+
+
+def test_expired_entries_do_not_match():
+    index = SemanticIndex(HashingEmbedder())
+    index.add("tomato soup", "key-1", 2, SCOPE)
+    index._entries[0]["created_at"] -= 10 * semantic_cache.SECONDS_PER_DAY
+    assert index.search("tomato soup", SCOPE, ttl_days=30) is not None
+    assert index.search("tomato soup", SCOPE, ttl_days=7) is None
+
+
+def test_index_persists_only_with_a_path(tmp_path):
+    in_memory = SemanticIndex(HashingEmbedder())
+    in_memory.add("tomato soup", "key-1", 2, SCOPE)
+    assert in_memory.save_if_due(0.0) is False
+
+    first = SemanticIndex(HashingEmbedder(), path=tmp_path / "index")
+    first.add("tomato soup", "key-1", 2, SCOPE)
+    assert first.save_if_due(0.0) is True
+    second = SemanticIndex(HashingEmbedder(), path=tmp_path / "index")
+    second.add("lentil stew", "key-2", 4, SCOPE)
+    second.save()
+
+    reloaded = SemanticIndex(HashingEmbedder(), path=tmp_path / "index")
+    assert len(reloaded) == 2
+    assert reloaded.search("tomato soups", SCOPE).key_hash == "key-1"
+
+
+def test_semantic_cache_is_opt_in_and_in_memory_by_default(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "_INDEX", None)
+    monkeypatch.delenv("GEN_SEMANTIC_CACHE", raising=False)
+    monkeypatch.delenv("GEN_SEMANTIC_INDEX_PATH", raising=False)
+    assert semantic_cache.get_semantic_index() is None
+
+    monkeypatch.setenv("GEN_SEMANTIC_CACHE", "1")
+    monkeypatch.setenv("GEN_SEMANTIC_THRESHOLD", "high")
+    monkeypatch.setenv("GEN_SEMANTIC_MAX_ENTRIES", "2e4")
+    index = semantic_cache.get_semantic_index()
+    assert index is not None and index.path is None
+    assert (index.threshold, index.max_entries) == (semantic_cache.DEFAULT_THRESHOLD, semantic_cache.DEFAULT_MAX_ENTRIES)
@@ -0,0 +1,116 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.backend.services.singleflight import SingleFlight
+
+
+def test_concurrent_coroutines_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"items": [1]}
+
+    async def run():
+        return await asyncio.gather(*(flight.ado("k", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results == [{"items": [1]}] * 5
+    assert len({id(result) for result in results}) == 5  # every caller gets its own copy
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": 4}
+
+
+def test_threads_and_event_loops_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return "done"
+
+    def blocking_work():
+        calls.append(1)
+        time.sleep(0.2)
+        return "done"
+
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(flight.ado("k", work)))) for _ in range(3)]
+    threads += [threading.Thread(target=lambda: results.append(flight.do("k", blocking_work))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["done"] * 6
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    async def run():
+        return await asyncio.gather(flight.ado("k", work), flight.ado("k", work), return_exceptions=True)
+
+    assert [str(error) for error in asyncio.run(run())] == ["upstream failed"] * 2
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_recheck_short_circuits_the_work():
+    flight = SingleFlight()
+
+    async def recheck():
+        return "cached"
+
+    async def work():
+        raise AssertionError("should not run")
+
+    assert asyncio.run(flight.ado("k", work, recheck=recheck)) == "cached"
+    assert flight.do("k", lambda: pytest.fail("should not run"), recheck=lambda: "cached") == "cached"
+    assert flight.stats()["executions"] == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.ado("k", work))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.ado("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_process_lock_is_taken_and_released(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path), lock_timeout=1.0)
+
+    async def work():
+        return "done"
+
+    assert asyncio.run(flight.ado("k", work)) == "done"
+    assert flight.do("k", lambda: "again") == "again"
+    assert (tmp_path / "k.lock").exists()
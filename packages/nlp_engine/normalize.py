@@ -0,0 +1,137 @@
+"""Model-free normalisation of already-structured ingredient records.
+
+``parse`` turns free text into ``{"name", "quantity", "unit"}`` records with
+two transformer passes. Generator output is already structured, so most items
+only need the clean-up ``parse`` applies at the end: canonical units and
+tightened names. ``normalize_ingredient`` does that directly and reports
+whether the record is trustworthy; only the ones that are not (quantities
+hidden in the name, unreadable amounts) need the model. ``parse`` reads
+amounts and tightens names with the same ``parse_number`` and ``tighten_name``,
+so both paths produce identical records.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .units import normalize_unit
+
+FRACTION_MAP = {
+    "½": "1/2",
+    "¼": "1/4",
+    "¾": "3/4",
+    "⅓": "1/3",
+    "⅔": "2/3",
+    "⅛": "1/8",
+    "⅜": "3/8",
+    "⅝": "5/8",
+    "⅞": "7/8",
+}
+
+_LEADING_ARTICLE = re.compile(r"^(and|with|of|in|the|a|an)\b", re.IGNORECASE)
+_LEADING_QUANTITY = re.compile(r"^\s*(?:\d|[¼½¾⅓⅔⅛⅜⅝⅞])")
+_AMOUNT_WITH_UNIT = re.compile(
+    r"^(?P<num>(?:\d+\s+)?\d+(?:[\./]\d+)?|(?:\d+\s*)?[¼½¾⅓⅔⅛⅜⅝⅞])\s*(?P<unit>[a-zA-Z][a-zA-Z\. ]*)?$"
+)
+
+__all__ = [
+    "FRACTION_MAP",
+    "normalize_ingredient",
+    "normalize_ingredients",
+    "parse_number",
+    "tighten_name",
+]
+
+
+def parse_number(text: str) -> Optional[float]:
+    """``"1 1/2"``, ``"3/4"``, ``"½"`` or ``"2.5"`` as a float; None when not a number."""
+    cleaned = text.strip()
+    if not cleaned:
+        return None
+    for uni, ascii_frac in FRACTION_MAP.items():
+        cleaned = cleaned.replace(uni, f" {ascii_frac}")
+    cleaned = " ".join(cleaned.replace("-", " ").replace("+", " ").split())
+    try:
+        return float(cleaned)
+    except ValueError:
+        pass
+    parts = cleaned.split()
+    if len(parts) == 2:
+        whole = parse_number(parts[0])
+        frac = parse_number(parts[1])
+        if whole is not None and frac is not None and "/" in parts[1]:
+            return whole + frac
+        return None
+    if len(parts) == 1 and "/" in cleaned:
+        try:
+            numerator, denominator = cleaned.split("/", 1)
+            return float(numerator) / float(denominator)
+        except (ValueError, ZeroDivisionError):
+            return None
+    return None
+
+
+def tighten_name(name: Optional[str]) -> Optional[str]:
+    """Strip edge punctuation and a leading article/conjunction ("and salt" -> "salt")."""
+    if not name:
+        return name
+    refined = name.strip(",. ")
+    refined = _LEADING_ARTICLE.sub("", refined)
+    return refined.strip()
+
+
+def _quantity(value: Any) -> Tuple[Optional[float], Optional[str], bool]:
+    """Numeric quantity, a unit found inside a quantity string, and whether the value was readable."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None, None, True
+    if isinstance(value, bool):
+        return None, None, False
+    if isinstance(value, (int, float)):
+        return float(value), None, True
+    if isinstance(value, str):
+        number = parse_number(value)
+        if number is not None:
+            return number, None, True
+        match = _AMOUNT_WITH_UNIT.match(value.strip())
+        if match:
+            number = parse_number(match.group("num"))
+            if number is not None:
+                return number, match.group("unit"), True
+    return None, None, False
+
+
+def normalize_ingredient(item: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """Normalised ``{"name", "quantity", "unit"}`` record and whether it passed validation.
+
+    A record fails when its name is empty after tightening or still starts
+    with an amount (``"2 cups flour"``), when its quantity cannot be read as a
+    number, or when its unit contains digits. Failed records are returned
+    as-is for the caller to re-parse.
+    """
+    name = tighten_name(str(item.get("name") or ""))
+    quantity, embedded_unit, readable = _quantity(item.get("quantity"))
+    raw_unit = item.get("unit") if item.get("unit") not in (None, "") else embedded_unit
+    unit = normalize_unit(raw_unit) if raw_unit is not None else None
+    valid = (
+        readable
+        and bool(name)
+        and not _LEADING_QUANTITY.match(name or "")
+        and not (unit is not None and any(char.isdigit() for char in unit))
+    )
+    if not valid:
+        return dict(item), False
+    return {"name": name, "quantity": quantity, "unit": unit}, True
+
+
+def normalize_ingredients(items: List[Dict[str, Any]]) -> Tuple[List[Optional[Dict[str, Any]]], List[int]]:
+    """Normalise every record; return the list (None where validation failed) and the failed positions."""
+    normalized: List[Optional[Dict[str, Any]]] = []
+    failed: List[int] = []
+    for position, item in enumerate(items):
+        record, ok = normalize_ingredient(item)
+        if ok:
+            normalized.append(record)
+        else:
+            normalized.append(None)
+            failed.append(position)
+    return normalized, failed
@@ -18,6 +18,9 @@ from transformers import (
     AutoTokenizer,
 )
 
+from .normalize import parse_number, tighten_name
+from .units import normalize_unit
+
 PROJECT_ROOT = Path(__file__).resolve().parent
 NER_MODEL_DIR = PROJECT_ROOT / "model" / "token_classification"
 CLS_MODEL_DIR = PROJECT_ROOT / "model" / "text_classification"
@@ -41,27 +44,6 @@ _DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 _NER_RESOURCES: Dict[str, object] | None = None
 _CLS_RESOURCES: Dict[str, object] | None = None
 
-FRACTION_MAP = {
-    "½": "1/2",
-    "¼": "1/4",
-    "¾": "3/4",
-    "⅓": "1/3",
-    "⅔": "2/3",
-    "⅛": "1/8",
-    "⅜": "3/8",
-    "⅝": "5/8",
-    "⅞": "7/8",
-}
-
-UNIT_NORMALIZATION = {
-    "tbs": "tbsp",
-    "tb": "tbsp",
-    "tbl": "tbsp",
-    "tbls": "tbsp",
-    "teas": "tsp",
-    "ts": "tsp",
-}
-
 
 @dataclass
 class EntitySpan:
@@ -236,36 +218,6 @@ def _sequence_classification(text: str) -> str:
     return id2label[prediction]
 
 
-def _parse_number(text: str) -> Optional[float]:
-    cleaned = text.strip()
-    if not cleaned:
-        return None
-    for uni, ascii_frac in FRACTION_MAP.items():
-        cleaned = cleaned.replace(uni, ascii_frac)
-    cleaned = cleaned.replace("-", " ").replace("+", " ")
-    try:
-        return float(cleaned)
-    except ValueError:
-        pass
-    if "/" in cleaned:
-        try:
-            numerator, denominator = cleaned.split("/", 1)
-            return float(numerator) / float(denominator)
-        except (ValueError, ZeroDivisionError):
-            return None
-    if " " in cleaned:
-        parts = cleaned.split()
-        if len(parts) == 2:
-            try:
-                whole = float(parts[0])
-            except ValueError:
-                whole = None
-            frac = _parse_number(parts[1])
-            if whole is not None and frac is not None:
-                return whole + frac
-    return None
-
-
 def _parse_quantity(text: str) -> Tuple[Optional[float | str], Optional[str]]:
     candidate = text.strip()
     if not candidate:
@@ -274,7 +226,7 @@ def _parse_quantity(text: str) -> Tuple[Optional[float | str], Optional[str]]:
     if match:
         number_part = match.group("num")
         unit_part = match.group("unit")
-        value = _parse_number(number_part)
+        value = parse_number(number_part)
         if value is not None:
             return value, unit_part.lower() if unit_part else None
     return candidate, None
@@ -326,13 +278,9 @@ def _normalize_entities(entities: List[EntitySpan]) -> List[Dict[str, Optional[o
                     pending["unit"] = unit_hint
         elif ent.label == "UNIT":
             if current is not None and current.get("unit") is None:
-                unit_value = value.lower().rstrip(".")
-                unit_value = UNIT_NORMALIZATION.get(unit_value, unit_value)
-                current["unit"] = unit_value
+                current["unit"] = normalize_unit(value)
             else:
-                unit_value = value.lower().rstrip(".")
-                unit_value = UNIT_NORMALIZATION.get(unit_value, unit_value)
-                pending["unit"] = unit_value
+                pending["unit"] = normalize_unit(value)
         elif ent.label == "FORM":
             if current is not None and current.get("form") is None:
                 current["form"] = value
@@ -374,15 +322,14 @@ def _apply_fallback_quantities(
         if not matches:
             continue
         best_match = min(matches, key=lambda m: abs((window_start + m.start()) - span_start))
-        qty_val = _parse_number(best_match.group("num"))
+        qty_val = parse_number(best_match.group("num"))
         unit_val = best_match.group("unit")
         if qty_val is not None and (
             item.get("quantity") is None or (isinstance(item.get("quantity"), (int, float)) and abs(item["quantity"] - qty_val) > 1e-6)
         ):
             item["quantity"] = qty_val
         if unit_val:
-            normalized_unit = unit_val.lower().rstrip(".")
-            normalized_unit = UNIT_NORMALIZATION.get(normalized_unit, normalized_unit)
+            normalized_unit = normalize_unit(unit_val)
             if item.get("unit") in (None, "", normalized_unit):
                 item["unit"] = normalized_unit
             elif item.get("unit") != normalized_unit:
@@ -441,43 +388,8 @@ def parse(text: str, tz: str = "America/New_York") -> Dict[str, object]:
     }
 
     # --- normalization & tighter spans ---
-    def normalize_units(u: Optional[str]) -> Optional[str]:
-        if not u:
-            return u
-        value = u.lower().strip(".")
-        mapping = {
-            "t": "tsp",
-            "tspn": "tsp",
-            "teaspoon": "tsp",
-            "teaspoons": "tsp",
-            "tb": "tbsp",
-            "tbspn": "tbsp",
-            "tablespoon": "tbsp",
-            "tablespoons": "tbsp",
-            "gms": "g",
-            "gram": "g",
-            "grams": "g",
-            "kg": "g",
-            "kgs": "g",
-            "oz": "g",
-            "lb": "g",
-            "lbs": "g",
-            "clove": "clove",
-            "cloves": "clove",
-            "cup": "cup",
-            "cups": "cup",
-        }
-        return mapping.get(value, value)
-
-    def tighten_name(name: Optional[str]) -> Optional[str]:
-        if not name:
-            return name
-        refined = name.strip(",. ")
-        refined = re.sub(r"^(and|with|of|in|the|a|an)\b", "", refined, flags=re.IGNORECASE)
-        return refined.strip()
-
     for ing in result["ingredients"]:
-        ing["unit"] = normalize_units(ing.get("unit"))
+        ing["unit"] = normalize_unit(ing.get("unit"))
         ing["name"] = tighten_name(ing.get("name"))
 
     return result
@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from packages.nlp_engine.normalize import normalize_ingredient, normalize_ingredients, parse_number
+
+
+def test_parse_number_handles_fractions():
+    assert parse_number("1 1/2") == 1.5
+    assert parse_number("½") == 0.5
+    assert parse_number("1½") == 1.5
+    assert parse_number("2.25") == 2.25
+    assert parse_number("a handful") is None
+
+
+def test_structured_records_are_normalized_without_the_model():
+    record, ok = normalize_ingredient({"name": "and olive oil,", "quantity": "1/4", "unit": "Cups"})
+    assert ok
+    assert record == {"name": "olive oil", "quantity": 0.25, "unit": "cup"}
+
+    record, ok = normalize_ingredient({"name": "butter", "quantity": "2 tablespoons", "unit": None})
+    assert ok
+    assert record == {"name": "butter", "quantity": 2.0, "unit": "tbsp"}
+
+
+def test_only_unreadable_records_fail_validation():
+    normalized, failed = normalize_ingredients(
+        [
+            {"name": "salt", "quantity": None, "unit": "pinch"},
+            {"name": "2 cups flour", "quantity": None, "unit": None},
+            {"name": "basil", "quantity": "a handful", "unit": None},
+        ]
+    )
+    assert failed == [1, 2]
+    assert normalized[0] == {"name": "salt", "quantity": None, "unit": "pinch"}
+    assert normalized[1] is None and normalized[2] is None
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from packages.nlp_engine.units import normalize_unit, scale_quantity
+
+
+def test_normalize_unit_aliases():
+    assert normalize_unit("Tablespoons") == "tbsp"
+    assert normalize_unit("Tbs.") == "tbsp"
+    assert normalize_unit("fl. oz") == "fl oz"
+    assert normalize_unit("  ") is None
+    assert normalize_unit("sprig") == "sprig"
+
+
+def test_normalize_unit_keeps_the_measure():
+    # Mass units are canonicalised, never converted (the quantity would be wrong).
+    assert normalize_unit("gms") == "g"
+    assert normalize_unit("Kgs") == "kg"
+    assert normalize_unit("oz.") == "oz"
+    assert normalize_unit("lbs") == "lb"
+
+
+def test_scale_quantity_moves_between_units_of_one_system():
+    assert scale_quantity(3, "tsp", 2) == (2.0, "tbsp")
+    assert scale_quantity(1.5, "tsp", 2) == (1.0, "tbsp")
+    assert scale_quantity(4, "tbsp", 3) == (0.75, "cup")
+    assert scale_quantity(2, "tbsp", 4) == (0.5, "cup")
+    assert scale_quantity(1, "lb", 0.5) == (8.0, "oz")
+    assert scale_quantity(750, "ml", 2) == (1.5, "l")
+    assert scale_quantity(1, "quart", 3) == (3.0, "quart")
+
+
+def test_scale_quantity_leaves_seasoning_and_counts_sensible():
+    assert scale_quantity(1, "pinch", 4) == (1, "pinch")
+    assert scale_quantity(3, None, 1.5) == (4.5, None)
+    assert scale_quantity(None, "cup", 2) == (None, "cup")
@@ -0,0 +1,160 @@
+"""Dependency-free unit normalisation and unit-aware quantity scaling.
+
+``UNIT_ALIASES`` and ``normalize_unit`` are the one canonical unit table: the
+extractor, the generator normaliser and the simulation memo all map the
+spellings they see ("tablespoons", "Tbs.", "grams") onto one unit per measure
+through it.
+``scale_quantity`` multiplies a quantity and re-expresses it in the most
+readable unit of the same system, so doubling 3 tsp gives 2 tbsp and halving
+1 lb gives 8 oz rather than 0.5 lb. Seasoning-by-feel units (pinch, dash, to
+taste) are left alone.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+UNIT_ALIASES: Dict[str, str] = {
+    "t": "tsp",
+    "teaspoon": "tsp",
+    "teaspoons": "tsp",
+    "tspn": "tsp",
+    "teas": "tsp",
+    "ts": "tsp",
+    "tsps": "tsp",
+    "tablespoon": "tbsp",
+    "tablespoons": "tbsp",
+    "tbspn": "tbsp",
+    "tbs": "tbsp",
+    "tb": "tbsp",
+    "tbl": "tbsp",
+    "tbls": "tbsp",
+    "tbsps": "tbsp",
+    "c": "cup",
+    "cups": "cup",
+    "fluid ounce": "fl oz",
+    "fluid ounces": "fl oz",
+    "fl. oz": "fl oz",
+    "floz": "fl oz",
+    "pints": "pint",
+    "pt": "pint",
+    "quarts": "quart",
+    "qt": "quart",
+    "gallons": "gallon",
+    "gal": "gallon",
+    "milliliter": "ml",
+    "milliliters": "ml",
+    "millilitre": "ml",
+    "millilitres": "ml",
+    "liter": "l",
+    "liters": "l",
+    "litre": "l",
+    "litres": "l",
+    "gram": "g",
+    "grams": "g",
+    "gr": "g",
+    "gms": "g",
+    "kilogram": "kg",
+    "kilograms": "kg",
+    "kgs": "kg",
+    "milligram": "mg",
+    "milligrams": "mg",
+    "ounce": "oz",
+    "ounces": "oz",
+    "pound": "lb",
+    "pounds": "lb",
+    "lbs": "lb",
+    "pinches": "pinch",
+    "dashes": "dash",
+    "cloves": "clove",
+    "slices": "slice",
+    "pieces": "piece",
+    "cans": "can",
+}
+
+# Size of each unit in the base unit of its measure (ml for volume, g for mass).
+# US volumes are exact multiples of the teaspoon so 3 tsp is exactly 1 tbsp.
+US_TSP_ML = 4.92892159375
+VOLUME_ML: Dict[str, float] = {
+    "tsp": US_TSP_ML,
+    "tbsp": 3 * US_TSP_ML,
+    "fl oz": 6 * US_TSP_ML,
+    "cup": 48 * US_TSP_ML,
+    "pint": 96 * US_TSP_ML,
+    "quart": 192 * US_TSP_ML,
+    "gallon": 768 * US_TSP_ML,
+    "ml": 1.0,
+    "l": 1000.0,
+}
+MASS_G: Dict[str, float] = {"mg": 0.001, "g": 1.0, "kg": 1000.0, "oz": 28.3495, "lb": 453.592}
+
+# Units a scaled quantity may be re-expressed in, largest first, with the
+# smallest amount worth writing in that unit.
+_US_VOLUME_LADDER: Tuple[Tuple[str, float], ...] = (("cup", 0.25), ("tbsp", 1.0), ("tsp", 0.0))
+_METRIC_VOLUME_LADDER: Tuple[Tuple[str, float], ...] = (("l", 1.0), ("ml", 0.0))
+_US_MASS_LADDER: Tuple[Tuple[str, float], ...] = (("lb", 1.0), ("oz", 0.0))
+_METRIC_MASS_LADDER: Tuple[Tuple[str, float], ...] = (("kg", 1.0), ("g", 0.0))
+
+NON_SCALING_UNITS = frozenset({"pinch", "dash", "to taste", "sprinkle"})
+US_FRACTION_DENOMINATOR = 8
+
+__all__ = [
+    "MASS_G",
+    "NON_SCALING_UNITS",
+    "UNIT_ALIASES",
+    "VOLUME_ML",
+    "normalize_unit",
+    "scale_quantity",
+]
+
+
+def normalize_unit(unit: Optional[str]) -> Optional[str]:
+    """Canonical spelling of ``unit`` (unknown units are lower-cased and kept); None when empty."""
+    if unit is None:
+        return None
+    text = " ".join(str(unit).lower().replace(".", " ").split())
+    if not text:
+        return None
+    return UNIT_ALIASES.get(text, text)
+
+
+def _ladder(unit: str) -> Optional[Tuple[Dict[str, float], Tuple[Tuple[str, float], ...]]]:
+    if unit in ("ml", "l"):
+        return VOLUME_ML, _METRIC_VOLUME_LADDER
+    if unit in VOLUME_ML:
+        return VOLUME_ML, _US_VOLUME_LADDER
+    if unit in ("mg", "g", "kg"):
+        return MASS_G, _METRIC_MASS_LADDER
+    if unit in MASS_G:
+        return MASS_G, _US_MASS_LADDER
+    return None
+
+
+def _round_amount(amount: float, unit: str) -> float:
+    if unit in ("ml", "g"):
+        return float(round(amount)) if amount >= 10 else round(amount, 1)
+    if unit in ("l", "kg"):
+        return round(amount, 2)
+    # Kitchen measures read best as eighths (1/8 tsp, 3/4 cup, 1 1/2 lb).
+    eighths = round(amount * US_FRACTION_DENOMINATOR) / US_FRACTION_DENOMINATOR
+    return eighths if eighths > 0 else round(amount, 3)
+
+
+def scale_quantity(quantity: Optional[float], unit: Optional[str], factor: float) -> Tuple[Optional[float], Optional[str]]:
+    """Return ``(quantity * factor, unit)`` re-expressed in a readable unit of the same system."""
+    canonical = normalize_unit(unit)
+    if quantity is None or factor == 1.0 or canonical in NON_SCALING_UNITS:
+        return quantity, canonical if canonical is not None else unit
+    scaled = float(quantity) * factor
+    ladder = _ladder(canonical) if canonical is not None else None
+    if ladder is None:
+        return round(scaled, 2), canonical
+    sizes, steps = ladder
+    if canonical not in {candidate for candidate, _ in steps}:
+        # Pints, quarts, fluid ounces etc. stay in the unit the recipe chose.
+        return _round_amount(scaled, canonical), canonical  # type: ignore[arg-type]
+    base = scaled * sizes[canonical]  # type: ignore[index]
+    for candidate, minimum in steps:
+        amount = base / sizes[candidate]
+        if amount >= minimum:
+            return _round_amount(amount, candidate), candidate
+    return _round_amount(scaled, canonical), canonical  # type: ignore[arg-type]
@@ -0,0 +1 @@
+# Marks this directory as a Python package
@@ -0,0 +1,179 @@
+"""Micro-benchmarks for the simulation engine with JSON baselines and regression checks.
+
+Usage:
+  ``python -m packages.simulation_engine.benchmarks.perf run --output baseline.json``
+  ``python -m packages.simulation_engine.benchmarks.perf run --output current.json --max-n 100000``
+  ``python -m packages.simulation_engine.benchmarks.perf compare baseline.json current.json --threshold 0.15``
+
+Factor APIs and the supplier index are stubbed and every repeat starts from
+cleared caches, so timings cover sampling and aggregation only. Each case
+reports the median and minimum wall time over ``--repeats`` runs plus the
+tracemalloc peak of one extra run (measured separately, since tracing slows
+NumPy allocation down).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from packages.simulation_engine import montecarlo
+from packages.simulation_engine.geo_index import configure_supplier_source
+
+SAMPLE_SIZES: Tuple[int, ...] = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+CHUNK_SIZES: Tuple[int, ...] = (1_000, 10_000, 65_536)
+# The float64 path materialises per-sample arrays for these helpers; keep them bounded.
+ARRAY_CASE_LIMIT = 1_000_000
+DEFAULT_THRESHOLD = 0.10
+
+Case = Tuple[str, Callable[[], object]]
+
+
+@contextmanager
+def _stubbed_environment() -> Iterator[None]:
+    originals = montecarlo.get_weather_factor, montecarlo.get_traffic_factor
+    montecarlo.get_weather_factor = lambda: 1.0  # type: ignore[assignment]
+    montecarlo.get_traffic_factor = lambda: 1.0  # type: ignore[assignment]
+    configure_supplier_source(None)
+    try:
+        yield
+    finally:
+        montecarlo.get_weather_factor, montecarlo.get_traffic_factor = originals
+        montecarlo.clear_simulation_cache()
+
+
+def _run(n_samples: int, **options: object) -> Callable[[], object]:
+    def call() -> object:
+        montecarlo.clear_simulation_cache()
+        return montecarlo.run_simulation("bench", n_samples=n_samples, ci_width=None, seed=0, use_lookup=False, **options)
+
+    return call
+
+
+def _cases(max_n: int) -> List[Case]:
+    cases: List[Case] = []
+    for n in (size for size in SAMPLE_SIZES if size <= max_n):
+        cases.append((f"run_simulation[n={n}]", _run(n)))
+        cases.append((f"run_simulation[n={n},low_memory]", _run(n, low_memory=True)))
+        if n <= ARRAY_CASE_LIMIT:
+            rng = np.random.default_rng(0)
+            cases.append((f"_simulate_samples[n={n}]", lambda n=n, rng=rng: montecarlo._simulate_samples(n, 1.0, 1.0, rng)))
+            samples = montecarlo._simulate_samples(n, 1.0, 1.0, np.random.default_rng(0))
+            cases.append(
+                (
+                    f"_aggregate_best_suppliers[n={n}]",
+                    lambda samples=samples: montecarlo._aggregate_best_suppliers(
+                        samples["supplier_indices"], samples["emissions"]
+                    ),
+                )
+            )
+            cases.append(
+                (
+                    f"supplier_statistics[n={n}]",
+                    lambda samples=samples: montecarlo.supplier_statistics(
+                        samples["supplier_indices"], samples["emissions"], samples["costs"]
+                    ),
+                )
+            )
+    batch_n = min(max_n, 1_000_000)
+    for chunk_size in CHUNK_SIZES:
+        cases.append((f"run_simulation[n={batch_n},chunk={chunk_size}]", _run(batch_n, chunk_size=chunk_size)))
+    return cases
+
+
+def _measure(call: Callable[[], object], repeats: int) -> Dict[str, float]:
+    call()  # warm-up: imports, allocator pools
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "repeats": repeats,
+        "peak_bytes": peak,
+    }
+
+
+def run(output: Path, repeats: int, max_n: int, pattern: str) -> Dict[str, object]:
+    results: Dict[str, Dict[str, float]] = {}
+    with _stubbed_environment():
+        for name, call in _cases(max_n):
+            if pattern and pattern not in name:
+                continue
+            results[name] = _measure(call, repeats)
+            stats = results[name]
+            print(f"{name:<52} {stats['median_s'] * 1000:>10.2f} ms  peak {stats['peak_bytes'] / 1e6:>9.2f} MB")
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+        },
+        "results": results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {len(results)} cases to {output}")
+    return report
+
+
+def compare(baseline_path: Path, current_path: Path, threshold: float) -> int:
+    """Print per-case ratios; return 1 if any case is slower than ``1 + threshold``."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    current = json.loads(current_path.read_text(encoding="utf-8"))["results"]
+    regressions = 0
+    print(f"{'case':<52} {'baseline':>10} {'current':>10} {'ratio':>7}  mem ratio")
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name], current[name]
+        ratio = after["median_s"] / before["median_s"] if before["median_s"] else float("inf")
+        mem_ratio = after["peak_bytes"] / before["peak_bytes"] if before["peak_bytes"] else float("inf")
+        flag = ""
+        if ratio > 1.0 + threshold:
+            regressions += 1
+            flag = "  SLOWER"
+        print(
+            f"{name:<52} {before['median_s'] * 1000:>8.2f}ms {after['median_s'] * 1000:>8.2f}ms "
+            f"{ratio:>7.2f}  {mem_ratio:>9.2f}{flag}"
+        )
+    for name in sorted(set(baseline) ^ set(current)):
+        print(f"{name:<52} only in {'baseline' if name in baseline else 'current'}")
+    if regressions:
+        print(f"{regressions} case(s) regressed by more than {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and write a JSON report")
+    run_parser.add_argument("--output", type=Path, required=True)
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--max-n", type=int, default=max(SAMPLE_SIZES))
+    run_parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    compare_parser = subparsers.add_parser("compare", help="Compare a report against a baseline")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown, e.g. 0.1 = 10%%")
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args.output, args.repeats, args.max_n, args.filter)
+    else:
+        sys.exit(compare(args.baseline, args.current, args.threshold))
@@ -0,0 +1,55 @@
+"""Measure estimator variance of each sampling strategy against plain Monte Carlo.
+
+Usage: ``python -m packages.simulation_engine.benchmarks.sampler_variance --n-samples 2000``
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from packages.simulation_engine.montecarlo import _eco_score, _sample_statistics
+from packages.simulation_engine.samplers import SAMPLER_NAMES
+from packages.simulation_engine.stats import merge_stats
+
+
+def _estimates(sampler: str, n_samples: int, repeats: int, seed: int) -> Dict[str, np.ndarray]:
+    eco_scores: List[float] = []
+    variations: List[float] = []
+    rng = np.random.default_rng(seed)
+    for _ in range(repeats):
+        emission_stats, cost_stats = _sample_statistics(
+            n_samples, 1.0, 1.0, rng, sampler=sampler, chunk_size=n_samples
+        )
+        emissions = merge_stats(emission_stats.values())
+        costs = merge_stats(cost_stats.values())
+        eco_scores.append(_eco_score(emissions.mean))
+        variations.append(costs.std / costs.mean)
+    return {"eco_score": np.array(eco_scores), "variance_cost": np.array(variations)}
+
+
+def main(n_samples: int, repeats: int, seed: int) -> None:
+    baseline: Dict[str, float] = {}
+    print(f"n_samples={n_samples} repeats={repeats}")
+    print(f"{'sampler':<11} {'metric':<14} {'std':>10} {'var ratio':>10} {'ms/run':>8}")
+    for sampler in SAMPLER_NAMES:
+        started = time.perf_counter()
+        estimates = _estimates(sampler, n_samples, repeats, seed)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0 / repeats
+        for metric, values in estimates.items():
+            std = float(np.std(values, ddof=1))
+            baseline.setdefault(metric, std)
+            # Ratio > 1 means the sampler needs that many times fewer samples than "mc".
+            ratio = (baseline[metric] / std) ** 2 if std else float("inf")
+            print(f"{sampler:<11} {metric:<14} {std:>10.6f} {ratio:>10.2f} {elapsed_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n-samples", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.n_samples, args.repeats, args.seed)
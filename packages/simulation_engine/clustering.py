@@ -0,0 +1,212 @@
+"""Route clustering with incremental mini-batch k-means and persisted centroids.
+
+Centroids are fitted offline (see ``python -m packages.simulation_engine.clustering``)
+and written to JSON. At request time a delivery is assigned with an O(k) lookup
+against the cached centroids; no re-fit happens on the hot path.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+KM_PER_DEGREE = 111.32
+DEFAULT_CENTROIDS_PATH = Path(__file__).resolve().parent / "data" / "route_centroids.json"
+FALLBACK_CLUSTER = "Cluster-SimA"
+
+_CACHE_LOCK = threading.Lock()
+_CENTROID_CACHE: Dict[str, Tuple[float, "MiniBatchKMeans"]] = {}
+
+__all__ = [
+    "FALLBACK_CLUSTER",
+    "MiniBatchKMeans",
+    "assign_route_cluster",
+    "cluster_label",
+    "load_model",
+    "route_features",
+    "save_model",
+]
+
+
+def route_features(lat: float, lon: float, supplier_distances: Sequence[float]) -> np.ndarray:
+    """Build a feature vector in kilometres: projected location plus distance per supplier type."""
+    x = lon * KM_PER_DEGREE * math.cos(math.radians(lat))
+    y = lat * KM_PER_DEGREE
+    return np.array([x, y, *supplier_distances], dtype=float)
+
+
+def cluster_label(index: int) -> str:
+    return f"Cluster-{chr(ord('A') + index)}" if index < 26 else f"Cluster-{index}"
+
+
+class MiniBatchKMeans:
+    """Sculley-style mini-batch k-means with per-centroid learning rates."""
+
+    def __init__(
+        self,
+        n_clusters: int,
+        batch_size: int = 256,
+        seed: Optional[int] = None,
+        centroids: Optional[np.ndarray] = None,
+        counts: Optional[np.ndarray] = None,
+    ) -> None:
+        if n_clusters <= 0:
+            raise ValueError("n_clusters must be a positive integer")
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.centroids = None if centroids is None else np.asarray(centroids, dtype=float)
+        self.counts = np.zeros(n_clusters) if counts is None else np.asarray(counts, dtype=float)
+
+    def _initialise(self, X: np.ndarray) -> None:
+        """k-means++ seeding from the first batch."""
+        if len(X) < self.n_clusters:
+            raise ValueError("First batch must contain at least n_clusters rows")
+        centroids = [X[self.rng.integers(len(X))]]
+        for _ in range(1, self.n_clusters):
+            distances = np.min(((X[:, None, :] - np.array(centroids)[None, :, :]) ** 2).sum(axis=2), axis=1)
+            total = distances.sum()
+            probabilities = distances / total if total > 0 else None
+            centroids.append(X[self.rng.choice(len(X), p=probabilities)])
+        self.centroids = np.array(centroids)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Index of the nearest centroid for each row of ``X``."""
+        if self.centroids is None:
+            raise RuntimeError("Model has no centroids; call partial_fit first")
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        distances = ((X[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return np.argmin(distances, axis=1)
+
+    def partial_fit(self, X: np.ndarray) -> "MiniBatchKMeans":
+        """Move centroids towards one batch using a 1/count learning rate per centroid."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if self.centroids is None:
+            self._initialise(X)
+        assert self.centroids is not None
+        labels = self.predict(X)
+        batch_counts = np.bincount(labels, minlength=self.n_clusters).astype(float)
+        batch_sums = np.zeros_like(self.centroids)
+        np.add.at(batch_sums, labels, X)
+        updated = batch_counts > 0
+        totals = self.counts[updated] + batch_counts[updated]
+        self.centroids[updated] = (
+            self.centroids[updated] * self.counts[updated, None] + batch_sums[updated]
+        ) / totals[:, None]
+        self.counts[updated] = totals
+        return self
+
+    def fit(self, X: np.ndarray, epochs: int = 5) -> "MiniBatchKMeans":
+        """Run shuffled mini-batch passes over ``X``."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        for _ in range(epochs):
+            order = self.rng.permutation(len(X))
+            for start in range(0, len(X), self.batch_size):
+                self.partial_fit(X[order[start : start + self.batch_size]])
+        return self
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "n_clusters": self.n_clusters,
+            "batch_size": self.batch_size,
+            "centroids": [] if self.centroids is None else self.centroids.tolist(),
+            "counts": self.counts.tolist(),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> "MiniBatchKMeans":
+        centroids = payload.get("centroids") or None
+        return cls(
+            n_clusters=int(payload["n_clusters"]),  # type: ignore[arg-type]
+            batch_size=int(payload.get("batch_size", 256)),  # type: ignore[arg-type]
+            centroids=np.array(centroids, dtype=float) if centroids else None,
+            counts=np.array(payload.get("counts") or [0.0] * int(payload["n_clusters"]), dtype=float),  # type: ignore[arg-type]
+        )
+
+
+def _centroids_path(path: Optional[Path] = None) -> Path:
+    return Path(path or os.getenv("ROUTE_CLUSTER_CENTROIDS", DEFAULT_CENTROIDS_PATH))
+
+
+def save_model(model: MiniBatchKMeans, path: Optional[Path] = None) -> Path:
+    """Persist centroids atomically so running workers never read a partial file."""
+    target = _centroids_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(target.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(model.to_dict()), encoding="utf-8")
+    os.replace(tmp_path, target)
+    return target
+
+
+def load_model(path: Optional[Path] = None) -> Optional[MiniBatchKMeans]:
+    """Return the persisted model, reloading only when the file changes on disk."""
+    target = _centroids_path(path)
+    try:
+        mtime = target.stat().st_mtime
+    except OSError:
+        return None
+    key = str(target)
+    with _CACHE_LOCK:
+        cached = _CENTROID_CACHE.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    try:
+        model = MiniBatchKMeans.from_dict(json.loads(target.read_text(encoding="utf-8")))
+    except (OSError, ValueError, KeyError):
+        return None
+    if model.centroids is None:
+        return None
+    with _CACHE_LOCK:
+        _CENTROID_CACHE[key] = (mtime, model)
+    return model
+
+
+def assign_route_cluster(features: np.ndarray, path: Optional[Path] = None) -> str:
+    """Label ``features`` with the nearest persisted centroid, or the fallback label."""
+    model = load_model(path)
+    if model is None or model.centroids is None or model.centroids.shape[1] != np.asarray(features).shape[-1]:
+        return FALLBACK_CLUSTER
+    return cluster_label(int(model.predict(features)[0]))
+
+
+def _read_feature_rows(lines: Iterable[str]) -> np.ndarray:
+    rows: List[np.ndarray] = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        rows.append(route_features(float(record["lat"]), float(record["lon"]), [float(d) for d in record["distances"]]))
+    return np.array(rows)
+
+
+def main(input_path: Path, output_path: Optional[Path], n_clusters: int, epochs: int, seed: Optional[int], warm_start: bool) -> None:
+    with input_path.open("r", encoding="utf-8") as handle:
+        features = _read_feature_rows(handle)
+    model = load_model(output_path) if warm_start else None
+    if model is None or model.n_clusters != n_clusters:
+        model = MiniBatchKMeans(n_clusters=n_clusters, seed=seed)
+    model.fit(features, epochs=epochs)
+    target = save_model(model, output_path)
+    sizes = np.bincount(model.predict(features), minlength=n_clusters)
+    print(f"Wrote {n_clusters} centroids to {target} (cluster sizes: {sizes.tolist()})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh route cluster centroids from delivery feature rows.")
+    parser.add_argument("--input", type=Path, required=True, help='JSONL rows: {"lat": ..., "lon": ..., "distances": [...]}')
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--clusters", type=int, default=6)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--warm-start", action="store_true", help="Continue from the persisted centroids")
+    args = parser.parse_args()
+    main(args.input, args.output, args.clusters, args.epochs, args.seed, args.warm_start)
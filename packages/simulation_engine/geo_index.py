@@ -0,0 +1,243 @@
+"""In-memory spatial index of supplier locations for nearest-supplier lookups.
+
+Suppliers are bucketed per ``supplier_type`` into a lat/lon grid. A k-nearest
+query scans rings of cells outward from the query cell and stops as soon as no
+unseen cell can hold a closer supplier. The process-wide index is built once
+from a pluggable row loader and refreshed incrementally (only rows changed
+since the last sync) rather than on every request.
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_CELL_DEGREES = 0.5
+BRUTE_FORCE_LIMIT = 64
+INDEX_REFRESH_SECONDS = 300.0
+INDEX_FULL_SYNC_SECONDS = 3600.0
+
+SupplierLoader = Callable[[Optional[str]], List[Dict[str, object]]]
+
+__all__ = [
+    "SupplierGridIndex",
+    "SupplierLocation",
+    "configure_supplier_source",
+    "get_supplier_index",
+    "haversine_km",
+]
+
+
+@dataclass(frozen=True)
+class SupplierLocation:
+    supplier_id: str
+    name: str
+    supplier_type: str
+    lat: float
+    lon: float
+
+    @classmethod
+    def from_row(cls, row: Dict[str, object]) -> Optional["SupplierLocation"]:
+        """Build from a ``suppliers`` table row; rows without coordinates are skipped."""
+        lat, lon = row.get("latitude"), row.get("longitude")
+        if lat is None or lon is None or row.get("id") is None:
+            return None
+        return cls(
+            supplier_id=str(row["id"]),
+            name=str(row.get("name") or ""),
+            supplier_type=str(row.get("supplier_type") or ""),
+            lat=float(lat),  # type: ignore[arg-type]
+            lon=float(lon),  # type: ignore[arg-type]
+        )
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to arrays of points."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SupplierGridIndex:
+    """Grid-bucketed supplier locations supporting k-nearest queries per supplier type."""
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES) -> None:
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[str, Dict[Tuple[int, int], Dict[str, SupplierLocation]]] = {}
+        self._by_id: Dict[str, SupplierLocation] = {}
+        self._type_counts: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lon / self.cell_degrees))
+
+    def upsert(self, supplier: SupplierLocation) -> None:
+        with self._lock:
+            self.remove(supplier.supplier_id)
+            cells = self._cells.setdefault(supplier.supplier_type, {})
+            cells.setdefault(self._cell(supplier.lat, supplier.lon), {})[supplier.supplier_id] = supplier
+            self._by_id[supplier.supplier_id] = supplier
+            self._type_counts[supplier.supplier_type] = self._type_counts.get(supplier.supplier_type, 0) + 1
+
+    def remove(self, supplier_id: str) -> None:
+        with self._lock:
+            existing = self._by_id.pop(supplier_id, None)
+            if existing is None:
+                return
+            self._type_counts[existing.supplier_type] -= 1
+            cells = self._cells[existing.supplier_type]
+            key = self._cell(existing.lat, existing.lon)
+            cells[key].pop(supplier_id, None)
+            if not cells[key]:
+                del cells[key]
+
+    def supplier_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._by_id)
+
+    @staticmethod
+    def _ring_cells(row: int, col: int, ring: int) -> Iterable[Tuple[int, int]]:
+        if ring == 0:
+            yield row, col
+            return
+        for j in range(col - ring, col + ring + 1):
+            yield row - ring, j
+            yield row + ring, j
+        for i in range(row - ring + 1, row + ring):
+            yield i, col - ring
+            yield i, col + ring
+
+    def _candidates(self, lat: float, lon: float, supplier_type: str, k: int) -> Tuple[List[SupplierLocation], np.ndarray]:
+        cells = self._cells.get(supplier_type, {})
+        if self._type_counts.get(supplier_type, 0) <= max(k, BRUTE_FORCE_LIMIT):
+            everything = [supplier for bucket in cells.values() for supplier in bucket.values()]
+            return everything, self._distances(lat, lon, everything)
+
+        row, col = self._cell(lat, lon)
+        max_ring = int(math.ceil(180.0 / self.cell_degrees))
+        found: List[SupplierLocation] = []
+        distances = np.empty(0)
+        for ring in range(max_ring + 1):
+            ring_suppliers = [
+                supplier for cell in self._ring_cells(row, col, ring) for supplier in cells.get(cell, {}).values()
+            ]
+            if ring_suppliers:
+                found.extend(ring_suppliers)
+                distances = np.concatenate([distances, self._distances(lat, lon, ring_suppliers)])
+            if len(found) >= k:
+                # Everything outside this ring is at least ``ring`` cells away along one axis;
+                # longitude cells shrink with latitude, so bound with the smallest cosine in reach.
+                reach = min(89.9, abs(lat) + (ring + 1) * self.cell_degrees)
+                bound_km = ring * self.cell_degrees * (math.pi / 180.0) * EARTH_RADIUS_KM * math.cos(math.radians(reach))
+                if np.partition(distances, k - 1)[k - 1] <= bound_km:
+                    break
+        return found, distances
+
+    @staticmethod
+    def _distances(lat: float, lon: float, suppliers: Sequence[SupplierLocation]) -> np.ndarray:
+        lats = np.fromiter((s.lat for s in suppliers), dtype=float, count=len(suppliers))
+        lons = np.fromiter((s.lon for s in suppliers), dtype=float, count=len(suppliers))
+        return haversine_km(lat, lon, lats, lons)
+
+    def nearest(self, lat: float, lon: float, supplier_type: str, k: int) -> List[Tuple[SupplierLocation, float]]:
+        """Return up to ``k`` suppliers of ``supplier_type`` with their distance in km, closest first."""
+        with self._lock:
+            candidates, distances = self._candidates(lat, lon, supplier_type, k)
+        if not candidates:
+            return []
+        order = np.argsort(distances)[:k]
+        return [(candidates[i], float(distances[i])) for i in order]
+
+    def nearest_distances(self, lat: float, lon: float, supplier_types: Iterable[str], k: int) -> Tuple[Tuple[float, ...], ...]:
+        """Distances (km) to the ``k`` nearest suppliers of each type, in the order given."""
+        return tuple(
+            tuple(round(distance, 3) for _, distance in self.nearest(lat, lon, supplier_type, k))
+            for supplier_type in supplier_types
+        )
+
+
+class _IndexState:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.loader: Optional[SupplierLoader] = None
+        self.index: Optional[SupplierGridIndex] = None
+        self.synced_at: Optional[str] = None
+        self.next_refresh = 0.0
+        self.next_full_sync = 0.0
+
+
+_STATE = _IndexState()
+
+
+def configure_supplier_source(loader: Optional[SupplierLoader]) -> None:
+    """Register the row loader used to (re)build the shared index.
+
+    ``loader(updated_since)`` returns ``suppliers`` rows (``id``, ``name``,
+    ``supplier_type``, ``latitude``, ``longitude``, ``updated_at``); with
+    ``updated_since=None`` it must return every row.
+    """
+    with _STATE.lock:
+        _STATE.loader = loader
+        _STATE.index = None
+        _STATE.synced_at = None
+        _STATE.next_refresh = 0.0
+        _STATE.next_full_sync = 0.0
+
+
+def _refresh_interval(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_supplier_index() -> Optional[SupplierGridIndex]:
+    """Return the shared index, syncing it from the configured loader when stale.
+
+    Changed rows are applied incrementally every ``SUPPLIER_INDEX_REFRESH_SECONDS``;
+    a full sync that also drops deleted suppliers runs every
+    ``SUPPLIER_INDEX_FULL_SYNC_SECONDS``. Loader failures keep serving the last index.
+    """
+    with _STATE.lock:
+        loader = _STATE.loader
+        if loader is None:
+            return None
+        now = time.monotonic()
+        if _STATE.index is not None and now < _STATE.next_refresh:
+            return _STATE.index
+
+        full_sync = _STATE.index is None or now >= _STATE.next_full_sync
+        try:
+            rows = loader(None if full_sync else _STATE.synced_at)
+        except Exception:  # pylint: disable=broad-except
+            _STATE.next_refresh = now + _refresh_interval("SUPPLIER_INDEX_REFRESH_SECONDS", INDEX_REFRESH_SECONDS)
+            return _STATE.index
+
+        index = SupplierGridIndex() if full_sync else _STATE.index
+        assert index is not None
+        for row in rows:
+            supplier = SupplierLocation.from_row(row)
+            if supplier is None:
+                if row.get("id") is not None:
+                    index.remove(str(row["id"]))
+                continue
+            index.upsert(supplier)
+            updated_at = row.get("updated_at")
+            if updated_at and (_STATE.synced_at is None or str(updated_at) > _STATE.synced_at):
+                _STATE.synced_at = str(updated_at)
+
+        _STATE.index = index
+        _STATE.next_refresh = now + _refresh_interval("SUPPLIER_INDEX_REFRESH_SECONDS", INDEX_REFRESH_SECONDS)
+        if full_sync:
+            _STATE.next_full_sync = now + _refresh_interval("SUPPLIER_INDEX_FULL_SYNC_SECONDS", INDEX_FULL_SYNC_SECONDS)
+        return index
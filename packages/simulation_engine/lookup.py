@@ -0,0 +1,199 @@
+"""Precomputed eco-score tables for popular recipes, bucketed by live factors.
+
+An offline job (``python -m packages.simulation_engine.lookup``) runs
+high-sample simulations for the most requested recipes at every weather
+condition × traffic-ratio decile and writes the summaries to JSON. At request
+time ``run_simulation`` answers from the table with a dict lookup whenever the
+live factors fall into a precomputed bucket, and samples otherwise.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import math
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_TABLE_PATH = Path(__file__).resolve().parent / "data" / "eco_lookup.json"
+# Traffic ratios are clamped to this range by ``get_traffic_factor``; buckets split it evenly.
+TRAFFIC_RANGE: Tuple[float, float] = (0.5, 2.0)
+TRAFFIC_BUCKETS = 10
+DEFAULT_TOP_N = 50
+DEFAULT_PRECOMPUTE_SAMPLES = 1_000_000
+
+# Stored per entry, in order; ``route_cluster`` is location specific and assigned live.
+LOOKUP_FIELDS: Tuple[str, ...] = (
+    "eco_score",
+    "co2_saved_kg",
+    "variance_cost",
+    "best_sources",
+    "supplier_stats",
+    "n_samples_used",
+    "confidence_intervals",
+)
+
+_CACHE_LOCK = threading.Lock()
+_TABLE_CACHE: Dict[str, Tuple[float, "EcoLookupTable"]] = {}
+
+__all__ = [
+    "EcoLookupTable",
+    "LOOKUP_FIELDS",
+    "TRAFFIC_BUCKETS",
+    "bucket_traffic_ratio",
+    "load_table",
+    "precompute_table",
+    "save_table",
+    "top_recipes",
+    "traffic_bucket",
+]
+
+
+def traffic_bucket(traffic_ratio: float) -> int:
+    """Decile of ``TRAFFIC_RANGE`` that ``traffic_ratio`` falls into."""
+    low, high = TRAFFIC_RANGE
+    position = (min(max(traffic_ratio, low), high) - low) / (high - low)
+    return min(int(math.floor(position * TRAFFIC_BUCKETS)), TRAFFIC_BUCKETS - 1)
+
+
+def bucket_traffic_ratio(bucket: int) -> float:
+    """Representative (mid-point) traffic ratio simulated for ``bucket``."""
+    low, high = TRAFFIC_RANGE
+    return round(low + (bucket + 0.5) * (high - low) / TRAFFIC_BUCKETS, 6)
+
+
+def _entry_key(recipe_id: str, weather: str, bucket: int) -> str:
+    return f"{recipe_id}|{weather}|{bucket}"
+
+
+class EcoLookupTable:
+    """Precomputed simulation summaries keyed by recipe, weather condition and traffic bucket."""
+
+    def __init__(self, entries: Optional[Dict[str, List[object]]] = None, meta: Optional[Dict[str, object]] = None) -> None:
+        self.entries: Dict[str, List[object]] = dict(entries or {})
+        self.meta: Dict[str, object] = dict(meta or {})
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def put(self, recipe_id: str, weather: str, bucket: int, result: Dict[str, object]) -> None:
+        self.entries[_entry_key(recipe_id, weather, bucket)] = [result[field] for field in LOOKUP_FIELDS]
+
+    def get(self, recipe_id: str, weather: str, traffic_ratio: float) -> Optional[Dict[str, object]]:
+        """Return a fresh result dict for the bucket containing ``traffic_ratio``, if precomputed."""
+        row = self.entries.get(_entry_key(recipe_id, weather, traffic_bucket(traffic_ratio)))
+        if row is None:
+            return None
+        return copy.deepcopy(dict(zip(LOOKUP_FIELDS, row)))
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"fields": list(LOOKUP_FIELDS), "meta": self.meta, "entries": self.entries}
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> "EcoLookupTable":
+        if list(payload.get("fields") or []) != list(LOOKUP_FIELDS):  # type: ignore[call-overload]
+            raise ValueError("Lookup table was written with a different field layout")
+        return cls(entries=payload.get("entries") or {}, meta=payload.get("meta") or {})  # type: ignore[arg-type]
+
+
+def _table_path(path: Optional[Path] = None) -> Path:
+    return Path(path or os.getenv("SIM_LOOKUP_TABLE", DEFAULT_TABLE_PATH))
+
+
+def save_table(table: EcoLookupTable, path: Optional[Path] = None) -> Path:
+    """Persist the table atomically so running workers never read a partial file."""
+    target = _table_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(target.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(table.to_dict(), separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp_path, target)
+    return target
+
+
+def load_table(path: Optional[Path] = None) -> Optional[EcoLookupTable]:
+    """Return the persisted table, reloading only when the file changes on disk."""
+    target = _table_path(path)
+    try:
+        mtime = target.stat().st_mtime
+    except OSError:
+        return None
+    key = str(target)
+    with _CACHE_LOCK:
+        cached = _TABLE_CACHE.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    try:
+        table = EcoLookupTable.from_dict(json.loads(target.read_text(encoding="utf-8")))
+    except (OSError, ValueError, KeyError):
+        return None
+    with _CACHE_LOCK:
+        _TABLE_CACHE[key] = (mtime, table)
+    return table
+
+
+def top_recipes(requested_ids: Iterable[str], top_n: int = DEFAULT_TOP_N) -> List[str]:
+    """Most frequently requested recipe ids, most popular first."""
+    counts = Counter(recipe_id.strip() for recipe_id in requested_ids if recipe_id.strip())
+    return [recipe_id for recipe_id, _ in counts.most_common(top_n)]
+
+
+def precompute_table(
+    recipe_ids: Sequence[str],
+    weather_conditions: Optional[Sequence[str]] = None,
+    n_samples: int = DEFAULT_PRECOMPUTE_SAMPLES,
+    table: Optional[EcoLookupTable] = None,
+) -> EcoLookupTable:
+    """Simulate every recipe at each weather condition × traffic bucket mid-point.
+
+    Runs use the default location, models and sampler with the full sample
+    budget in low-memory mode, so entries are far tighter than an on-demand run.
+    """
+    # Imported here because ``montecarlo`` consults this module on every run.
+    from .montecarlo import WEATHER_MULTIPLIERS, run_simulation
+
+    conditions = list(weather_conditions) if weather_conditions is not None else list(WEATHER_MULTIPLIERS)
+    unknown = [condition for condition in conditions if condition not in WEATHER_MULTIPLIERS]
+    if unknown:
+        raise ValueError(f"Unknown weather conditions: {unknown}")
+
+    table = table or EcoLookupTable()
+    for recipe_id in recipe_ids:
+        for condition in conditions:
+            for bucket in range(TRAFFIC_BUCKETS):
+                result = run_simulation(
+                    recipe_id,
+                    n_samples=n_samples,
+                    ci_width=None,
+                    low_memory=True,
+                    factors=(WEATHER_MULTIPLIERS[condition], bucket_traffic_ratio(bucket)),
+                    use_lookup=False,
+                )
+                table.put(recipe_id, condition, bucket, result)
+    table.meta = {
+        "n_samples": n_samples,
+        "recipes": len(recipe_ids),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    return table
+
+
+def main(requests_path: Path, output_path: Optional[Path], top_n: int, n_samples: int) -> None:
+    with requests_path.open("r", encoding="utf-8") as handle:
+        recipe_ids = top_recipes(handle, top_n)
+    table = precompute_table(recipe_ids, n_samples=n_samples)
+    target = save_table(table, output_path)
+    print(f"Wrote {len(table)} entries for {len(recipe_ids)} recipes to {target}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute eco-score lookup tables for the most requested recipes.")
+    parser.add_argument("--requests", type=Path, required=True, help="Recipe ids, one per line, one line per request")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_N)
+    parser.add_argument("--n-samples", type=int, default=DEFAULT_PRECOMPUTE_SAMPLES)
+    args = parser.parse_args()
+    main(args.requests, args.output, args.top, args.n_samples)
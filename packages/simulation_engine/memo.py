@@ -0,0 +1,151 @@
+"""Cross-recipe memoisation of simulation results by ingredient fingerprint.
+
+Recipes with the same normalised ingredient multiset simulate identically, so
+their results are stored under a fingerprint of that multiset (plus the factor
+snapshot and run configuration) rather than the recipe id. An in-process LRU
+bounds memory; an optional persistent store (e.g. Supabase) is consulted on
+misses and written through on inserts so other workers can reuse results.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from packages.nlp_engine.units import normalize_unit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMO_SIZE = 1024
+QUANTITY_DECIMALS = 3
+
+MemoLoader = Callable[[str], Optional[Dict[str, object]]]
+MemoSaver = Callable[[str, str, Dict[str, object]], None]
+
+__all__ = [
+    "SimulationMemo",
+    "configure_memo_store",
+    "get_simulation_memo",
+    "ingredient_fingerprint",
+    "memo_key",
+]
+
+
+def _normalise_text(value: object) -> str:
+    return re.sub(r"\s+", " ", str(value or "")).strip().lower()
+
+
+def _normalise_ingredient(item: Mapping[str, object]) -> Tuple[str, str, Optional[float]]:
+    name = _normalise_text(item.get("name") or item.get("ingredient_name"))
+    unit = normalize_unit(item.get("unit")) or ""
+    quantity = item.get("quantity")
+    try:
+        amount: Optional[float] = round(float(quantity), QUANTITY_DECIMALS)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        amount = None
+    return name, unit, amount
+
+
+def ingredient_fingerprint(ingredients: Iterable[Mapping[str, object]]) -> str:
+    """Order-independent sha256 of the normalised ``(name, unit, quantity)`` multiset."""
+    counts = Counter(_normalise_ingredient(item) for item in ingredients)
+    canonical = sorted(([name, unit, amount, count] for (name, unit, amount), count in counts.items()), key=repr)
+    return hashlib.sha256(json.dumps(canonical, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def memo_key(fingerprint: str, *config: object) -> str:
+    """Key for one fingerprint under a factor snapshot and run configuration."""
+    return hashlib.sha256(repr((fingerprint, *config)).encode("utf-8")).hexdigest()
+
+
+class SimulationMemo:
+    """Thread-safe LRU of simulation results with an optional persistent second tier."""
+
+    def __init__(self, max_entries: int = DEFAULT_MEMO_SIZE) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loader: Optional[MemoLoader] = None
+        self._saver: Optional[MemoSaver] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def configure_store(self, loader: Optional[MemoLoader], saver: Optional[MemoSaver]) -> None:
+        self._loader, self._saver = loader, saver
+
+    def _remember(self, key: str, result: Dict[str, object]) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(result)
+        stored = None
+        if self._loader is not None:
+            try:
+                stored = self._loader(key)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning("Simulation memo lookup failed", exc_info=True)
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, stored)
+        return copy.deepcopy(stored)
+
+    def put(self, key: str, fingerprint: str, result: Dict[str, object]) -> None:
+        with self._lock:
+            self._remember(key, copy.deepcopy(result))
+        if self._saver is not None:
+            try:
+                self._saver(key, fingerprint, result)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning("Simulation memo write failed", exc_info=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def _get_env_int(name: str, default: int) -> int:
+    """Fetch an integer environment variable, falling back to ``default``."""
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return default
+
+
+_MEMO = SimulationMemo(max(1, _get_env_int("SIM_MEMO_SIZE", DEFAULT_MEMO_SIZE)))
+
+
+def get_simulation_memo() -> SimulationMemo:
+    return _MEMO
+
+
+def configure_memo_store(loader: Optional[MemoLoader], saver: Optional[MemoSaver]) -> None:
+    """Register a persistent tier: ``loader(key)`` returns a stored result or None,
+    ``saver(key, fingerprint, result)`` upserts one."""
+    _MEMO.configure_store(loader, saver)
@@ -0,0 +1,163 @@
+"""Registry of vectorised emission and cost models for the Monte Carlo engine.
+
+A model is a pure function ``model(ctx, out, scratch)`` that updates ``out`` in
+place from the per-sample arrays in ``ctx``. It only uses ``scratch`` as
+temporary space, so several models compose over the same output array without
+extra copies. Base models add their contribution to ``out``, which starts at
+zero; surcharge models scale or extend what earlier models produced.
+
+Emission models must be proportional to ``weather_factor * traffic_factor_global``
+and cost models must not depend on either; ``sweep.run_sweep`` relies on this to
+evaluate every weather and traffic scenario from a single pass per supplier mix.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Supplier type -> predominant transport mode, and mode -> kg CO2 per km.
+TRANSPORT_MODES: Dict[str, str] = {"local": "van", "regional": "truck", "big_box": "rail_truck"}
+MODE_CO2_PER_KM: Dict[str, float] = {"van": 0.12, "truck": 0.22, "rail_truck": 0.3}
+# Share of refrigerated volume per supplier type, emission uplift and cost per km when chilled.
+COLD_CHAIN_SHARE: Dict[str, float] = {"local": 0.2, "regional": 0.35, "big_box": 0.5}
+COLD_CHAIN_EMISSION_UPLIFT = 0.25
+COLD_CHAIN_COST_PER_KM = 0.02
+
+DEFAULT_EMISSION_MODELS: Tuple[str, ...] = ("distance",)
+DEFAULT_COST_MODELS: Tuple[str, ...] = ("base_price",)
+
+
+@dataclass
+class SampleContext:
+    """Per-sample inputs shared by every model in one pass."""
+
+    supplier_types: Tuple[str, ...]
+    supplier_indices: np.ndarray
+    distances: np.ndarray
+    traffic_local: np.ndarray
+    price_factor: np.ndarray
+    weather_factor: float
+    traffic_factor_global: float
+    co2_per_km: Mapping[str, float]
+    base_prices: Mapping[str, float]
+
+
+Model = Callable[[SampleContext, np.ndarray, np.ndarray], None]
+
+EMISSION_MODELS: Dict[str, Model] = {}
+COST_MODELS: Dict[str, Model] = {}
+
+__all__ = [
+    "COST_MODELS",
+    "DEFAULT_COST_MODELS",
+    "DEFAULT_EMISSION_MODELS",
+    "EMISSION_MODELS",
+    "SampleContext",
+    "apply_models",
+    "register_cost_model",
+    "register_emission_model",
+    "validate_models",
+]
+
+
+@lru_cache(maxsize=64)
+def _table(values: Tuple[float, ...], dtype: str) -> np.ndarray:
+    return np.array(values, dtype=np.dtype(dtype))
+
+
+def _per_supplier(ctx: SampleContext, values: Mapping[str, float], out: np.ndarray) -> np.ndarray:
+    """Gather ``values[supplier_type]`` for every sample into ``out``."""
+    table = _table(tuple(float(values.get(name, 0.0)) for name in ctx.supplier_types), out.dtype.str)
+    return np.take(table, ctx.supplier_indices, out=out)
+
+
+def register_emission_model(name: str) -> Callable[[Model], Model]:
+    def decorator(model: Model) -> Model:
+        EMISSION_MODELS[name] = model
+        return model
+
+    return decorator
+
+
+def register_cost_model(name: str) -> Callable[[Model], Model]:
+    def decorator(model: Model) -> Model:
+        COST_MODELS[name] = model
+        return model
+
+    return decorator
+
+
+def _add_travel_emissions(ctx: SampleContext, per_km: np.ndarray, out: np.ndarray) -> None:
+    per_km *= ctx.distances
+    per_km *= ctx.traffic_local
+    per_km *= ctx.weather_factor * ctx.traffic_factor_global
+    out += per_km
+
+
+@register_emission_model("distance")
+def distance_emissions(ctx: SampleContext, out: np.ndarray, scratch: np.ndarray) -> None:
+    """Supplier-type CO2 per km times distance, local traffic, weather and global traffic."""
+    _add_travel_emissions(ctx, _per_supplier(ctx, ctx.co2_per_km, scratch), out)
+
+
+@register_emission_model("transport_mode")
+def transport_mode_emissions(ctx: SampleContext, out: np.ndarray, scratch: np.ndarray) -> None:
+    """Like ``distance`` but with CO2 per km taken from each supplier type's transport mode."""
+    per_type = {name: MODE_CO2_PER_KM[TRANSPORT_MODES[name]] for name in ctx.supplier_types if name in TRANSPORT_MODES}
+    _add_travel_emissions(ctx, _per_supplier(ctx, per_type, scratch), out)
+
+
+@register_emission_model("cold_chain")
+def cold_chain_emissions(ctx: SampleContext, out: np.ndarray, scratch: np.ndarray) -> None:
+    """Scale emissions from earlier models for the refrigerated share of each supplier type."""
+    _per_supplier(ctx, COLD_CHAIN_SHARE, scratch)
+    scratch *= COLD_CHAIN_EMISSION_UPLIFT
+    scratch += 1.0
+    out *= scratch
+
+
+@register_cost_model("base_price")
+def base_price_costs(ctx: SampleContext, out: np.ndarray, scratch: np.ndarray) -> None:
+    """Supplier-type base price times the sampled price factor."""
+    _per_supplier(ctx, ctx.base_prices, scratch)
+    scratch *= ctx.price_factor
+    out += scratch
+
+
+@register_cost_model("cold_chain")
+def cold_chain_costs(ctx: SampleContext, out: np.ndarray, scratch: np.ndarray) -> None:
+    """Per-km refrigeration surcharge on the chilled share of each delivery."""
+    _per_supplier(ctx, COLD_CHAIN_SHARE, scratch)
+    scratch *= ctx.distances
+    scratch *= COLD_CHAIN_COST_PER_KM
+    out += scratch
+
+
+def validate_models(emission_models: Sequence[str], cost_models: Sequence[str]) -> None:
+    """Raise ``ValueError`` unless both selections are non-empty and registered."""
+    for kind, selected, registry in (("emission", emission_models, EMISSION_MODELS), ("cost", cost_models, COST_MODELS)):
+        if not selected:
+            raise ValueError(f"At least one {kind} model is required")
+        unknown = [name for name in selected if name not in registry]
+        if unknown:
+            raise ValueError(f"Unknown {kind} models {unknown}. Expected any of {sorted(registry)}")
+
+
+def apply_models(
+    ctx: SampleContext,
+    emission_models: Sequence[str],
+    cost_models: Sequence[str],
+    emissions: np.ndarray,
+    costs: np.ndarray,
+    scratch: np.ndarray,
+) -> None:
+    """Fill ``emissions`` and ``costs`` in place by composing the selected models."""
+    emissions.fill(0.0)
+    for name in emission_models:
+        EMISSION_MODELS[name](ctx, emissions, scratch)
+    costs.fill(0.0)
+    for name in cost_models:
+        COST_MODELS[name](ctx, costs, scratch)
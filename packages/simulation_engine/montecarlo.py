@@ -1,13 +1,32 @@
 """Monte Carlo simulation utilities for BananaKart eco impact estimates."""
 from __future__ import annotations
 
+import asyncio
+import copy
+import hashlib
 import os
-import random
-from typing import Dict, List
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
 import numpy as np
 import requests
 
+try:
+    import httpx
+except ModuleNotFoundError:  # pragma: no cover - optional async transport
+    httpx = None  # type: ignore[assignment]
+
+from .clustering import FALLBACK_CLUSTER, assign_route_cluster, route_features
+from .geo_index import get_supplier_index
+from .lookup import load_table
+from .memo import get_simulation_memo, ingredient_fingerprint, memo_key
+from .models import DEFAULT_COST_MODELS, DEFAULT_EMISSION_MODELS, SampleContext, apply_models, validate_models
+from .samplers import SAMPLER_NAMES, UniformSampler, make_sampler, norm_ppf
+from .stats import LogHistogram, RunningStats, grouped_bin_counts, histogram_quantiles, merge_stats, t_score, z_score
+
 CO2_FACTORS: Dict[str, float] = {"local": 0.1, "regional": 0.25, "big_box": 0.4}
 BASE_PRICES: Dict[str, float] = {"local": 10.0, "regional": 8.0, "big_box": 6.0}
 WEATHER_MULTIPLIERS: Dict[str, float] = {
@@ -25,7 +44,57 @@ DEFAULT_LONGITUDE = -71.0589
 
 API_TIMEOUT_SECONDS = 5
 
-__all__ = ["run_simulation"]
+# Supplier distances are drawn uniformly from this range (km).
+DISTANCE_RANGE_KM: Tuple[float, float] = (1.0, 50.0)
+# With a supplier index, distances are drawn from the k nearest suppliers of each type.
+NEAREST_SUPPLIERS_K = 5
+FALLBACK_DISTANCE_QUANTILES = 64
+
+SupplierDistances = Tuple[Tuple[float, ...], ...]
+StatsCallback = Callable[[Dict[str, "RunningStats"], Dict[str, "RunningStats"]], None]
+
+# eco_score is 0.5 at this mean emission; co2_saved_kg is measured against the baseline.
+ECO_SCORE_SCALE_KG = 20.0
+CO2_BASELINE_KG = 50.0
+
+DEFAULT_N_SAMPLES = 10000
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CI_WIDTH = 0.02
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SAMPLER = "mc"
+EXECUTOR_KINDS: Tuple[str, ...] = ("process", "thread")
+
+# Supplier choice, distance, local traffic and price factor.
+SAMPLE_DIMENSIONS = 4
+# The price factor only drives cost; mirroring it makes the antithetic variance_cost estimate noisier.
+COST_ONLY_DIMENSIONS: Tuple[int, ...] = (3,)
+# Independently randomised replicates drawn by the variance-reduced samplers for early stopping.
+SAMPLER_REPLICATES = 8
+
+LOW_MEMORY_CHUNK_SIZE = 65536
+# Quantiles reported per supplier for emissions and cost.
+SUPPLIER_QUANTILES: Tuple[float, ...] = (0.05, 0.5, 0.95)
+# Minimum spacing between progress callbacks of one run.
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+SIMULATION_CACHE_SIZE = 256
+FACTOR_SNAPSHOT_TTL_SECONDS = 300.0
+
+_WEATHER_CONDITIONS: Dict[float, str] = {factor: condition for condition, factor in WEATHER_MULTIPLIERS.items()}
+
+_FACTOR_SNAPSHOT: Dict[str, object] = {"expires_at": 0.0, "factors": (1.0, 1.0)}
+
+__all__ = [
+    "clear_simulation_cache",
+    "derive_seed",
+    "get_factor_snapshot",
+    "get_factor_snapshot_async",
+    "get_location",
+    "nearest_supplier_distances",
+    "route_cluster_for_location",
+    "run_simulation",
+    "supplier_statistics",
+]
 
 
 def _get_env_float(name: str, default: float) -> float:
@@ -39,125 +108,1029 @@ def _get_env_float(name: str, default: float) -> float:
         return default
 
 
-def get_weather_factor() -> float:
-    """Fetch a weather adjustment factor from the OpenWeatherMap API."""
+def get_location() -> Tuple[float, float]:
+    """Return the configured delivery location as ``(lat, lon)``."""
+    return _get_env_float("DEFAULT_LAT", DEFAULT_LATITUDE), _get_env_float("DEFAULT_LON", DEFAULT_LONGITUDE)
+
+
+def _weather_request() -> Optional[Tuple[str, Dict[str, object]]]:
     api_key = os.getenv("OPENWEATHER_KEY", OPENWEATHER_DEFAULT_KEY)
-    lat = _get_env_float("DEFAULT_LAT", DEFAULT_LATITUDE)
-    lon = _get_env_float("DEFAULT_LON", DEFAULT_LONGITUDE)
+    if not api_key:
+        return None
+    lat, lon = get_location()
+    return "https://api.openweathermap.org/data/2.5/weather", {"lat": lat, "lon": lon, "appid": api_key}
+
+
+def _weather_from_payload(payload: Dict[str, object]) -> float:
+    condition = (payload.get("weather") or [{}])[0].get("main")  # type: ignore[index, union-attr]
+    return WEATHER_MULTIPLIERS.get(condition, 1.0)
 
+
+def _traffic_request() -> Optional[Tuple[str, Dict[str, object]]]:
+    api_key = os.getenv("TOMTOM_KEY", TOMTOM_DEFAULT_KEY)
     if not api_key:
+        return None
+    lat, lon = get_location()
+    url = "https://api.tomtom.com/traffic/services/4/flowSegmentData/relative0/10/json"
+    return url, {"point": f"{lat},{lon}", "key": api_key}
+
+
+def _traffic_from_payload(payload: Dict[str, object]) -> float:
+    flow_segment = payload.get("flowSegmentData", {})
+    current_speed = flow_segment.get("currentSpeed")  # type: ignore[union-attr]
+    free_flow_speed = flow_segment.get("freeFlowSpeed")  # type: ignore[union-attr]
+    if not current_speed or not free_flow_speed:
         return 1.0
+    ratio = free_flow_speed / current_speed if current_speed else 1.0
+    return float(max(0.5, min(2.0, ratio)))
 
-    url = "https://api.openweathermap.org/data/2.5/weather"
-    params = {"lat": lat, "lon": lon, "appid": api_key}
+
+def _fetch_factor(request: Optional[Tuple[str, Dict[str, object]]], parse: Callable[[Dict[str, object]], float]) -> float:
+    if request is None:
+        return 1.0
+    url, params = request
     try:
         response = requests.get(url, params=params, timeout=API_TIMEOUT_SECONDS)
         response.raise_for_status()
-        payload = response.json()
-        condition = (payload.get("weather") or [{}])[0].get("main")
-        return WEATHER_MULTIPLIERS.get(condition, 1.0)
+        return parse(response.json())
     except Exception:
         return 1.0
 
 
+def get_weather_factor() -> float:
+    """Fetch a weather adjustment factor from the OpenWeatherMap API."""
+    return _fetch_factor(_weather_request(), _weather_from_payload)
+
+
 def get_traffic_factor() -> float:
     """Fetch a congestion multiplier from the TomTom Flow API."""
-    api_key = os.getenv("TOMTOM_KEY", TOMTOM_DEFAULT_KEY)
-    lat = _get_env_float("DEFAULT_LAT", DEFAULT_LATITUDE)
-    lon = _get_env_float("DEFAULT_LON", DEFAULT_LONGITUDE)
+    return _fetch_factor(_traffic_request(), _traffic_from_payload)
 
-    if not api_key:
-        return 1.0
 
-    url = "https://api.tomtom.com/traffic/services/4/flowSegmentData/relative0/10/json"
-    params = {"point": f"{lat},{lon}", "key": api_key}
+_FACTOR_LOCK = threading.Lock()
+
+
+def _snapshot_ttl() -> float:
+    return _get_env_float("SIM_FACTOR_TTL_SECONDS", FACTOR_SNAPSHOT_TTL_SECONDS)
+
+
+def _fresh_snapshot(ttl: float, now: float) -> Optional[Tuple[float, float]]:
+    if ttl > 0 and now < float(_FACTOR_SNAPSHOT["expires_at"]):
+        return _FACTOR_SNAPSHOT["factors"]  # type: ignore[return-value]
+    return None
+
+
+def _store_snapshot(factors: Tuple[float, float], ttl: float) -> Tuple[float, float]:
+    _FACTOR_SNAPSHOT["factors"] = factors
+    _FACTOR_SNAPSHOT["expires_at"] = time.monotonic() + ttl
+    return factors
+
+
+def get_factor_snapshot() -> Tuple[float, float]:
+    """Return ``(weather_factor, traffic_factor)``, refetching at most every few minutes.
+
+    The TTL is configurable through ``SIM_FACTOR_TTL_SECONDS``; ``0`` disables reuse.
+    """
+    ttl = _snapshot_ttl()
+    with _FACTOR_LOCK:
+        cached = _fresh_snapshot(ttl, time.monotonic())
+        if cached is not None:
+            return cached
+        return _store_snapshot((get_weather_factor(), get_traffic_factor()), ttl)
+
+
+async def _fetch_factor_async(
+    client: "httpx.AsyncClient",
+    request: Optional[Tuple[str, Dict[str, object]]],
+    parse: Callable[[Dict[str, object]], float],
+) -> float:
+    if request is None:
+        return 1.0
+    url, params = request
     try:
-        response = requests.get(url, params=params, timeout=API_TIMEOUT_SECONDS)
+        response = await client.get(url, params=params, timeout=API_TIMEOUT_SECONDS)
         response.raise_for_status()
-        payload = response.json()
-        flow_segment = payload.get("flowSegmentData", {})
-        current_speed = flow_segment.get("currentSpeed")
-        free_flow_speed = flow_segment.get("freeFlowSpeed")
-        if not current_speed or not free_flow_speed:
-            return 1.0
-        ratio = free_flow_speed / current_speed if current_speed else 1.0
-        return float(max(0.5, min(2.0, ratio)))
+        return parse(response.json())
     except Exception:
         return 1.0
 
 
-def _simulate_samples(n_samples: int, weather_factor: float, traffic_factor_global: float) -> Dict[str, np.ndarray]:
-    """Run stochastic sampling and return per-sample arrays."""
+async def get_factor_snapshot_async(client: Optional["httpx.AsyncClient"] = None) -> Tuple[float, float]:
+    """Non-blocking ``get_factor_snapshot``: both APIs are queried concurrently.
+
+    Shares the TTL snapshot with the synchronous version. Without ``httpx``
+    installed the synchronous fetch runs in a worker thread instead.
+    """
+    ttl = _snapshot_ttl()
+    cached = _fresh_snapshot(ttl, time.monotonic())
+    if cached is not None:
+        return cached
+    if httpx is None:
+        return await asyncio.to_thread(get_factor_snapshot)
+
+    if client is None:
+        async with httpx.AsyncClient() as owned_client:
+            return await get_factor_snapshot_async(owned_client)
+    weather, traffic = await asyncio.gather(
+        _fetch_factor_async(client, _weather_request(), _weather_from_payload),
+        _fetch_factor_async(client, _traffic_request(), _traffic_from_payload),
+    )
+    with _FACTOR_LOCK:
+        return _store_snapshot((weather, traffic), ttl)
+
+
+def nearest_supplier_distances(lat: float, lon: float) -> Optional[SupplierDistances]:
+    """Distances to the nearest suppliers of every type, or None without a supplier index."""
+    index = get_supplier_index()
+    if index is None or not len(index):
+        return None
+    k = int(_get_env_float("SIM_NEAREST_SUPPLIERS", NEAREST_SUPPLIERS_K))
+    return index.nearest_distances(lat, lon, CO2_FACTORS.keys(), max(k, 1))
+
+
+class _DistanceTable:
+    """Nearest-supplier distances per supplier type, laid out for vectorised lookup.
+
+    A sample of type ``t`` picks one of that type's suppliers uniformly via
+    ``floor(u * count[t])``. Each row is padded with its last value so rounding
+    up to ``count[t]`` stays in bounds. Types without any known supplier use
+    evenly spaced quantiles of ``DISTANCE_RANGE_KM`` instead.
+    """
+
+    def __init__(self, supplier_distances: Sequence[Sequence[float]]) -> None:
+        low, high = DISTANCE_RANGE_KM
+        fallback = [low + (high - low) * (q + 0.5) / FALLBACK_DISTANCE_QUANTILES for q in range(FALLBACK_DISTANCE_QUANTILES)]
+        rows = [list(distances) or fallback for distances in supplier_distances]
+        self.width = max(len(row) for row in rows) + 1
+        self.counts = np.array([len(row) for row in rows], dtype=float)
+        self.offsets = np.arange(len(rows), dtype=float) * self.width
+        self.flat = np.array([row + [row[-1]] * (self.width - len(row)) for row in rows], dtype=float).ravel()
+        self.counts32 = self.counts.astype(np.float32)
+        self.offsets32 = self.offsets.astype(np.float32)
+        self.flat32 = self.flat.astype(np.float32)
+
+    def lookup(self, supplier_indices: np.ndarray, u: np.ndarray) -> np.ndarray:
+        columns = (u * self.counts[supplier_indices] + self.offsets[supplier_indices]).astype(np.intp)
+        return self.flat[columns]
+
+    def lookup_into(self, supplier_indices: np.ndarray, u: np.ndarray, scratch: np.ndarray, columns: np.ndarray) -> None:
+        """Allocation-free variant: overwrite the float32 ``u`` with looked-up distances."""
+        np.take(self.counts32, supplier_indices, out=scratch)
+        u *= scratch
+        np.take(self.offsets32, supplier_indices, out=scratch)
+        u += scratch
+        np.copyto(columns, u, casting="unsafe")
+        np.take(self.flat32, columns, out=u)
+
+
+def _simulate_samples(
+    n_samples: int,
+    weather_factor: float,
+    traffic_factor_global: float,
+    rng: Optional[np.random.Generator] = None,
+    sampler: Optional[UniformSampler] = None,
+    distance_table: Optional[_DistanceTable] = None,
+    emission_models: Sequence[str] = DEFAULT_EMISSION_MODELS,
+    cost_models: Sequence[str] = DEFAULT_COST_MODELS,
+) -> Dict[str, np.ndarray]:
+    """Run stochastic sampling and return per-sample arrays.
+
+    Without ``sampler`` the variates are drawn directly from ``rng``; otherwise
+    they are obtained by inverse transform of the sampler's uniform points.
+    With ``distance_table`` the distance variate selects one of the nearest real
+    suppliers of the sampled type instead of a uniform distance. Emissions and
+    costs come from composing the selected registry models.
+    """
     supplier_types: List[str] = list(CO2_FACTORS.keys())
-    rng = np.random.default_rng()
+    rng = rng if rng is not None else np.random.default_rng()
 
-    supplier_indices = rng.integers(0, len(supplier_types), size=n_samples)
-    supplier_array = np.array(supplier_types)[supplier_indices]
+    if sampler is None:
+        supplier_indices = rng.integers(0, len(supplier_types), size=n_samples)
+        distance_draw = rng.random(n_samples)
+        traffic_noise = rng.normal(loc=0.0, scale=1.0, size=n_samples)
+        price_noise = rng.normal(loc=0.0, scale=1.0, size=n_samples)
+    else:
+        points = sampler.uniforms(n_samples)
+        supplier_indices = np.minimum((points[:, 0] * len(supplier_types)).astype(np.int64), len(supplier_types) - 1)
+        distance_draw = points[:, 1]
+        traffic_noise = norm_ppf(points[:, 2])
+        price_noise = norm_ppf(points[:, 3])
 
-    distances = rng.uniform(1.0, 50.0, size=n_samples)
-    traffic_local = np.clip(rng.normal(loc=1.0, scale=0.1, size=n_samples), 0.5, 2.0)
-    price_factor = np.clip(rng.normal(loc=1.0, scale=0.15, size=n_samples), 0.5, 2.0)
+    if distance_table is None:
+        distances = DISTANCE_RANGE_KM[0] + (DISTANCE_RANGE_KM[1] - DISTANCE_RANGE_KM[0]) * distance_draw
+    else:
+        distances = distance_table.lookup(supplier_indices, distance_draw)
 
-    co2_per_km = np.vectorize(CO2_FACTORS.get)(supplier_array)
-    base_prices = np.vectorize(BASE_PRICES.get)(supplier_array)
+    supplier_array = np.array(supplier_types)[supplier_indices]
+    traffic_local = np.clip(1.0 + 0.1 * traffic_noise, 0.5, 2.0)
+    price_factor = np.clip(1.0 + 0.15 * price_noise, 0.5, 2.0)
 
-    emissions = distances * co2_per_km * traffic_local * weather_factor * traffic_factor_global
-    costs = base_prices * price_factor
+    context = SampleContext(
+        supplier_types=tuple(supplier_types),
+        supplier_indices=supplier_indices,
+        distances=distances,
+        traffic_local=traffic_local,
+        price_factor=price_factor,
+        weather_factor=weather_factor,
+        traffic_factor_global=traffic_factor_global,
+        co2_per_km=CO2_FACTORS,
+        base_prices=BASE_PRICES,
+    )
+    emissions = np.empty(n_samples)
+    costs = np.empty(n_samples)
+    apply_models(context, emission_models, cost_models, emissions, costs, np.empty(n_samples))
+    replicates = None if sampler is None else np.repeat(np.arange(sampler.replicates), sampler.replicate_sizes(n_samples))
 
     return {
         "suppliers": supplier_array,
+        "supplier_indices": supplier_indices,
+        "replicates": replicates,
         "emissions": emissions,
         "costs": costs,
     }
 
 
-def _aggregate_best_suppliers(suppliers: np.ndarray, emissions: np.ndarray) -> List[str]:
-    """Determine the best supplier types based on mean emissions."""
-    results: Dict[str, float] = {}
-    for supplier in CO2_FACTORS.keys():
-        mask = suppliers == supplier
-        if np.any(mask):
-            results[supplier] = float(np.mean(emissions[mask]))
-    if not results:
-        return []
+def _aggregate_best_suppliers(supplier_indices: np.ndarray, emissions: np.ndarray) -> List[str]:
+    """Determine the best supplier types based on mean emissions (one grouped reduction)."""
+    n_suppliers = len(CO2_FACTORS)
+    counts = np.bincount(supplier_indices, minlength=n_suppliers)
+    sums = np.bincount(supplier_indices, weights=emissions, minlength=n_suppliers)
+    present = np.flatnonzero(counts)
+    means = sums[present] / counts[present]
+    names = list(CO2_FACTORS.keys())
+    return [names[position] for position in present[np.argsort(means, kind="stable")][:2]]
 
-    sorted_suppliers = sorted(results.items(), key=lambda item: item[1])
-    return [name for name, _ in sorted_suppliers[:2]]
 
+def _quantile_key(probability: float) -> str:
+    return f"p{round(probability * 100):d}"
+
+
+def _grouped_quantiles(
+    supplier_indices: np.ndarray, values: np.ndarray, counts: np.ndarray, probabilities: Sequence[float]
+) -> np.ndarray:
+    """Per-supplier linear-interpolated quantiles from a single (supplier, value) sort."""
+    if values.size == 0:
+        return np.full((len(counts), len(probabilities)), np.nan)
+    ordered = values[np.lexsort((values, supplier_indices))]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    positions = starts[:, None] + np.asarray(probabilities)[None, :] * np.maximum(counts - 1, 0)[:, None]
+    below = np.floor(positions).astype(np.intp)
+    above = np.minimum(below + 1, np.maximum(starts + counts - 1, 0)[:, None])
+    weight = positions - below
+    return ordered[below] * (1.0 - weight) + ordered[above] * weight
+
+
+def supplier_statistics(
+    supplier_indices: np.ndarray,
+    emissions: np.ndarray,
+    costs: np.ndarray,
+    quantiles: Sequence[float] = SUPPLIER_QUANTILES,
+) -> Dict[str, Dict[str, object]]:
+    """Exact per-supplier count, mean, std and quantiles of emissions and cost.
+
+    Moments come from ``bincount`` and quantiles from one lexsort per metric
+    over the integer supplier codes, so the samples are never masked per supplier.
+    """
+    n_suppliers = len(CO2_FACTORS)
+    counts = np.bincount(supplier_indices, minlength=n_suppliers)
+    metrics: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+    for metric, values in (("emissions", emissions), ("cost", costs)):
+        sums = np.bincount(supplier_indices, weights=values, minlength=n_suppliers)
+        squares = np.bincount(supplier_indices, weights=np.square(values, dtype=np.float64), minlength=n_suppliers)
+        means = np.divide(sums, counts, out=np.zeros(n_suppliers), where=counts > 0)
+        variances = np.divide(squares, counts, out=np.zeros(n_suppliers), where=counts > 0) - means**2
+        metrics[metric] = (means, np.sqrt(np.maximum(variances, 0.0)), _grouped_quantiles(supplier_indices, values, counts, quantiles))
+
+    result: Dict[str, Dict[str, object]] = {}
+    for position, supplier in enumerate(CO2_FACTORS.keys()):
+        if not counts[position]:
+            continue
+        entry: Dict[str, object] = {"count": int(counts[position])}
+        for metric, (means, stds, metric_quantiles) in metrics.items():
+            entry[metric] = _metric_summary(means[position], stds[position], metric_quantiles[position], quantiles)
+        result[supplier] = entry
+    return result
+
+
+def _metric_summary(mean: float, std: float, values: Sequence[float], quantiles: Sequence[float]) -> Dict[str, float]:
+    summary = {"mean": round(float(mean), 4), "std": round(float(std), 4)}
+    summary.update({_quantile_key(q): round(float(value), 4) for q, value in zip(quantiles, values)})
+    return summary
 
-def run_simulation(recipe_id: str, n_samples: int = 10000) -> Dict[str, object]:
-    """Run the Monte Carlo simulation and produce eco impact metrics."""
-    if n_samples <= 0:
-        raise ValueError("n_samples must be a positive integer")
 
-    _ = recipe_id  # Explicitly unused but kept for signature compatibility.
+class _SampleBuffers:
+    """Preallocated float32 scratch arrays reused for every chunk in low-memory mode."""
 
-    weather_factor = get_weather_factor()
-    traffic_factor_global = get_traffic_factor()
+    def __init__(self, chunk_size: int) -> None:
+        self.supplier_types = tuple(CO2_FACTORS.keys())
+        self.supplier_indices = np.empty(chunk_size, dtype=np.intp)
+        self.distances = np.empty(chunk_size, dtype=np.float32)
+        self.traffic_local = np.empty(chunk_size, dtype=np.float32)
+        self.price_factor = np.empty(chunk_size, dtype=np.float32)
+        self.emissions = np.empty(chunk_size, dtype=np.float32)
+        self.costs = np.empty(chunk_size, dtype=np.float32)
+        self.scratch = np.empty(chunk_size, dtype=np.float32)
+        self.columns = np.empty(chunk_size, dtype=np.intp)
 
-    samples = _simulate_samples(n_samples, weather_factor, traffic_factor_global)
-    emissions = samples["emissions"]
-    costs = samples["costs"]
+    def fill(
+        self,
+        rng: np.random.Generator,
+        n_samples: int,
+        weather_factor: float,
+        traffic_factor_global: float,
+        distance_table: Optional[_DistanceTable] = None,
+        emission_models: Sequence[str] = DEFAULT_EMISSION_MODELS,
+        cost_models: Sequence[str] = DEFAULT_COST_MODELS,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Draw one chunk in place and return views of indices, emissions and costs."""
+        indices = self.supplier_indices[:n_samples]
+        distances = self.distances[:n_samples]
+        traffic_local = self.traffic_local[:n_samples]
+        price_factor = self.price_factor[:n_samples]
+        scratch = self.scratch[:n_samples]
+        n_suppliers = len(self.supplier_types)
 
-    mean_co2 = float(np.mean(emissions)) if emissions.size else 0.0
-    mean_cost = float(np.mean(costs)) if costs.size else 0.0
-    std_cost = float(np.std(costs)) if costs.size else 0.0
+        rng.random(dtype=np.float32, out=scratch)
+        scratch *= n_suppliers
+        np.copyto(indices, scratch, casting="unsafe")
+        np.minimum(indices, n_suppliers - 1, out=indices)
 
-    eco_score = 1.0 - (mean_co2 / (mean_co2 + 20.0)) if mean_co2 >= 0 else 0.0
-    co2_saved = 50.0 - mean_co2
-    variance_cost = (std_cost / mean_cost) if mean_cost else 0.0
+        rng.random(dtype=np.float32, out=distances)
+        if distance_table is None:
+            distances *= DISTANCE_RANGE_KM[1] - DISTANCE_RANGE_KM[0]
+            distances += DISTANCE_RANGE_KM[0]
+        else:
+            distance_table.lookup_into(indices, distances, scratch, self.columns[:n_samples])
 
-    best_sources = _aggregate_best_suppliers(samples["suppliers"], emissions)
+        for buffer, scale in ((traffic_local, 0.1), (price_factor, 0.15)):
+            rng.standard_normal(dtype=np.float32, out=buffer)
+            buffer *= scale
+            buffer += 1.0
+            np.clip(buffer, 0.5, 2.0, out=buffer)
+
+        context = SampleContext(
+            supplier_types=self.supplier_types,
+            supplier_indices=indices,
+            distances=distances,
+            traffic_local=traffic_local,
+            price_factor=price_factor,
+            weather_factor=weather_factor,
+            traffic_factor_global=traffic_factor_global,
+            co2_per_km=CO2_FACTORS,
+            base_prices=BASE_PRICES,
+        )
+        emissions = self.emissions[:n_samples]
+        costs = self.costs[:n_samples]
+        apply_models(context, emission_models, cost_models, emissions, costs, scratch)
+        return indices, emissions, costs
+
+
+def _accumulate_indexed(
+    indices: np.ndarray,
+    emissions: np.ndarray,
+    costs: np.ndarray,
+    emission_stats: Dict[str, RunningStats],
+    cost_stats: Dict[str, RunningStats],
+) -> None:
+    """Fold a chunk into the running statistics with grouped reductions per metric."""
+    n_suppliers = len(CO2_FACTORS)
+    for values, stats in ((emissions, emission_stats), (costs, cost_stats)):
+        counts, means, m2s = _grouped_moments(indices, values, n_suppliers)
+        histograms = grouped_bin_counts(indices, values, n_suppliers)
+        for position, supplier in enumerate(CO2_FACTORS.keys()):
+            count = int(counts[position])
+            if not count:
+                continue
+            stats[supplier].merge(RunningStats(count=count, mean=float(means[position]), m2=float(m2s[position])))
+            histogram = stats[supplier].histogram
+            if histogram is not None:
+                histogram.counts += histograms[position]
+
+
+def _grouped_moments(indices: np.ndarray, values: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Count, mean and ``m2`` of ``values`` per group.
+
+    Each group's ``m2`` sums squared deviations about its own mean, so large
+    means do not cancel the variance away before the Chan merge.
+    """
+    counts = np.bincount(indices, minlength=n_groups)
+    means = np.bincount(indices, weights=values, minlength=n_groups) / np.maximum(counts, 1)
+    deviations = np.subtract(values, means[indices], dtype=np.float64)
+    m2s = np.bincount(indices, weights=np.square(deviations, out=deviations), minlength=n_groups)
+    return counts, means, m2s
+
+
+def _accumulate_replicates(
+    replicates: np.ndarray,
+    emissions: np.ndarray,
+    costs: np.ndarray,
+    emission_replicates: List[RunningStats],
+    cost_replicates: List[RunningStats],
+) -> None:
+    """Fold a chunk into one pooled accumulator per sampler replicate."""
+    for values, stats in ((emissions, emission_replicates), (costs, cost_replicates)):
+        counts, means, m2s = _grouped_moments(replicates, values, len(stats))
+        for position, replicate in enumerate(stats):
+            count = int(counts[position])
+            if count:
+                replicate.merge(RunningStats(count=count, mean=float(means[position]), m2=float(m2s[position])))
+
+
+def _eco_score(mean_co2: float) -> float:
+    return 1.0 - (mean_co2 / (mean_co2 + ECO_SCORE_SCALE_KG)) if mean_co2 >= 0 else 0.0
+
+
+def _eco_score_interval(emissions: RunningStats, z: float) -> Tuple[float, float]:
+    """Delta-method confidence interval for ``eco_score``."""
+    score = _eco_score(emissions.mean)
+    if emissions.count == 0:
+        return score, score
+    standard_error = emissions.std / np.sqrt(emissions.count)
+    gradient = ECO_SCORE_SCALE_KG / (emissions.mean + ECO_SCORE_SCALE_KG) ** 2
+    half_width = z * gradient * standard_error
+    return score - half_width, score + half_width
+
+
+def _variance_cost_interval(costs: RunningStats, z: float) -> Tuple[float, float]:
+    """Confidence interval for the coefficient of variation of cost."""
+    if costs.count == 0 or not costs.mean:
+        return 0.0, 0.0
+    variation = costs.std / costs.mean
+    standard_error = variation * np.sqrt((0.5 + variation * variation) / costs.count)
+    half_width = z * standard_error
+    return variation - half_width, variation + half_width
+
+
+def _summarize(
+    emission_stats: Dict[str, RunningStats],
+    cost_stats: Dict[str, RunningStats],
+    confidence: float,
+) -> Dict[str, object]:
+    """Turn per-supplier running statistics into the simulation payload."""
+    emissions = merge_stats(emission_stats.values(), histograms=False)
+    costs = merge_stats(cost_stats.values(), histograms=False)
+    z = z_score(confidence)
+
+    mean_co2 = emissions.mean
+    eco_score = _eco_score(mean_co2)
+    co2_saved = CO2_BASELINE_KG - mean_co2
+    variance_cost = (costs.std / costs.mean) if costs.mean else 0.0
+
+    ranked = sorted(
+        ((name, stats.mean) for name, stats in emission_stats.items() if stats.count),
+        key=lambda item: item[1],
+    )
+    best_sources = [name for name, _ in ranked[:2]]
+
+    present = [name for name, stats in emission_stats.items() if stats.count]
+    tracked = [
+        stats
+        for name in present
+        for stats in (emission_stats[name], cost_stats[name])
+        if stats.histogram is not None
+    ]
+    quantile_rows = (
+        iter(histogram_quantiles([stats.histogram for stats in tracked], SUPPLIER_QUANTILES))  # type: ignore[misc]
+        if len(tracked) == 2 * len(present) and tracked
+        else None
+    )
+    supplier_stats: Dict[str, Dict[str, object]] = {}
+    for name in present:
+        entry: Dict[str, object] = {"count": int(emission_stats[name].count)}
+        for metric, stats in (("emissions", emission_stats[name]), ("cost", cost_stats[name])):
+            quantiles = next(quantile_rows) if quantile_rows is not None else []
+            entry[metric] = _metric_summary(stats.mean, stats.std, quantiles, SUPPLIER_QUANTILES)
+        supplier_stats[name] = entry
+
+    eco_low, eco_high = _eco_score_interval(emissions, z)
+    cost_low, cost_high = _variance_cost_interval(costs, z)
 
     return {
         "eco_score": round(float(eco_score), 4),
         "co2_saved_kg": round(float(co2_saved), 4),
         "variance_cost": round(float(variance_cost), 4),
         "best_sources": best_sources,
-        "route_cluster": "Cluster-SimA",
+        "supplier_stats": supplier_stats,
+        "route_cluster": FALLBACK_CLUSTER,
+        "n_samples_used": int(emissions.count),
+        "confidence_intervals": {
+            "eco_score": [round(float(eco_low), 4), round(float(eco_high), 4)],
+            "variance_cost": [round(float(cost_low), 4), round(float(cost_high), 4)],
+        },
     }
 
 
+def _converged(
+    emission_stats: Dict[str, RunningStats],
+    cost_stats: Dict[str, RunningStats],
+    ci_width: float,
+    z: float,
+) -> bool:
+    """Return True once both tracked metric intervals are narrower than ``ci_width``."""
+    eco_low, eco_high = _eco_score_interval(merge_stats(emission_stats.values(), histograms=False), z)
+    cost_low, cost_high = _variance_cost_interval(merge_stats(cost_stats.values(), histograms=False), z)
+    return (eco_high - eco_low) <= ci_width and (cost_high - cost_low) <= ci_width
+
+
+def _replicates_converged(
+    emission_replicates: List[RunningStats],
+    cost_replicates: List[RunningStats],
+    ci_width: float,
+    t: float,
+) -> bool:
+    """Stopping rule for the variance-reduced samplers.
+
+    Their draws are correlated by design, so the i.i.d. standard error is
+    wrong for them; the spread of the independent replicate estimates is not.
+    """
+    if any(stats.count < 2 for stats in emission_replicates):
+        return False
+    eco_scores = np.array([_eco_score(stats.mean) for stats in emission_replicates])
+    variations = np.array([stats.std / stats.mean if stats.mean else 0.0 for stats in cost_replicates])
+    scale = 2.0 * t / np.sqrt(len(emission_replicates))
+    return scale * float(eco_scores.std(ddof=1)) <= ci_width and scale * float(variations.std(ddof=1)) <= ci_width
+
+
+def _sample_statistics(
+    n_samples: int,
+    weather_factor: float,
+    traffic_factor_global: float,
+    rng: np.random.Generator,
+    sampler: str = DEFAULT_SAMPLER,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ci_width: Optional[float] = None,
+    confidence: float = DEFAULT_CONFIDENCE,
+    low_memory: bool = False,
+    supplier_distances: Optional[SupplierDistances] = None,
+    emission_models: Sequence[str] = DEFAULT_EMISSION_MODELS,
+    cost_models: Sequence[str] = DEFAULT_COST_MODELS,
+    on_chunk: Optional[StatsCallback] = None,
+) -> Tuple[Dict[str, RunningStats], Dict[str, RunningStats]]:
+    """Draw up to ``n_samples`` in chunks and return per-supplier emission and cost statistics.
+
+    With ``low_memory`` every chunk is generated as float32 into the same
+    preallocated buffers, so peak memory depends only on ``chunk_size``.
+    ``supplier_distances`` (ordered like ``CO2_FACTORS``) replaces the uniform
+    distance model with the nearest real suppliers. The variance-reduced
+    samplers stop early on the spread of their ``SAMPLER_REPLICATES``
+    independent replicates rather than the i.i.d. standard error.
+    """
+    point_sampler = (
+        None
+        if sampler == "mc"
+        else make_sampler(sampler, rng, SAMPLE_DIMENSIONS, replicates=SAMPLER_REPLICATES, unpaired=COST_ONLY_DIMENSIONS)
+    )
+    distance_table = _DistanceTable(supplier_distances) if supplier_distances else None
+    buffers = _SampleBuffers(min(chunk_size, n_samples)) if low_memory else None
+    z = z_score(confidence)
+    emission_stats = {supplier: RunningStats(histogram=LogHistogram()) for supplier in CO2_FACTORS}
+    cost_stats = {supplier: RunningStats(histogram=LogHistogram()) for supplier in CO2_FACTORS}
+    track_replicates = point_sampler is not None and ci_width is not None
+    emission_replicates = [RunningStats() for _ in range(SAMPLER_REPLICATES)] if track_replicates else []
+    cost_replicates = [RunningStats() for _ in range(SAMPLER_REPLICATES)] if track_replicates else []
+    t = t_score(confidence, SAMPLER_REPLICATES - 1)
+
+    drawn = 0
+    while drawn < n_samples:
+        size = min(chunk_size, n_samples - drawn)
+        if buffers is not None:
+            indices, emissions, costs = buffers.fill(
+                rng, size, weather_factor, traffic_factor_global, distance_table, emission_models, cost_models
+            )
+            _accumulate_indexed(indices, emissions, costs, emission_stats, cost_stats)
+        else:
+            samples = _simulate_samples(
+                size,
+                weather_factor,
+                traffic_factor_global,
+                rng,
+                point_sampler,
+                distance_table,
+                emission_models,
+                cost_models,
+            )
+            _accumulate_indexed(
+                samples["supplier_indices"], samples["emissions"], samples["costs"], emission_stats, cost_stats
+            )
+            if track_replicates:
+                _accumulate_replicates(
+                    samples["replicates"], samples["emissions"], samples["costs"], emission_replicates, cost_replicates
+                )
+        drawn += size
+        if on_chunk is not None:
+            on_chunk(emission_stats, cost_stats)
+        if ci_width is None:
+            continue
+        if track_replicates:
+            if _replicates_converged(emission_replicates, cost_replicates, ci_width, t):
+                break
+        elif _converged(emission_stats, cost_stats, ci_width, z):
+            break
+    return emission_stats, cost_stats
+
+
+def derive_seed(recipe_id: str, weather_factor: float, traffic_factor_global: float) -> int:
+    """Derive a stable 128-bit seed from the recipe and the live factor snapshot."""
+    source = f"{recipe_id}|{weather_factor!r}|{traffic_factor_global!r}"
+    return int.from_bytes(hashlib.sha256(source.encode("utf-8")).digest()[:16], "big")
+
+
+def _sampling_rng(seed: int) -> np.random.Generator:
+    """Return the generator for the sampling stream spawned from ``seed``."""
+    (sampling_stream,) = np.random.SeedSequence(seed).spawn(1)
+    return np.random.default_rng(sampling_stream)
+
+
+def _worker_statistics(
+    task: Tuple[
+        np.random.SeedSequence,
+        int,
+        float,
+        float,
+        str,
+        int,
+        bool,
+        Optional[SupplierDistances],
+        Tuple[str, ...],
+        Tuple[str, ...],
+    ],
+) -> Tuple[Dict[str, RunningStats], Dict[str, RunningStats]]:
+    """Pool entry point: sample one share of the budget from its own stream."""
+    (
+        stream,
+        n_samples,
+        weather_factor,
+        traffic_factor_global,
+        sampler,
+        chunk_size,
+        low_memory,
+        supplier_distances,
+        emission_models,
+        cost_models,
+    ) = task
+    return _sample_statistics(
+        n_samples,
+        weather_factor,
+        traffic_factor_global,
+        np.random.default_rng(stream),
+        sampler=sampler,
+        chunk_size=chunk_size,
+        low_memory=low_memory,
+        supplier_distances=supplier_distances,
+        emission_models=emission_models,
+        cost_models=cost_models,
+    )
+
+
+def _parallel_statistics(
+    n_samples: int,
+    weather_factor: float,
+    traffic_factor_global: float,
+    seed: int,
+    workers: int,
+    executor: str,
+    sampler: str,
+    chunk_size: int,
+    low_memory: bool = False,
+    supplier_distances: Optional[SupplierDistances] = None,
+    emission_models: Tuple[str, ...] = DEFAULT_EMISSION_MODELS,
+    cost_models: Tuple[str, ...] = DEFAULT_COST_MODELS,
+    on_chunk: Optional[StatsCallback] = None,
+) -> Tuple[Dict[str, RunningStats], Dict[str, RunningStats]]:
+    """Split ``n_samples`` across a worker pool and merge the partial statistics.
+
+    Every worker draws from its own ``SeedSequence.spawn`` child and samples in
+    chunks, so memory per worker is bounded by ``chunk_size`` and the merged
+    result only depends on ``seed`` and ``workers``.
+    """
+    streams = np.random.SeedSequence(seed).spawn(workers)
+    base_share, remainder = divmod(n_samples, workers)
+    tasks = [
+        (
+            stream,
+            base_share + (1 if index < remainder else 0),
+            weather_factor,
+            traffic_factor_global,
+            sampler,
+            chunk_size,
+            low_memory,
+            supplier_distances,
+            emission_models,
+            cost_models,
+        )
+        for index, stream in enumerate(streams)
+    ]
+    tasks = [task for task in tasks if task[1] > 0]
+
+    pool: Executor
+    if executor == "process":
+        pool = ProcessPoolExecutor(max_workers=len(tasks))
+    else:
+        pool = ThreadPoolExecutor(max_workers=len(tasks))
+    partials: List[Tuple[Dict[str, RunningStats], Dict[str, RunningStats]]] = []
+    with pool:
+        for partial in pool.map(_worker_statistics, tasks):
+            partials.append(partial)
+            emission_stats = {supplier: merge_stats(part[0][supplier] for part in partials) for supplier in CO2_FACTORS}
+            cost_stats = {supplier: merge_stats(part[1][supplier] for part in partials) for supplier in CO2_FACTORS}
+            if on_chunk is not None:
+                on_chunk(emission_stats, cost_stats)
+    return emission_stats, cost_stats
+
+
+@lru_cache(maxsize=SIMULATION_CACHE_SIZE)
+def _cached_simulation(
+    recipe_id: str,
+    seed: int,
+    weather_factor: float,
+    traffic_factor_global: float,
+    n_samples: int,
+    ci_width: Optional[float],
+    chunk_size: int,
+    confidence: float,
+    sampler: str,
+    workers: int = 1,
+    executor: str = "process",
+    low_memory: bool = False,
+    supplier_distances: Optional[SupplierDistances] = None,
+    emission_models: Tuple[str, ...] = DEFAULT_EMISSION_MODELS,
+    cost_models: Tuple[str, ...] = DEFAULT_COST_MODELS,
+    on_chunk: Optional[StatsCallback] = None,
+) -> Dict[str, object]:
+    # ``on_chunk`` is only passed via ``__wrapped__``: progress-reporting runs bypass the cache.
+    _ = recipe_id  # Part of the cache key only; sampling depends on the seed.
+    if workers > 1:
+        emission_stats, cost_stats = _parallel_statistics(
+            n_samples,
+            weather_factor,
+            traffic_factor_global,
+            seed,
+            workers,
+            executor,
+            sampler,
+            chunk_size,
+            low_memory,
+            supplier_distances,
+            emission_models,
+            cost_models,
+            on_chunk,
+        )
+        return _summarize(emission_stats, cost_stats, confidence)
+
+    emission_stats, cost_stats = _sample_statistics(
+        n_samples,
+        weather_factor,
+        traffic_factor_global,
+        _sampling_rng(seed),
+        sampler=sampler,
+        chunk_size=chunk_size,
+        ci_width=ci_width,
+        confidence=confidence,
+        low_memory=low_memory,
+        supplier_distances=supplier_distances,
+        emission_models=emission_models,
+        cost_models=cost_models,
+        on_chunk=on_chunk,
+    )
+    return _summarize(emission_stats, cost_stats, confidence)
+
+
+def clear_simulation_cache() -> None:
+    """Drop all memoised simulation results and the cached factor snapshot."""
+    _cached_simulation.cache_clear()
+    get_simulation_memo().clear()
+    with _FACTOR_LOCK:
+        _FACTOR_SNAPSHOT["expires_at"] = 0.0
+
+
+def route_cluster_for_location(
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    supplier_distances: Optional[SupplierDistances] = None,
+) -> str:
+    """Assign a delivery location to its persisted route cluster (O(k) centroid lookup).
+
+    Distance features are the mean nearest-supplier distance per type, falling
+    back to the expected uniform distance for types without known suppliers.
+    """
+    default_lat, default_lon = get_location()
+    lat = default_lat if lat is None else lat
+    lon = default_lon if lon is None else lon
+    if supplier_distances is None:
+        supplier_distances = nearest_supplier_distances(lat, lon)
+    expected_distance = sum(DISTANCE_RANGE_KM) / 2.0
+    per_type = [
+        float(np.mean(distances)) if distances else expected_distance
+        for distances in (supplier_distances or [()] * len(CO2_FACTORS))
+    ]
+    return assign_route_cluster(route_features(lat, lon, per_type))
+
+
+def _progress_reporter(progress: Callable[[Dict[str, object]], None], n_samples: int, confidence: float) -> StatsCallback:
+    """Adapt ``progress`` to per-chunk statistics, throttled to ``PROGRESS_INTERVAL_SECONDS``."""
+    next_report = [0.0]
+
+    def report(emission_stats: Dict[str, RunningStats], cost_stats: Dict[str, RunningStats]) -> None:
+        now = time.monotonic()
+        if now < next_report[0]:
+            return
+        next_report[0] = now + PROGRESS_INTERVAL_SECONDS
+        summary = _summarize(emission_stats, cost_stats, confidence)
+        progress(
+            {
+                "n_samples_used": summary["n_samples_used"],
+                "n_samples": n_samples,
+                "eco_score": summary["eco_score"],
+                "confidence_intervals": summary["confidence_intervals"],
+            }
+        )
+
+    return report
+
+
+def _lookup_precomputed(
+    recipe_id: str,
+    weather_factor: float,
+    traffic_factor_global: float,
+    emission_models: Tuple[str, ...],
+    cost_models: Tuple[str, ...],
+) -> Optional[Dict[str, object]]:
+    """Precomputed result for the live factor bucket; tables only cover the default models."""
+    if emission_models != DEFAULT_EMISSION_MODELS or cost_models != DEFAULT_COST_MODELS:
+        return None
+    condition = _WEATHER_CONDITIONS.get(weather_factor)
+    table = load_table() if condition is not None else None
+    if table is None:
+        return None
+    return table.get(recipe_id, condition, traffic_factor_global)  # type: ignore[arg-type]
+
+
+def run_simulation(
+    recipe_id: str,
+    n_samples: int = DEFAULT_N_SAMPLES,
+    ci_width: Optional[float] = DEFAULT_CI_WIDTH,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    confidence: float = DEFAULT_CONFIDENCE,
+    sampler: str = DEFAULT_SAMPLER,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    executor: str = "process",
+    low_memory: bool = False,
+    location: Optional[Tuple[float, float]] = None,
+    emission_models: Sequence[str] = DEFAULT_EMISSION_MODELS,
+    cost_models: Sequence[str] = DEFAULT_COST_MODELS,
+    factors: Optional[Tuple[float, float]] = None,
+    use_lookup: bool = True,
+    progress: Optional[Callable[[Dict[str, object]], None]] = None,
+    ingredients: Optional[Sequence[Mapping[str, object]]] = None,
+) -> Dict[str, object]:
+    """Run the Monte Carlo simulation and produce eco impact metrics.
+
+    Samples are drawn in chunks of ``chunk_size`` and folded into running
+    per-supplier statistics, so memory stays constant. ``n_samples`` is an upper
+    bound: sampling stops early once the ``confidence`` intervals of
+    ``eco_score`` and ``variance_cost`` are narrower than ``ci_width``. Pass
+    ``ci_width=None`` to always draw the full budget.
+
+    ``sampler`` selects plain Monte Carlo (``"mc"``) or one of the
+    variance-reduced strategies ``"sobol"``, ``"antithetic"`` and ``"lhs"``.
+    Those draw ``SAMPLER_REPLICATES`` independently randomised replicates and
+    stop early once the spread between replicates is narrow enough. Reported
+    intervals use the i.i.d. standard error and are therefore conservative
+    for them.
+
+    Runs are reproducible: without an explicit ``seed`` one is derived from
+    ``recipe_id`` and the fetched weather/traffic factors, and results are
+    memoised on every input that affects them.
+
+    ``workers > 1`` (or ``0`` for one per CPU) splits the full ``n_samples``
+    budget across a ``"process"`` or ``"thread"`` pool for high-fidelity runs;
+    early stopping does not apply in that mode.
+
+    ``low_memory`` generates float32 draws into reusable buffers of
+    ``LOW_MEMORY_CHUNK_SIZE`` (or ``chunk_size`` if larger) and aggregates them
+    on the fly, keeping peak memory flat for very large ``n_samples``. It only
+    supports the ``"mc"`` sampler.
+
+    Distances are drawn from the nearest suppliers of each type around
+    ``location`` (default: ``DEFAULT_LAT``/``DEFAULT_LON``) when a supplier index
+    is configured, and from ``DISTANCE_RANGE_KM`` otherwise.
+
+    ``emission_models`` and ``cost_models`` name entries of the registries in
+    ``models``; their outputs are composed in order on every chunk, e.g.
+    ``("transport_mode", "cold_chain")`` for mode-specific, refrigerated freight.
+
+    ``factors`` supplies ``(weather_factor, traffic_factor)`` (e.g. from
+    ``get_factor_snapshot_async``) instead of fetching the snapshot here.
+    Runs that leave the sample budget, interval settings, sampler, workers,
+    memory mode, seed, location, models and ``ingredients`` at their defaults
+    are answered from the precomputed table in ``lookup`` (``SIM_LOOKUP_TABLE``)
+    when the recipe and factor bucket are present; ``use_lookup=False`` always
+    samples.
+
+    ``progress`` receives interim ``n_samples_used``, ``eco_score`` and
+    ``confidence_intervals`` at most every ``PROGRESS_INTERVAL_SECONDS``
+    (after each finished worker share in parallel mode). Such runs are not
+    memoised.
+
+    With ``ingredients`` the seed derives from their normalised multiset
+    instead of ``recipe_id``, and results are shared through the ``memo``
+    layer, so recipes with identical ingredients cost a lookup, not a run.
+    """
+    if n_samples <= 0:
+        raise ValueError("n_samples must be a positive integer")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer")
+    if ci_width is not None and ci_width <= 0:
+        raise ValueError("ci_width must be positive")
+    if sampler not in SAMPLER_NAMES:
+        raise ValueError(f"sampler must be one of {', '.join(SAMPLER_NAMES)}")
+    if executor not in EXECUTOR_KINDS:
+        raise ValueError(f"executor must be one of {', '.join(EXECUTOR_KINDS)}")
+    if workers < 0:
+        raise ValueError("workers must be zero or a positive integer")
+    if low_memory and sampler != "mc":
+        raise ValueError("low_memory mode only supports the 'mc' sampler")
+    emission_models, cost_models = tuple(emission_models), tuple(cost_models)
+    validate_models(emission_models, cost_models)
+    if low_memory:
+        chunk_size = max(chunk_size, LOW_MEMORY_CHUNK_SIZE)
+    workers = workers or (os.cpu_count() or 1)
+    if workers > 1:
+        ci_width = None
+
+    weather_factor, traffic_factor_global = factors if factors is not None else get_factor_snapshot()
+    lat, lon = location if location is not None else get_location()
+    default_request = (
+        n_samples == DEFAULT_N_SAMPLES
+        and ci_width == DEFAULT_CI_WIDTH
+        and confidence == DEFAULT_CONFIDENCE
+        and sampler == DEFAULT_SAMPLER
+        and workers == 1
+        and not low_memory
+        and ingredients is None
+    )
+    if use_lookup and default_request and seed is None and location is None:
+        precomputed = _lookup_precomputed(recipe_id, weather_factor, traffic_factor_global, emission_models, cost_models)
+        if precomputed is not None:
+            precomputed["route_cluster"] = route_cluster_for_location(lat, lon)
+            return precomputed
+    supplier_distances = nearest_supplier_distances(lat, lon)
+    fingerprint = ingredient_fingerprint(ingredients) if ingredients else None
+    if seed is None:
+        seed_source = recipe_id if fingerprint is None else f"ingredients:{fingerprint}"
+        seed = derive_seed(seed_source, weather_factor, traffic_factor_global)
+
+    memo = get_simulation_memo()
+    memo_id: Optional[str] = None
+    if fingerprint is not None and progress is None:
+        memo_id = memo_key(
+            fingerprint,
+            weather_factor,
+            traffic_factor_global,
+            int(seed),
+            n_samples,
+            ci_width,
+            chunk_size,
+            confidence,
+            sampler,
+            workers,
+            low_memory,
+            supplier_distances,
+            emission_models,
+            cost_models,
+        )
+        memoised = memo.get(memo_id)
+        if memoised is not None:
+            memoised["route_cluster"] = route_cluster_for_location(lat, lon, supplier_distances)
+            return memoised
+
+    simulate = _cached_simulation if progress is None else _cached_simulation.__wrapped__
+    extra = {} if progress is None else {"on_chunk": _progress_reporter(progress, n_samples, confidence)}
+    result = simulate(
+        recipe_id,
+        int(seed),
+        weather_factor,
+        traffic_factor_global,
+        n_samples,
+        ci_width,
+        chunk_size,
+        confidence,
+        sampler,
+        workers,
+        executor,
+        low_memory,
+        supplier_distances,
+        emission_models,
+        cost_models,
+        **extra,
+    )
+    result = copy.deepcopy(result)
+    if memo_id is not None and fingerprint is not None:
+        memo.put(memo_id, fingerprint, result)
+    result["route_cluster"] = route_cluster_for_location(lat, lon, supplier_distances)
+    return result
+
+
 if __name__ == "__main__":  # pragma: no cover - debug usage only
-    random.seed(42)
-    print(run_simulation("demo"))
+    print(run_simulation("demo", seed=42))
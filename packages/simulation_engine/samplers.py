@@ -0,0 +1,187 @@
+"""Uniform point generators for variance-reduced Monte Carlo sampling."""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+SAMPLER_NAMES: Tuple[str, ...] = ("mc", "sobol", "antithetic", "lhs")
+
+# Joe & Kuo (2008) direction numbers for Sobol dimensions 2..6 as (s, a, m_1..m_s).
+_SOBOL_DIRECTIONS: List[Tuple[int, int, Tuple[int, ...]]] = [
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+]
+_SOBOL_BITS = 32
+
+# Acklam's rational approximation of the standard normal quantile function.
+_PPF_A = (-3.969683028665376e01, 2.209460984245205e02, -2.759285104469687e02, 1.383577518672690e02, -3.066479806614716e01, 2.506628277459239e00)
+_PPF_B = (-5.447609879822406e01, 1.615858368580409e02, -1.556989798598866e02, 6.680131188771972e01, -1.328068155288572e01)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e00, -2.549732539343734e00, 4.374664141464968e00, 2.938163982698783e00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e00, 3.754408661907416e00)
+_PPF_LOW = 0.02425
+
+__all__ = ["SAMPLER_NAMES", "UniformSampler", "make_sampler", "norm_ppf"]
+
+
+def _polyval(coefficients: Tuple[float, ...], x: np.ndarray) -> np.ndarray:
+    result = np.full_like(x, coefficients[0])
+    for coefficient in coefficients[1:]:
+        result = result * x + coefficient
+    return result
+
+
+def norm_ppf(u: np.ndarray) -> np.ndarray:
+    """Vectorised inverse standard normal CDF (relative error below 1.2e-9)."""
+    u = np.clip(np.asarray(u, dtype=float), 1e-12, 1.0 - 1e-12)
+    out = np.empty_like(u)
+
+    low = u < _PPF_LOW
+    high = u > 1.0 - _PPF_LOW
+    central = ~(low | high)
+
+    q = u[central] - 0.5
+    r = q * q
+    out[central] = _polyval(_PPF_A, r) * q / (_polyval(_PPF_B, r) * r + 1.0)
+
+    for mask, sign, tail in ((low, 1.0, u[low]), (high, -1.0, 1.0 - u[high])):
+        q = np.sqrt(-2.0 * np.log(tail))
+        out[mask] = sign * _polyval(_PPF_C, q) / (_polyval(_PPF_D, q) * q + 1.0)
+    return out
+
+
+class UniformSampler:
+    """Plain pseudo-random uniforms; subclasses add variance reduction.
+
+    Every batch is split into ``replicates`` contiguous blocks, each drawn from
+    an independent randomisation, so the spread of per-block estimates gives a
+    standard error that accounts for the sampler's correlation structure.
+    """
+
+    def __init__(self, rng: np.random.Generator, dimensions: int, replicates: int = 1) -> None:
+        if replicates <= 0:
+            raise ValueError("replicates must be a positive integer")
+        self.rng = rng
+        self.dimensions = dimensions
+        self.replicates = replicates
+
+    def replicate_sizes(self, n_samples: int) -> List[int]:
+        """Points per replicate in a batch of ``n_samples``, in block order."""
+        size, extra = divmod(n_samples, self.replicates)
+        return [size + 1 if replicate < extra else size for replicate in range(self.replicates)]
+
+    def uniforms(self, n_samples: int) -> np.ndarray:
+        """Return an ``(n_samples, dimensions)`` array of points in [0, 1)."""
+        blocks = [self._block(replicate, size) for replicate, size in enumerate(self.replicate_sizes(n_samples))]
+        return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+    def _block(self, replicate: int, n_samples: int) -> np.ndarray:
+        return self.rng.random((n_samples, self.dimensions))
+
+
+class AntitheticSampler(UniformSampler):
+    """Pairs every point ``u`` with its mirror ``1 - u``.
+
+    Dimensions listed in ``unpaired`` are drawn independently instead; mirroring
+    only helps metrics that are monotone in a dimension.
+    """
+
+    def __init__(
+        self, rng: np.random.Generator, dimensions: int, replicates: int = 1, unpaired: Sequence[int] = ()
+    ) -> None:
+        super().__init__(rng, dimensions, replicates)
+        self.unpaired = list(unpaired)
+
+    def _block(self, replicate: int, n_samples: int) -> np.ndarray:
+        half = (n_samples + 1) // 2
+        base = self.rng.random((half, self.dimensions))
+        points = np.concatenate([base, 1.0 - base])[:n_samples]
+        if self.unpaired:
+            points[:, self.unpaired] = self.rng.random((n_samples, len(self.unpaired)))
+        return points
+
+
+class LatinHypercubeSampler(UniformSampler):
+    """One point per equal-probability stratum in every dimension."""
+
+    def _block(self, replicate: int, n_samples: int) -> np.ndarray:
+        jitter = self.rng.random((n_samples, self.dimensions))
+        strata = self.rng.permuted(np.tile(np.arange(n_samples), (self.dimensions, 1)), axis=1).T
+        return (strata + jitter) / n_samples
+
+
+class SobolSampler(UniformSampler):
+    """Randomly digit-shifted Sobol sequences, one per replicate, that continue across calls."""
+
+    def __init__(self, rng: np.random.Generator, dimensions: int, replicates: int = 1) -> None:
+        super().__init__(rng, dimensions, replicates)
+        if dimensions > len(_SOBOL_DIRECTIONS) + 1:
+            raise ValueError(f"Sobol sampler supports at most {len(_SOBOL_DIRECTIONS) + 1} dimensions")
+        self._directions = self._direction_numbers(dimensions)
+        self._shift = rng.integers(0, 2**_SOBOL_BITS, size=(replicates, dimensions), dtype=np.uint64)
+        self._position = [0] * replicates
+
+    @staticmethod
+    def _direction_numbers(dimensions: int) -> np.ndarray:
+        table = np.zeros((dimensions, _SOBOL_BITS), dtype=np.uint64)
+        table[0] = [1 << (_SOBOL_BITS - 1 - bit) for bit in range(_SOBOL_BITS)]
+        for dim in range(1, dimensions):
+            s, a, m = _SOBOL_DIRECTIONS[dim - 1]
+            v = [0] * _SOBOL_BITS
+            for bit in range(_SOBOL_BITS):
+                if bit < s:
+                    v[bit] = m[bit] << (_SOBOL_BITS - 1 - bit)
+                else:
+                    value = v[bit - s] ^ (v[bit - s] >> s)
+                    for k in range(1, s):
+                        if (a >> (s - 1 - k)) & 1:
+                            value ^= v[bit - k]
+                    v[bit] = value
+            table[dim] = v
+        return table
+
+    def _block(self, replicate: int, n_samples: int) -> np.ndarray:
+        start = self._position[replicate]
+        index = np.arange(start, start + n_samples, dtype=np.uint64)
+        self._position[replicate] += n_samples
+        gray = index ^ (index >> np.uint64(1))
+        points = np.zeros((n_samples, self.dimensions), dtype=np.uint64)
+        highest_bit = int(gray.max()).bit_length() if n_samples else 0
+        for bit in range(min(highest_bit, _SOBOL_BITS)):
+            selected = ((gray >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+            points[selected] ^= self._directions[:, bit]
+        points ^= self._shift[replicate]
+        return points.astype(float) / float(2**_SOBOL_BITS)
+
+
+_SAMPLERS: Dict[str, Type[UniformSampler]] = {
+    "mc": UniformSampler,
+    "sobol": SobolSampler,
+    "antithetic": AntitheticSampler,
+    "lhs": LatinHypercubeSampler,
+}
+
+
+def make_sampler(
+    name: str,
+    rng: Optional[np.random.Generator],
+    dimensions: int,
+    replicates: int = 1,
+    unpaired: Sequence[int] = (),
+) -> UniformSampler:
+    """Instantiate the sampler registered under ``name``.
+
+    ``unpaired`` lists dimensions the antithetic sampler leaves unmirrored; other
+    samplers ignore it.
+    """
+    try:
+        sampler_cls = _SAMPLERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown sampler '{name}'. Expected one of {', '.join(SAMPLER_NAMES)}") from None
+    rng = rng if rng is not None else np.random.default_rng()
+    if sampler_cls is AntitheticSampler:
+        return AntitheticSampler(rng, dimensions, replicates, unpaired)
+    return sampler_cls(rng, dimensions, replicates)
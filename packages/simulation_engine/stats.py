@@ -0,0 +1,169 @@
+"""Streaming summary statistics used by the Monte Carlo engine."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+# Log-linear bins as in HDR histograms: 2**HISTOGRAM_MANTISSA_BITS linear steps per octave
+# from 2**HISTOGRAM_MIN_EXPONENT upwards, i.e. <0.8% relative resolution up to ~131k.
+HISTOGRAM_MANTISSA_BITS = 7
+HISTOGRAM_MIN_EXPONENT = -10
+HISTOGRAM_OCTAVES = 27
+HISTOGRAM_BINS = HISTOGRAM_OCTAVES << HISTOGRAM_MANTISSA_BITS
+
+_BIN_EDGES = np.array(
+    [
+        2.0 ** (HISTOGRAM_MIN_EXPONENT + (i >> HISTOGRAM_MANTISSA_BITS))
+        * (1.0 + (i & ((1 << HISTOGRAM_MANTISSA_BITS) - 1)) / (1 << HISTOGRAM_MANTISSA_BITS))
+        for i in range(HISTOGRAM_BINS + 1)
+    ]
+)
+
+__all__ = ["LogHistogram", "RunningStats", "grouped_bin_counts", "histogram_quantiles", "merge_stats", "t_score", "z_score"]
+
+
+def _bin_indices(values: np.ndarray) -> np.ndarray:
+    """Bin of each value read straight from its IEEE-754 exponent and top mantissa bits."""
+    if values.dtype == np.float32:
+        bits, shift, bias = values.view(np.int32), 23 - HISTOGRAM_MANTISSA_BITS, 127
+    else:
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        bits, shift, bias = values.view(np.int64), 52 - HISTOGRAM_MANTISSA_BITS, 1023
+    keys = bits >> shift
+    keys -= (bias + HISTOGRAM_MIN_EXPONENT) << HISTOGRAM_MANTISSA_BITS
+    np.clip(keys, 0, HISTOGRAM_BINS - 1, out=keys)
+    return keys.astype(np.intp, copy=False)
+
+
+def grouped_bin_counts(groups: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Histogram counts of ``values`` per group in one ``bincount``: shape ``(n_groups, HISTOGRAM_BINS)``."""
+    keys = _bin_indices(values)
+    keys += groups * HISTOGRAM_BINS
+    return np.bincount(keys, minlength=n_groups * HISTOGRAM_BINS).reshape(n_groups, HISTOGRAM_BINS)
+
+
+@dataclass
+class LogHistogram:
+    """Fixed log-linear histogram; mergeable across chunks and workers for streaming quantiles."""
+
+    counts: np.ndarray = field(default_factory=lambda: np.zeros(HISTOGRAM_BINS, dtype=np.int64))
+
+    def update(self, values: np.ndarray) -> None:
+        self.counts += np.bincount(_bin_indices(values), minlength=HISTOGRAM_BINS)
+
+    def merge(self, other: "LogHistogram") -> None:
+        self.counts += other.counts
+
+    def quantiles(self, probabilities: Sequence[float]) -> np.ndarray:
+        return histogram_quantiles([self], probabilities)[0]
+
+
+def histogram_quantiles(histograms: Sequence[LogHistogram], probabilities: Sequence[float]) -> np.ndarray:
+    """Quantiles of several histograms at once, interpolated linearly within bins.
+
+    Returns shape ``(len(histograms), len(probabilities))``; rows of empty histograms are NaN.
+    """
+    counts = np.stack([histogram.counts for histogram in histograms])
+    cumulative = np.cumsum(counts, axis=1)
+    totals = cumulative[:, -1:]
+    targets = np.asarray(probabilities, dtype=float)[None, :] * totals
+    # Offsetting each row by more than any total keeps the flattened cumulative counts sorted,
+    # so one searchsorted finds the first bin reaching every target.
+    rows = np.arange(len(histograms))[:, None]
+    offsets = rows * (int(totals.max()) + 1)
+    flat = np.searchsorted((cumulative + offsets).ravel(), (targets + offsets).ravel(), side="left")
+    positions = np.minimum(flat.reshape(targets.shape) - rows * HISTOGRAM_BINS, HISTOGRAM_BINS - 1)
+    before = np.where(positions > 0, cumulative[rows, positions - 1], 0)
+    in_bin = counts[rows, positions]
+    fraction = np.divide(targets - before, in_bin, out=np.zeros(targets.shape), where=in_bin > 0)
+    lower, upper = _BIN_EDGES[positions], _BIN_EDGES[positions + 1]
+    quantiles = lower + (upper - lower) * np.clip(fraction, 0.0, 1.0)
+    quantiles[totals[:, 0] == 0] = np.nan
+    return quantiles
+
+
+@dataclass
+class RunningStats:
+    """Welford accumulator holding count, mean and sum of squared deviations.
+
+    With a ``histogram`` attached, ``update`` and ``merge`` also track the
+    value distribution for approximate quantiles.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    histogram: Optional[LogHistogram] = None
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold a chunk of samples into the running statistics."""
+        n = int(values.size)
+        if n == 0:
+            return
+        chunk_mean = float(np.mean(values))
+        chunk_m2 = float(np.var(values)) * n
+        self.merge(RunningStats(count=n, mean=chunk_mean, m2=chunk_m2))
+        if self.histogram is not None:
+            self.histogram.update(values)
+
+    def merge(self, other: "RunningStats", histogram: bool = True) -> None:
+        """Combine another accumulator into this one (Chan et al. pairwise update)."""
+        if other.count == 0:
+            return
+        if histogram and other.histogram is not None:
+            if self.histogram is None:
+                self.histogram = LogHistogram()
+            self.histogram.merge(other.histogram)
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Population variance, matching ``np.var`` with ``ddof=0``."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+
+def merge_stats(parts: Iterable[RunningStats], histograms: bool = True) -> RunningStats:
+    """Return a new accumulator equal to the union of ``parts``.
+
+    ``histograms=False`` skips combining histograms when only moments are needed.
+    """
+    merged = RunningStats()
+    for part in parts:
+        merged.merge(part, histogram=histograms)
+    return merged
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided standard normal critical value for ``confidence``."""
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("confidence must be between 0 and 1")
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+def t_score(confidence: float, degrees_of_freedom: int) -> float:
+    """Two-sided Student t critical value (Cornish-Fisher expansion, A&S 26.7.5)."""
+    if degrees_of_freedom <= 0:
+        raise ValueError("degrees_of_freedom must be a positive integer")
+    z = z_score(confidence)
+    z2 = z * z
+    terms = (
+        z * (z2 + 1.0) / 4.0,
+        z * ((5.0 * z2 + 16.0) * z2 + 3.0) / 96.0,
+        z * (((3.0 * z2 + 19.0) * z2 + 17.0) * z2 - 15.0) / 384.0,
+        z * ((((79.0 * z2 + 776.0) * z2 + 1482.0) * z2 - 1920.0) * z2 - 945.0) / 92160.0,
+    )
+    return z + sum(term / degrees_of_freedom ** (power + 1) for power, term in enumerate(terms))
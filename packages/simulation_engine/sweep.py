@@ -0,0 +1,161 @@
+"""Scenario sweeps over weather, traffic and supplier mix using common random numbers."""
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .montecarlo import (
+    BASE_PRICES,
+    CO2_BASELINE_KG,
+    CO2_FACTORS,
+    DEFAULT_CONFIDENCE,
+    DEFAULT_N_SAMPLES,
+    DISTANCE_RANGE_KM,
+    ECO_SCORE_SCALE_KG,
+    WEATHER_MULTIPLIERS,
+)
+from .models import DEFAULT_COST_MODELS, DEFAULT_EMISSION_MODELS, SampleContext, apply_models, validate_models
+from .stats import z_score
+
+DEFAULT_TRAFFIC_RATIOS: Sequence[float] = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0)
+UNIFORM_MIX = "uniform"
+
+SWEEP_COLUMNS = (
+    "weather",
+    "weather_factor",
+    "traffic_ratio",
+    "supplier_mix",
+    "eco_score",
+    "eco_score_ci_low",
+    "eco_score_ci_high",
+    "co2_saved_kg",
+    "variance_cost",
+    "best_sources",
+)
+
+__all__ = ["DEFAULT_TRAFFIC_RATIOS", "SWEEP_COLUMNS", "run_sweep"]
+
+
+def _mix_weights(name: str, mix: Mapping[str, float]) -> np.ndarray:
+    """Normalise a supplier mix into probabilities ordered like ``CO2_FACTORS``."""
+    unknown = set(mix).difference(CO2_FACTORS)
+    if unknown:
+        raise ValueError(f"Supplier mix '{name}' has unknown supplier types: {sorted(unknown)}")
+    weights = np.array([float(mix.get(supplier, 0.0)) for supplier in CO2_FACTORS])
+    if np.any(weights < 0) or weights.sum() <= 0:
+        raise ValueError(f"Supplier mix '{name}' needs non-negative weights with a positive total")
+    return weights / weights.sum()
+
+
+def run_sweep(
+    weather_conditions: Optional[Sequence[str]] = None,
+    traffic_ratios: Sequence[float] = DEFAULT_TRAFFIC_RATIOS,
+    supplier_mixes: Optional[Mapping[str, Mapping[str, float]]] = None,
+    n_samples: int = DEFAULT_N_SAMPLES,
+    seed: Optional[int] = None,
+    confidence: float = DEFAULT_CONFIDENCE,
+    emission_models: Sequence[str] = DEFAULT_EMISSION_MODELS,
+    cost_models: Sequence[str] = DEFAULT_COST_MODELS,
+) -> List[Dict[str, object]]:
+    """Evaluate every weather × traffic × supplier-mix scenario.
+
+    All scenarios share the same underlying draws (common random numbers), so
+    differences between rows reflect the factors rather than sampling noise.
+    Per-sample emissions and costs come from the same model registry as
+    ``run_simulation`` (``models.apply_models``), evaluated once per supplier
+    mix and scaled by each scenario's weather multiplier and traffic ratio. No
+    factor APIs are called. Returns one row per scenario with the keys in ``SWEEP_COLUMNS``.
+    """
+    if n_samples <= 0:
+        raise ValueError("n_samples must be a positive integer")
+    conditions = list(weather_conditions) if weather_conditions is not None else list(WEATHER_MULTIPLIERS)
+    unknown_conditions = [condition for condition in conditions if condition not in WEATHER_MULTIPLIERS]
+    if unknown_conditions:
+        raise ValueError(f"Unknown weather conditions: {unknown_conditions}")
+    ratios = [float(ratio) for ratio in traffic_ratios]
+    if not ratios or any(ratio <= 0 for ratio in ratios):
+        raise ValueError("traffic_ratios must be a non-empty list of positive values")
+    validate_models(emission_models, cost_models)
+    mixes = dict(supplier_mixes) if supplier_mixes else {UNIFORM_MIX: {supplier: 1.0 for supplier in CO2_FACTORS}}
+
+    suppliers = tuple(CO2_FACTORS.keys())
+    n_suppliers = len(suppliers)
+    cumulative = np.cumsum(np.stack([_mix_weights(name, mix) for name, mix in mixes.items()]), axis=1)
+
+    rng = np.random.default_rng(seed)
+    supplier_draw = rng.random(n_samples)
+    distances = rng.uniform(*DISTANCE_RANGE_KM, size=n_samples)
+    traffic_local = np.clip(rng.normal(loc=1.0, scale=0.1, size=n_samples), 0.5, 2.0)
+    price_factor = np.clip(rng.normal(loc=1.0, scale=0.15, size=n_samples), 0.5, 2.0)
+
+    # (mixes, samples): supplier picked by inverting each mix's CDF at the shared draw.
+    indices = np.minimum((supplier_draw[None, :, None] >= cumulative[:, None, :]).sum(axis=2), n_suppliers - 1)
+
+    # Emission models are proportional to weather × global traffic and cost models ignore
+    # both (see ``models``), so one registry pass per mix at unit factors covers every
+    # scenario: broadcasting the (weather, traffic) grid over the samples scales the
+    # emission mean and spread by the same factor and leaves costs and rankings unchanged.
+    scale = np.array([WEATHER_MULTIPLIERS[condition] for condition in conditions])[:, None] * np.array(ratios)[None, :]
+    emissions = np.empty(n_samples)
+    costs = np.empty(n_samples)
+    scratch = np.empty(n_samples)
+    half_width_scale = float(z_score(confidence) * ECO_SCORE_SCALE_KG / np.sqrt(n_samples))
+    per_mix = []
+    for mix_position in range(len(mixes)):
+        context = SampleContext(
+            supplier_types=suppliers,
+            supplier_indices=indices[mix_position],
+            distances=distances,
+            traffic_local=traffic_local,
+            price_factor=price_factor,
+            weather_factor=1.0,
+            traffic_factor_global=1.0,
+            co2_per_km=CO2_FACTORS,
+            base_prices=BASE_PRICES,
+        )
+        apply_models(context, emission_models, cost_models, emissions, costs, scratch)
+        cost_mean = float(costs.mean())
+        means = scale * float(emissions.mean())
+        eco_scores = np.where(means >= 0, 1.0 - means / (means + ECO_SCORE_SCALE_KG), 0.0)
+        half_widths = half_width_scale / (means + ECO_SCORE_SCALE_KG) ** 2 * (scale * float(emissions.std()))
+        per_mix.append(
+            (
+                means,
+                eco_scores,
+                half_widths,
+                round(float(costs.std()) / cost_mean if cost_mean else 0.0, 4),
+                _best_sources(indices[mix_position], emissions, suppliers),
+            )
+        )
+
+    rows: List[Dict[str, object]] = []
+    for weather_position, condition in enumerate(conditions):
+        for ratio_position, ratio in enumerate(ratios):
+            for mix_name, (means, eco_scores, half_widths, variance_cost, best_sources) in zip(mixes, per_mix):
+                mean = float(means[weather_position, ratio_position])
+                eco_score = float(eco_scores[weather_position, ratio_position])
+                half_width = float(half_widths[weather_position, ratio_position])
+                rows.append(
+                    {
+                        "weather": condition,
+                        "weather_factor": float(WEATHER_MULTIPLIERS[condition]),
+                        "traffic_ratio": ratio,
+                        "supplier_mix": mix_name,
+                        "eco_score": round(eco_score, 4),
+                        "eco_score_ci_low": round(eco_score - half_width, 4),
+                        "eco_score_ci_high": round(eco_score + half_width, 4),
+                        "co2_saved_kg": round(CO2_BASELINE_KG - mean, 4),
+                        "variance_cost": variance_cost,
+                        "best_sources": list(best_sources),
+                    }
+                )
+    return rows
+
+
+def _best_sources(indices: np.ndarray, emissions: np.ndarray, suppliers: Sequence[str]) -> List[str]:
+    counts = np.bincount(indices, minlength=len(suppliers))
+    sums = np.bincount(indices, weights=emissions, minlength=len(suppliers))
+    present = np.flatnonzero(counts)
+    ranked = present[np.argsort(sums[present] / counts[present], kind="stable")]
+    return [suppliers[position] for position in ranked[:2]]
@@ -0,0 +1,27 @@
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from packages.simulation_engine.benchmarks import perf
+
+
+def _report(path, median_s):
+    path.write_text(json.dumps({"results": {"case": {"median_s": median_s, "min_s": median_s, "repeats": 1, "peak_bytes": 10}}}))
+    return path
+
+
+def test_compare_flags_slowdowns_above_threshold(tmp_path):
+    baseline = _report(tmp_path / "baseline.json", 1.0)
+    assert perf.compare(baseline, _report(tmp_path / "ok.json", 1.05), threshold=0.1) == 0
+    assert perf.compare(baseline, _report(tmp_path / "slow.json", 1.2), threshold=0.1) == 1
+
+
+def test_run_writes_json_report(tmp_path):
+    report = perf.run(tmp_path / "bench.json", repeats=1, max_n=1000, pattern="run_simulation[n=1000")
+    assert "run_simulation[n=1000,chunk=1000]" in report["results"]
+    assert "run_simulation[n=1000,low_memory]" in report["results"]
+    assert json.loads((tmp_path / "bench.json").read_text())["results"]["run_simulation[n=1000]"]["peak_bytes"] > 0
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from packages.simulation_engine import clustering, montecarlo
+
+
+def _blobs(seed=0):
+    rng = np.random.default_rng(seed)
+    centres = np.array([[0.0, 0.0, 5.0], [100.0, 0.0, 40.0], [0.0, 100.0, 20.0]])
+    return np.concatenate([centre + rng.normal(scale=2.0, size=(200, 3)) for centre in centres]), centres
+
+
+def test_minibatch_kmeans_recovers_separated_clusters():
+    X, centres = _blobs()
+    model = clustering.MiniBatchKMeans(n_clusters=3, batch_size=64, seed=1).fit(X)
+    fitted = model.centroids[np.argsort(model.centroids[:, 0] * 10 + model.centroids[:, 1])]
+    expected = centres[np.argsort(centres[:, 0] * 10 + centres[:, 1])]
+    assert np.allclose(fitted, expected, atol=1.0)
+
+
+def test_run_simulation_labels_route_with_persisted_centroids(tmp_path, monkeypatch):
+    monkeypatch.setattr(montecarlo, "get_weather_factor", lambda: 1.0)
+    monkeypatch.setattr(montecarlo, "get_traffic_factor", lambda: 1.0)
+    monkeypatch.setenv("ROUTE_CLUSTER_CENTROIDS", str(tmp_path / "centroids.json"))
+    montecarlo.clear_simulation_cache()
+    assert montecarlo.run_simulation("demo", n_samples=1000)["route_cluster"] == clustering.FALLBACK_CLUSTER
+
+    lat, lon = montecarlo.get_location()
+    here = clustering.route_features(lat, lon, [25.5, 25.5, 25.5])
+    far = clustering.route_features(lat + 5.0, lon, [25.5, 25.5, 25.5])
+    model = clustering.MiniBatchKMeans(n_clusters=2, centroids=np.stack([far, here]))
+    clustering.save_model(model)
+
+    assert montecarlo.run_simulation("demo", n_samples=1000)["route_cluster"] == "Cluster-B"
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from packages.simulation_engine import geo_index, montecarlo
+from packages.simulation_engine.geo_index import SupplierGridIndex, SupplierLocation, haversine_km
+
+
+@pytest.fixture(autouse=True)
+def _reset_index(monkeypatch):
+    monkeypatch.setattr(montecarlo, "get_weather_factor", lambda: 1.0)
+    monkeypatch.setattr(montecarlo, "get_traffic_factor", lambda: 1.0)
+    montecarlo.clear_simulation_cache()
+    yield
+    geo_index.configure_supplier_source(None)
+
+
+def test_grid_nearest_matches_brute_force():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(40.0, 45.0, size=2000)
+    lons = rng.uniform(-75.0, -70.0, size=2000)
+    index = SupplierGridIndex(cell_degrees=0.25)
+    for i, (lat, lon) in enumerate(zip(lats, lons)):
+        index.upsert(SupplierLocation(str(i), f"s{i}", "local", float(lat), float(lon)))
+
+    found = index.nearest(42.36, -71.06, "local", 5)
+    expected = np.sort(haversine_km(42.36, -71.06, lats, lons))[:5]
+    assert [round(distance, 6) for _, distance in found] == [round(d, 6) for d in expected]
+
+    index.remove(found[0][0].supplier_id)
+    assert index.nearest(42.36, -71.06, "local", 1)[0][1] == pytest.approx(expected[1])
+
+
+def test_shared_index_refreshes_incrementally_and_feeds_sampling():
+    calls = []
+    rows = [
+        {"id": 1, "name": "a", "supplier_type": "local", "latitude": 42.37, "longitude": -71.06, "updated_at": "2025-01-01"},
+        {"id": 2, "name": "b", "supplier_type": "big_box", "latitude": 42.40, "longitude": -71.06, "updated_at": "2025-01-02"},
+    ]
+
+    def loader(updated_since):
+        calls.append(updated_since)
+        return rows if updated_since is None else []
+
+    geo_index.configure_supplier_source(loader)
+    distances = montecarlo.nearest_supplier_distances(42.36, -71.06)
+    assert distances[0] == (pytest.approx(1.112, abs=0.01),)
+    assert distances[1] == ()
+    assert montecarlo.nearest_supplier_distances(42.36, -71.06) == distances
+    assert calls == [None]
+
+    near = montecarlo.run_simulation("demo", n_samples=2000, ci_width=None, location=(42.36, -71.06))
+    low_memory = montecarlo.run_simulation("demo", n_samples=2000, ci_width=None, location=(42.36, -71.06), low_memory=True)
+    geo_index.configure_supplier_source(None)
+    uniform = montecarlo.run_simulation("demo", n_samples=2000, ci_width=None, location=(42.36, -71.06))
+    assert near["eco_score"] > uniform["eco_score"]
+    assert low_memory["eco_score"] == pytest.approx(near["eco_score"], abs=0.02)
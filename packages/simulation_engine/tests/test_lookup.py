@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from packages.simulation_engine import montecarlo
+from packages.simulation_engine.lookup import precompute_table, save_table, traffic_bucket
+
+
+@pytest.fixture(autouse=True)
+def _stub_factor_apis(monkeypatch, tmp_path):
+    monkeypatch.setattr(montecarlo, "get_weather_factor", lambda: 1.15)
+    monkeypatch.setattr(montecarlo, "get_traffic_factor", lambda: 1.33)
+    monkeypatch.setenv("SIM_LOOKUP_TABLE", str(tmp_path / "eco_lookup.json"))
+    montecarlo.clear_simulation_cache()
+
+
+def test_traffic_bucket_covers_clamped_range():
+    assert traffic_bucket(0.1) == 0
+    assert traffic_bucket(1.33) == 5
+    assert traffic_bucket(2.0) == 9
+
+
+def test_run_simulation_answers_from_precomputed_table():
+    table = precompute_table(["recipe-1"], weather_conditions=["Rain"], n_samples=20_000)
+    assert len(table) == 10
+    save_table(table)
+
+    result = montecarlo.run_simulation("recipe-1")
+    assert result["n_samples_used"] == 20_000
+    assert result["route_cluster"]
+
+    assert montecarlo.run_simulation("recipe-1", use_lookup=False)["n_samples_used"] < 20_000
+    assert montecarlo.run_simulation("recipe-2")["n_samples_used"] < 20_000
+
+
+def test_non_default_requests_skip_the_precomputed_table():
+    save_table(precompute_table(["recipe-1"], weather_conditions=["Rain"], n_samples=20_000))
+
+    assert montecarlo.run_simulation("recipe-1", n_samples=500, ci_width=None)["n_samples_used"] == 500
+    assert montecarlo.run_simulation("recipe-1", sampler="sobol")["n_samples_used"] < 20_000
+    assert montecarlo.run_simulation("recipe-1", ci_width=0.001)["n_samples_used"] < 20_000
+    ingredients = [{"name": "flour", "quantity": 1, "unit": "cup"}]
+    assert montecarlo.run_simulation("recipe-1", ingredients=ingredients)["n_samples_used"] < 20_000
@@ -0,0 +1,201 @@
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from packages.simulation_engine import montecarlo
+from packages.simulation_engine.samplers import SAMPLER_NAMES, AntitheticSampler, SobolSampler
+from packages.simulation_engine.stats import RunningStats, t_score
+
+
+@pytest.fixture(autouse=True)
+def _stub_factor_apis(monkeypatch):
+    monkeypatch.setattr(montecarlo, "get_weather_factor", lambda: 1.0)
+    monkeypatch.setattr(montecarlo, "get_traffic_factor", lambda: 1.0)
+    montecarlo.clear_simulation_cache()
+
+
+def test_running_stats_matches_numpy():
+    values = np.random.default_rng(0).normal(size=5000)
+    stats = RunningStats()
+    for chunk in np.array_split(values, 7):
+        stats.update(chunk)
+    assert stats.count == values.size
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.variance == pytest.approx(values.var())
+
+
+def test_grouped_accumulation_keeps_variance_of_large_values():
+    rng = np.random.default_rng(1)
+    indices = rng.integers(0, len(montecarlo.CO2_FACTORS), size=6000)
+    values = 1e8 + rng.normal(scale=0.01, size=indices.size)
+    emission_stats = {supplier: RunningStats() for supplier in montecarlo.CO2_FACTORS}
+    cost_stats = {supplier: RunningStats() for supplier in montecarlo.CO2_FACTORS}
+    for chunk in np.array_split(np.arange(indices.size), 3):
+        montecarlo._accumulate_indexed(indices[chunk], values[chunk], values[chunk], emission_stats, cost_stats)
+    for position, supplier in enumerate(montecarlo.CO2_FACTORS):
+        assert emission_stats[supplier].variance == pytest.approx(values[indices == position].var(), rel=1e-6)
+
+def test_run_simulation_stops_early_within_ci_width():
+    result = montecarlo.run_simulation("demo", n_samples=200_000, ci_width=0.05)
+    assert result["n_samples_used"] < 200_000
+    for low, high in result["confidence_intervals"].values():
+        assert high - low <= 0.05
+    assert 0.0 <= result["eco_score"] <= 1.0
+    assert result["best_sources"][0] == "local"
+
+
+def test_run_simulation_full_budget_without_ci_width():
+    result = montecarlo.run_simulation("demo", n_samples=2500, ci_width=None, chunk_size=1000)
+    assert result["n_samples_used"] == 2500
+
+
+def test_sobol_sampler_matches_reference_sequence():
+    sampler = SobolSampler(np.random.default_rng(0), 3)
+    sampler._shift[:] = 0
+    points = sampler.uniforms(4)
+    expected = [[0.0, 0.0, 0.0], [0.5, 0.5, 0.5], [0.75, 0.25, 0.25], [0.25, 0.75, 0.75]]
+    assert points.tolist() == expected
+
+
+def test_sobol_replicates_are_independently_shifted_sequences():
+    sampler = SobolSampler(np.random.default_rng(0), 3, replicates=2)
+    sampler._shift[:] = 0
+    assert sampler.replicate_sizes(5) == [3, 2]
+    assert sampler.uniforms(5).tolist() == [[0.0, 0.0, 0.0], [0.5, 0.5, 0.5], [0.75, 0.25, 0.25], [0.0, 0.0, 0.0], [0.5, 0.5, 0.5]]
+
+
+def test_antithetic_sampler_leaves_unpaired_dimensions_unmirrored():
+    points = AntitheticSampler(np.random.default_rng(0), 3, unpaired=[2]).uniforms(8)
+    assert np.allclose(points[:4, :2] + points[4:, :2], 1.0)
+    assert not np.allclose(points[:4, 2] + points[4:, 2], 1.0)
+
+
+def test_variance_reduced_samplers_stop_on_replicate_spread():
+    assert t_score(0.95, 7) == pytest.approx(2.3646, abs=1e-3)
+    used = {
+        sampler: montecarlo.run_simulation("demo", n_samples=200_000, ci_width=0.01, sampler=sampler)["n_samples_used"]
+        for sampler in ("mc", "sobol")
+    }
+    assert used["sobol"] < used["mc"] < 200_000
+
+@pytest.mark.parametrize("sampler", SAMPLER_NAMES)
+def test_run_simulation_supports_every_sampler(sampler):
+    result = montecarlo.run_simulation("demo", n_samples=4000, ci_width=None, sampler=sampler)
+    assert result["n_samples_used"] == 4000
+    assert result["eco_score"] == pytest.approx(0.76, abs=0.02)
+
+
+def test_run_simulation_is_reproducible_and_cached():
+    first = montecarlo.run_simulation("recipe-1", n_samples=3000)
+    assert montecarlo.run_simulation("recipe-1", n_samples=3000) == first
+    assert montecarlo._cached_simulation.cache_info().hits == 1
+
+    montecarlo.clear_simulation_cache()
+    assert montecarlo.run_simulation("recipe-1", n_samples=3000) == first
+    assert montecarlo.run_simulation("recipe-1", n_samples=3000, seed=7) != first
+
+
+def test_parallel_simulation_merges_worker_statistics():
+    threaded = montecarlo.run_simulation("recipe-1", n_samples=9001, seed=3, workers=3, executor="thread")
+    assert threaded["n_samples_used"] == 9001
+
+    montecarlo.clear_simulation_cache()
+    processed = montecarlo.run_simulation("recipe-1", n_samples=9001, seed=3, workers=3, executor="process")
+    assert processed == threaded
+
+
+def test_low_memory_mode_keeps_peak_memory_flat():
+    def peak_bytes(n_samples):
+        montecarlo.clear_simulation_cache()
+        tracemalloc.start()
+        result = montecarlo.run_simulation("demo", n_samples=n_samples, ci_width=None, low_memory=True)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert result["n_samples_used"] == n_samples
+        assert result["eco_score"] == pytest.approx(0.76, abs=0.01)
+        return peak
+
+    assert peak_bytes(2_000_000) < 1.5 * peak_bytes(200_000)
+
+
+def test_emission_and_cost_models_compose():
+    base = montecarlo.run_simulation("demo", n_samples=5000, ci_width=None, seed=1)
+    chilled = montecarlo.run_simulation(
+        "demo",
+        n_samples=5000,
+        ci_width=None,
+        seed=1,
+        emission_models=("distance", "cold_chain"),
+        cost_models=("base_price", "cold_chain"),
+    )
+    assert base["eco_score"] == pytest.approx(0.76, abs=0.02)
+    assert chilled["eco_score"] < base["eco_score"]
+    with pytest.raises(ValueError):
+        montecarlo.run_simulation("demo", emission_models=("teleport",))
+
+
+def test_async_factor_snapshot_parses_both_apis():
+    httpx = pytest.importorskip("httpx")
+    import asyncio
+
+    def handler(request):
+        if "openweathermap" in request.url.host:
+            return httpx.Response(200, json={"weather": [{"main": "Rain"}]})
+        return httpx.Response(200, json={"flowSegmentData": {"currentSpeed": 20, "freeFlowSpeed": 30}})
+
+    async def fetch():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await montecarlo.get_factor_snapshot_async(client)
+
+    assert asyncio.run(fetch()) == (1.15, 1.5)
+    assert montecarlo.get_factor_snapshot() == (1.15, 1.5)
+
+
+def test_identical_ingredients_share_memoised_results():
+    ingredients = [{"name": "Tomato", "quantity": 2, "unit": "cups"}, {"name": "basil", "quantity": 1, "unit": "Tbs"}]
+    reordered = [{"name": " basil ", "quantity": 1.0, "unit": "tbsp"}, {"name": "tomato", "quantity": 2, "unit": "cup"}]
+    first = montecarlo.run_simulation("recipe-a", n_samples=3000, ingredients=ingredients)
+    memo = montecarlo.get_simulation_memo()
+    assert (memo.hits, memo.misses) == (0, 1)
+
+    assert montecarlo.run_simulation("recipe-b", n_samples=3000, ingredients=reordered) == first
+    assert memo.hits == 1
+    assert montecarlo.run_simulation("recipe-a", n_samples=3000) != first
+
+
+def test_memo_size_setting_falls_back_when_unreadable(monkeypatch):
+    from packages.simulation_engine import memo
+
+    for raw in ("1e4", "", "lots"):
+        monkeypatch.setenv("SIM_MEMO_SIZE", raw)
+        assert memo._get_env_int("SIM_MEMO_SIZE", memo.DEFAULT_MEMO_SIZE) == memo.DEFAULT_MEMO_SIZE
+    monkeypatch.setenv("SIM_MEMO_SIZE", "64")
+    assert memo._get_env_int("SIM_MEMO_SIZE", memo.DEFAULT_MEMO_SIZE) == 64
+
+
+def test_supplier_statistics_match_masked_numpy():
+    samples = montecarlo._simulate_samples(20_000, 1.0, 1.0, np.random.default_rng(5))
+    indices, emissions, costs = samples["supplier_indices"], samples["emissions"], samples["costs"]
+    stats = montecarlo.supplier_statistics(indices, emissions, costs)
+    for position, supplier in enumerate(montecarlo.CO2_FACTORS):
+        mask = indices == position
+        assert stats[supplier]["count"] == int(mask.sum())
+        assert stats[supplier]["emissions"]["mean"] == pytest.approx(emissions[mask].mean(), abs=1e-4)
+        assert stats[supplier]["cost"]["std"] == pytest.approx(costs[mask].std(), abs=1e-4)
+        assert stats[supplier]["emissions"]["p95"] == pytest.approx(np.quantile(emissions[mask], 0.95), abs=1e-4)
+    assert montecarlo._aggregate_best_suppliers(indices, emissions) == ["local", "regional"]
+
+
+def test_run_simulation_reports_streaming_supplier_quantiles():
+    result = montecarlo.run_simulation("demo", n_samples=20_000, ci_width=None, seed=5)
+    local = result["supplier_stats"]["local"]
+    assert local["emissions"]["p5"] < local["emissions"]["p50"] < local["emissions"]["p95"]
+    # Uniform 1-50 km at 0.1 kg/km: median near 2.55 kg, within histogram resolution.
+    assert local["emissions"]["p50"] == pytest.approx(2.55, rel=0.05)
@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from packages.simulation_engine.sweep import SWEEP_COLUMNS, run_sweep
+
+
+def test_sweep_covers_grid_with_common_random_numbers():
+    mixes = {"uniform": {"local": 1, "regional": 1, "big_box": 1}, "local_only": {"local": 1}}
+    rows = run_sweep(["Clear", "Snow"], [1.0, 2.0], mixes, n_samples=5000, seed=1)
+    assert len(rows) == 2 * 2 * 2
+    assert all(tuple(row) == SWEEP_COLUMNS for row in rows)
+
+    by_key = {(row["weather"], row["traffic_ratio"], row["supplier_mix"]): row for row in rows}
+    clear, snow = by_key[("Clear", 1.0, "uniform")], by_key[("Snow", 1.0, "uniform")]
+    assert snow["eco_score"] < clear["eco_score"]
+    assert clear["co2_saved_kg"] - snow["co2_saved_kg"] == pytest.approx(0.25 * (50.0 - clear["co2_saved_kg"]), rel=1e-3)
+    assert by_key[("Clear", 1.0, "local_only")]["best_sources"] == ["local"]
+
+
+def test_sweep_rejects_unknown_inputs():
+    with pytest.raises(ValueError):
+        run_sweep(["Hail"])
+    with pytest.raises(ValueError):
+        run_sweep(supplier_mixes={"bad": {"airfreight": 1.0}})
+
+
+def test_sweep_uses_the_simulation_model_registry():
+    base = run_sweep(["Clear"], [1.0], n_samples=5000, seed=3)[0]
+    chilled = run_sweep(
+        ["Clear"], [1.0], n_samples=5000, seed=3, emission_models=["distance", "cold_chain"], cost_models=["base_price", "cold_chain"]
+    )[0]
+    assert chilled["co2_saved_kg"] < base["co2_saved_kg"]
+    assert chilled["eco_score"] < base["eco_score"]
+    with pytest.raises(ValueError):
+        run_sweep(["Clear"], [1.0], emission_models=["teleport"])
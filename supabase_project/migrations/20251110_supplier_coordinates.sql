@@ -0,0 +1,22 @@
+-- supplier coordinates for the in-memory nearest-supplier index
+alter table public.suppliers add column if not exists latitude double precision;
+alter table public.suppliers add column if not exists longitude double precision;
+alter table public.suppliers add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists suppliers_updated_at_idx on public.suppliers(updated_at);
+
+-- bump updated_at so the backend can refresh its index incrementally
+create or replace function public.touch_suppliers_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+drop trigger if exists suppliers_touch_updated_at on public.suppliers;
+create trigger suppliers_touch_updated_at
+  before update on public.suppliers
+  for each row execute function public.touch_suppliers_updated_at();
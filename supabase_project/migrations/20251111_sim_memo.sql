@@ -0,0 +1,10 @@
+-- Simulation results shared across recipes with identical ingredient fingerprints.
+create table if not exists public.sim_memo (
+  id uuid primary key default gen_random_uuid(),
+  key_hash text not null unique,
+  fingerprint text not null,
+  result_json jsonb not null,
+  created_at timestamptz not null default now()
+);
+create index if not exists sim_memo_fingerprint_idx on public.sim_memo(fingerprint);
+alter table public.sim_memo enable row level security;
@@ -0,0 +1,15 @@
+-- Request counts per cached generation, used to pre-warm popular queries before they expire.
+alter table public.gen_cache add column if not exists hit_count bigint not null default 0;
+alter table public.gen_cache add column if not exists last_hit_at timestamptz;
+create index if not exists gen_cache_hit_count_idx on public.gen_cache(hit_count desc);
+
+create or replace function public.gen_cache_record_hits(p_keys text[], p_counts int[])
+returns void
+language sql
+as $$
+  update public.gen_cache as g
+  set hit_count = g.hit_count + h.n,
+      last_hit_at = now()
+  from unnest(p_keys, p_counts) as h(key_hash, n)
+  where g.key_hash = h.key_hash;
+$$;
@@ -33,12 +33,12 @@ values
     ((select id from public.recipes where id = '9b27e9d7-03d5-47b6-9a8c-77e6607f6c95'), 'Green Peas', 100, 'grams');
 
 -- Seed suppliers
-insert into public.suppliers (name, location, supplier_type, co2_per_km)
+insert into public.suppliers (name, location, supplier_type, co2_per_km, latitude, longitude)
 values
-    ('FarmFresh Collective', 'Sonoma, CA', 'local', 0.8),
-    ('Greenline Produce', 'Sacramento, CA', 'regional', 1.3),
-    ('Spice Bazaar Central', 'Fremont, CA', 'local', 0.9),
-    ('Wholesale Pantry Depot', 'Los Angeles, CA', 'big_box', 2.4)
+    ('FarmFresh Collective', 'Sonoma, CA', 'local', 0.8, 38.2919, -122.4580),
+    ('Greenline Produce', 'Sacramento, CA', 'regional', 1.3, 38.5816, -121.4944),
+    ('Spice Bazaar Central', 'Fremont, CA', 'local', 0.9, 37.5485, -121.9886),
+    ('Wholesale Pantry Depot', 'Los Angeles, CA', 'big_box', 2.4, 34.0522, -118.2437)
 on conflict (name) do nothing;
 
 -- Seed eco results